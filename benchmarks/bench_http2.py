@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Benchmark: HTTP/1.1 vs HTTP/2 gateway traffic at increasing concurrency.
+
+Starts a local TLS stand-in for the gateway in a subprocess (hypercorn,
+offering h2 and http/1.1 via ALPN, 20 ms per chat request) and drives
+``send_message`` at concurrency 1, 64 and 512 from ``CostKatanaClient``
+(threads) and ``AsyncCostKatanaClient`` (tasks), once per protocol.
+Reports the connections the server accepted, the connections left in the
+pool, request latency percentiles and failed requests. Needs ``hypercorn``,
+``h2`` and the ``openssl`` CLI (for a throwaway certificate).
+
+    python benchmarks/bench_http2.py
+"""
+
+import asyncio
+import json
+import multiprocessing
+import socket
+import statistics
+import subprocess
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from hypercorn.asyncio import serve
+from hypercorn.config import Config as ServerConfig
+
+from cost_katana.async_client import AsyncCostKatanaClient
+from cost_katana.client import CostKatanaClient
+from cost_katana.config import Config
+from cost_katana.pool import ConnectionPool
+
+CONCURRENCY = [1, 64, 512]
+REQUESTS_PER_WORKER = 4
+MIN_REQUESTS = 200
+SERVER_LATENCY = 0.02
+
+peers = set()
+
+
+async def app(scope, receive, send):
+    """Minimal ASGI stand-in for /api/chat/message plus a peer counter"""
+    if scope["type"] != "http":
+        return
+    while (await receive()).get("more_body"):
+        pass
+    if scope["path"] == "/_peers":
+        # Connections seen since the last call, then reset
+        body = json.dumps({"peers": len(peers)}).encode()
+        peers.clear()
+    else:
+        peers.add(tuple(scope["client"]))
+        await asyncio.sleep(SERVER_LATENCY)
+        body = json.dumps({"data": {"response": "ok", "cost": 0.0001, "tokenCount": 3}}).encode()
+    await send(
+        {
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [(b"content-type", b"application/json")],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
+
+
+def make_certificate(directory: Path) -> tuple:
+    cert, key = directory / "cert.pem", directory / "key.pem"
+    subprocess.run(
+        [
+            "openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes",
+            "-keyout", str(key), "-out", str(cert), "-days", "1",
+            "-subj", "/CN=127.0.0.1", "-addext", "subjectAltName=IP:127.0.0.1",
+        ],
+        check=True,
+        capture_output=True,
+    )
+    return str(cert), str(key)
+
+
+def serve_forever(port: int, cert: str, key: str) -> None:
+    config = ServerConfig()
+    config.bind = [f"127.0.0.1:{port}"]
+    config.certfile, config.keyfile = cert, key
+    config.alpn_protocols = ["h2", "http/1.1"]
+    config.h2_max_concurrent_streams = 1000
+    config.backlog = 1024
+    # Hypercorn cancels in-flight streams when it retires a connection after
+    # this many requests; keep it out of the measurement
+    config.keep_alive_max_requests = 1_000_000
+    config.loglevel = "ERROR"
+
+    async def main():
+        # A shutdown trigger keeps hypercorn from installing signal handlers
+        await serve(app, config, shutdown_trigger=asyncio.Event().wait)
+
+    asyncio.run(main())
+
+
+def start_server(cert: str, key: str) -> tuple:
+    """Run the stand-in in its own process so it doesn't share our GIL"""
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    process = multiprocessing.Process(target=serve_forever, args=(port, cert, key), daemon=True)
+    process.start()
+
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+            return port, process
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError("stand-in server did not start")
+
+
+def run_sync(url: str, cert: str, http2: bool, concurrency: int, total: int) -> tuple:
+    pool = ConnectionPool(http2=http2, verify=cert)
+    client = CostKatanaClient(
+        config=Config(api_key="bench", base_url=url, http2=http2, enable_ai_logging=False),
+        connection_pool=pool,
+    )
+    client.send_message("warm up", model_id="m")
+    client.client.get("/_peers")
+
+    def one(i: int):
+        started = time.perf_counter()
+        try:
+            client.send_message(f"prompt {i}", model_id="m")
+        except Exception:
+            return None
+        return (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(one, range(total)))
+    elapsed = time.perf_counter() - started
+
+    pool_connections = pool.stats()["connections"]
+    server_connections = client.client.get("/_peers").json()["peers"]
+    pool.close()
+    return results, elapsed, server_connections, pool_connections
+
+
+def run_async(url: str, cert: str, http2: bool, concurrency: int, total: int) -> tuple:
+    pool = ConnectionPool(http2=http2, verify=cert)
+
+    async def main():
+        client = AsyncCostKatanaClient(
+            config=Config(api_key="bench", base_url=url, http2=http2, enable_ai_logging=False),
+            connection_pool=pool,
+        )
+        await client.send_message("warm up", model_id="m")
+        await client.client.get("/_peers")
+        slots = asyncio.Semaphore(concurrency)
+
+        async def one(i: int):
+            async with slots:
+                started = time.perf_counter()
+                try:
+                    await client.send_message(f"prompt {i}", model_id="m")
+                except Exception:
+                    return None
+                return (time.perf_counter() - started) * 1000
+
+        started = time.perf_counter()
+        results = await asyncio.gather(*(one(i) for i in range(total)))
+        elapsed = time.perf_counter() - started
+
+        pool_connections = len(client.client._transport._pool.connections)
+        server_connections = (await client.client.get("/_peers")).json()["peers"]
+        await client.client.aclose()
+        return results, elapsed, server_connections, pool_connections
+
+    result = asyncio.run(main())
+    pool.close()
+    return result
+
+
+def run(runner, url: str, cert: str, http2: bool, concurrency: int) -> dict:
+    total = max(concurrency * REQUESTS_PER_WORKER, MIN_REQUESTS)
+    results, elapsed, server_connections, pool_connections = runner(
+        url, cert, http2, concurrency, total
+    )
+    samples = sorted(r for r in results if r is not None)
+    return {
+        "server_connections": server_connections,
+        "pool_connections": pool_connections,
+        "p50": statistics.median(samples),
+        "p99": samples[int(len(samples) * 0.99) - 1],
+        "rps": len(samples) / elapsed,
+        "errors": total - len(samples),
+    }
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        cert, key = make_certificate(Path(tmp))
+        port, server = start_server(cert, key)
+        url = f"https://127.0.0.1:{port}"
+
+        print(
+            f"{'client':<6} {'mode':<8} {'conc':>5} {'server conns':>13} {'pool conns':>11} "
+            f"{'p50 ms':>8} {'p99 ms':>8} {'req/s':>8} {'errors':>7}"
+        )
+        try:
+            for label, runner in (("sync", run_sync), ("async", run_async)):
+                for concurrency in CONCURRENCY:
+                    for http2 in (False, True):
+                        r = run(runner, url, cert, http2, concurrency)
+                        print(
+                            f"{label:<6} {'HTTP/2' if http2 else 'HTTP/1.1':<8} {concurrency:>5} "
+                            f"{r['server_connections']:>13} {r['pool_connections']:>11} "
+                            f"{r['p50']:>8.1f} {r['p99']:>8.1f} {r['rps']:>8.0f} {r['errors']:>7}"
+                        )
+        finally:
+            server.terminate()
+
+
+if __name__ == "__main__":
+    main()
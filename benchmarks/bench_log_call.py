@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Benchmark: caller-side cost of AILogger.log_ai_call.
+
+Uses a logger without an API key, so there is no worker or network and only
+the work done on the calling thread is timed. "before" enriches, redacts and
+sizes the entry on the caller (the old behaviour); "after" is the current
+``log_ai_call``, which queues the entry and leaves the rest to the worker.
+Reports p50/p99 microseconds per call for short, typical and long prompts.
+
+    python benchmarks/bench_log_call.py
+"""
+
+import json
+import statistics
+import time
+
+from cost_katana.logging.ai_logger import AILogger
+
+CALLS = 5000
+PROMPT_SIZES = [100, 1000, 10000]
+
+
+def make_entry(size: int) -> dict:
+    text = ("Summarise the quarterly report for the board. " * (size // 47 + 1))[:size]
+    return {
+        "service": "openai",
+        "operation": "ai",
+        "aiModel": "gpt-4o-mini",
+        "statusCode": 200,
+        "responseTime": 412,
+        "prompt": text,
+        "result": text,
+        "cost": 0.00042,
+    }
+
+
+def run(label: str, size: int, call) -> None:
+    entry = make_entry(size)
+    timings = []
+    for _ in range(CALLS):
+        start = time.perf_counter()
+        call(entry)
+        timings.append((time.perf_counter() - start) * 1e6)
+    timings.sort()
+    p50 = statistics.median(timings)
+    p99 = timings[int(len(timings) * 0.99)]
+    print(f"{label:8s} prompt={size:6d} chars  p50 {p50:8.2f} us  p99 {p99:8.2f} us")
+
+
+def main() -> None:
+    ai_logger = AILogger(api_key="", max_queue_size=CALLS + 1)
+
+    def before(entry):
+        prepared = ai_logger._prepare(entry)
+        len(json.dumps(prepared, default=str))
+        ai_logger._enqueue(prepared)
+
+    for size in PROMPT_SIZES:
+        for label, call in (("before", before), ("after", ai_logger.log_ai_call)):
+            ai_logger.clear_buffer()
+            run(label, size, call)
+
+
+if __name__ == "__main__":
+    main()
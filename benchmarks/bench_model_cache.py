@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Benchmark: HTTP requests made by a single ck.ai() call.
+
+Runs against an in-process httpx.MockTransport, so no API key or network is
+needed. "before" rebuilds the GenerativeModel and refetches the catalog on
+every call (the old behaviour); "after" goes through the shared model cache.
+
+    python benchmarks/bench_model_cache.py
+"""
+
+import time
+from collections import Counter
+
+import httpx
+
+import cost_katana as ck
+from cost_katana.models import GenerativeModel
+
+CALLS = 200
+
+requests_seen: Counter = Counter()
+
+
+def handler(request: httpx.Request) -> httpx.Response:
+    requests_seen[f"{request.method} {request.url.path}"] += 1
+    if request.url.path == "/api/chat/models":
+        return httpx.Response(
+            200, json={"data": [{"id": "amazon.nova-lite-v1:0", "name": "Nova Lite"}]}
+        )
+    return httpx.Response(
+        200,
+        json={"data": {"response": "ok", "cost": 0.0001, "tokenCount": 3}},
+    )
+
+
+def make_client() -> ck.CostKatanaClient:
+    client = ck.configure(api_key="dak_benchmark", project_id="bench")
+    client.client = httpx.Client(
+        base_url=client.config.base_url, transport=httpx.MockTransport(handler)
+    )
+    return client
+
+
+def run(label: str, call) -> None:
+    requests_seen.clear()
+    start = time.perf_counter()
+    for _ in range(CALLS):
+        call()
+    elapsed = time.perf_counter() - start
+    total = sum(requests_seen.values())
+    print(f"{label:8s} {total / CALLS:.2f} HTTP requests per call "
+          f"({dict(requests_seen)}) — {elapsed * 1000 / CALLS:.3f} ms/call")
+
+
+def main() -> None:
+    client = make_client()
+
+    def before():
+        client.model_catalog.invalidate()
+        model = GenerativeModel(client, "nova-lite")
+        model.generate_content("hello")
+
+    def after():
+        ck.ai("nova-lite", "hello", enable_ai_logging=False)
+
+    ck.clear_model_cache()
+    run("before", before)
+    run("after", after)
+
+
+if __name__ == "__main__":
+    import warnings
+
+    warnings.simplefilter("ignore", DeprecationWarning)
+    main()
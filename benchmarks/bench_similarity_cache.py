@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Benchmark: SimilarityCache lookup latency against index size.
+
+Fills the near-duplicate cache with N distinct prompts of a few hundred
+characters, then times lookups for near-duplicates (a changed timestamp line,
+expected hits) and for unseen prompts (expected misses). No network is used.
+
+    python benchmarks/bench_similarity_cache.py
+"""
+
+import random
+import statistics
+import string
+import time
+
+from cost_katana.similarity import SimilarityCache
+
+SIZES = [100, 1_000, 10_000, 50_000]
+LOOKUPS = 500
+WORDS = ["".join(random.choices(string.ascii_lowercase, k=random.randint(3, 9))) for _ in range(5000)]
+
+
+def make_prompt(seed: int, stamp: str = "12:00:01") -> str:
+    rng = random.Random(seed)
+    body = " ".join(rng.choice(WORDS) for _ in range(60))
+    return f"Summarize the ticket below.\nGenerated at 2026-10-16T{stamp}Z\n{body}"
+
+
+def time_lookups(cache: SimilarityCache, prompts) -> tuple:
+    samples = []
+    hits = 0
+    for prompt in prompts:
+        started = time.perf_counter()
+        if cache.get("bench", prompt) is not None:
+            hits += 1
+        samples.append((time.perf_counter() - started) * 1e6)
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.99) - 1], hits
+
+
+def main() -> None:
+    random.seed(7)
+    print(f"{'entries':>8} {'lookup':>6} {'p50 us':>9} {'p99 us':>9} {'hit rate':>9} {'cand/lookup':>12}")
+    for size in SIZES:
+        cache = SimilarityCache(max_entries=size)
+        for i in range(size):
+            cache.set("bench", make_prompt(i), {"data": {"response": f"r{i}"}})
+
+        sample = random.sample(range(size), min(LOOKUPS, size))
+        near = [make_prompt(i, stamp="12:07:42") for i in sample]
+        unseen = [make_prompt(size + 1_000_000 + i) for i in range(len(sample))]
+
+        for label, prompts in (("near", near), ("miss", unseen)):
+            before = cache.stats()["candidates"]
+            p50, p99, hits = time_lookups(cache, prompts)
+            candidates = (cache.stats()["candidates"] - before) / len(prompts)
+            print(
+                f"{size:>8} {label:>6} {p50:>9.1f} {p99:>9.1f} "
+                f"{hits / len(prompts):>9.0%} {candidates:>12.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -19,7 +19,7 @@ Example:
     print(f"Cost: ${response.cost}")
 """
 
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Sequence, Tuple, Union, cast
 
 from .client import (
     CostKatanaClient,
@@ -29,15 +29,36 @@ from .client import (
     from_env,
 )
 from .gateway import gateway_request_headers, GATEWAY_API_PREFIX
-from .models import ChatSession
+from .batch import BatchResult, ProgressCallback, run_batch
+from .async_client import AsyncCostKatanaClient, get_global_async_client
+from .models import (
+    ChatSession,
+    AsyncChatSession,
+    GenerateContentResponse,
+    clear_model_cache,
+)
+from .streaming import MessageStream, AsyncMessageStream
 from .exceptions import (
     CostKatanaError,
     AuthenticationError,
     ModelNotAvailableError,
     RateLimitError,
+    ClientRateLimitError,
+    CircuitOpenError,
     CostLimitExceededError,
 )
 from .config import Config
+from .rate_limit import RateLimiter, RateLimitRule
+from .cache import ResponseCache
+from .circuit_breaker import CircuitBreaker
+from .failover import FailoverPolicy
+from .hedging import HedgePolicy
+from .budget import CostBudget
+from .router import Router, ModelStats, min_cost, min_latency
+from .pool import ConnectionPool
+from .similarity import SimilarityCache
+from .timing import RequestTiming
+from .metrics import MetricsRegistry, metrics_registry, start_metrics_server
 from .logging import AILogger, ai_logger, Logger, logger
 from .templates import TemplateManager, template_manager
 from .models_constants import (
@@ -64,8 +85,10 @@ def track(entry: Dict[str, Any]) -> None:
     Manually log an AI cost entry to the Cost Katana dashboard.
 
     Calls :func:`auto_configure` so ``COST_KATANA_API_KEY`` is picked up from the
-    environment without a prior :func:`configure` call. The lazy :data:`ai_logger`
-    reads the same env vars as :class:`~cost_katana.config.Config`.
+    environment without a prior :func:`configure` call. The entry goes to the
+    global client's AILogger, so the ``ai_logging_*`` settings of its
+    :class:`~cost_katana.config.Config` apply; without a client, the lazy
+    :data:`ai_logger` (env vars only) takes it.
 
     Args:
         entry: Log fields such as ``service``, ``aiModel``, ``cost``, ``inputTokens``,
@@ -84,12 +107,29 @@ def track(entry: Dict[str, Any]) -> None:
         ... })
     """
     auto_configure()
-    ai_logger.log_ai_call(entry)
+    log = _client_ai_logger()
+    if log is not None:
+        log.log_ai_call(entry)
+
+
+def _client_ai_logger() -> Optional[Any]:
+    """
+    The global client's AILogger (None if its Config turns AI logging off),
+    or the env-configured :data:`ai_logger` when there is no client
+    """
+    try:
+        client = get_global_client()
+    except CostKatanaError:
+        return ai_logger
+    return client.ai_logger
 
 
 def create_generative_model(model_name: str, **kwargs):
     """
-    Create a generative model instance (traditional API).
+    Get a generative model instance (traditional API).
+
+    Instances are cached per client, model name and configuration, so the
+    model is validated against the catalog only on first use.
 
     Args:
         model_name: Name of the model (e.g., 'gemini-2.0-flash', 'claude-3-sonnet', 'gpt-4')
@@ -103,9 +143,9 @@ def create_generative_model(model_name: str, **kwargs):
         response = model.generate_content("Hello, world!")
     """
     client = get_global_client()
-    from .models import GenerativeModel as GM
+    from .models import get_generative_model
 
-    return GM(client, model_name, **kwargs)
+    return get_generative_model(client, model_name, **kwargs)
 
 
 # ============================================================================
@@ -113,6 +153,24 @@ def create_generative_model(model_name: str, **kwargs):
 # ============================================================================
 
 
+_AI_MODEL_NAME_WARNING = (
+    "⚠️  Deprecation Warning: Using string model names is deprecated and will be removed in a future version.\n"
+    "   Please use type-safe model constants instead for better autocomplete and error prevention:\n"
+    "   Example: from cost_katana import openai, anthropic, google\n"
+    "            response = ck.ai(openai.gpt_4, 'your prompt')\n"
+    "            response = ck.ai(anthropic.claude_3_5_sonnet_20241022, 'your prompt')\n"
+    "            response = ck.ai(google.gemini_2_5_pro, 'your prompt')"
+)
+
+_CHAT_MODEL_NAME_WARNING = (
+    "⚠️  Deprecation Warning: Using string model names is deprecated and will be removed in a future version.\n"
+    "   Please use type-safe model constants instead:\n"
+    "   Example: from cost_katana import openai, anthropic\n"
+    "            session = ck.chat(openai.gpt_4, system_message='...')\n"
+    "            session = ck.chat(anthropic.claude_3_5_sonnet_20241022, system_message='...')"
+)
+
+
 class SimpleResponse:
     """Simple response object with all the info you need."""
 
@@ -138,6 +196,15 @@ class SimpleResponse:
         self.cached = cached
         self.optimized = optimized
         self.saved_amount = 0.0
+        self.coalesced = False
+        # Set when a fallback model served the call; ``model`` is then the
+        # fallback and ``requested_model`` the one asked for
+        self.requested_model = model
+        self.failover: Optional[Dict[str, Any]] = None
+        # {"winner", "delay"} when a hedged duplicate was sent for the call
+        self.hedge: Optional[Dict[str, Any]] = None
+        # RequestTiming breakdown (ms) when the call went through generate_content
+        self.timing: Optional[RequestTiming] = None
         self.thinking = thinking
         self.templateUsed = templateUsed
 
@@ -146,12 +213,21 @@ class SimpleResponse:
 
 
 class SimpleChat:
-    """Simple chat session with automatic cost tracking (always on; no option to disable)."""
+    """
+    Simple chat session with automatic cost tracking (always on; no option to disable).
+
+    Given a :class:`Router`, the session stays on the model the router picks
+    when it starts (the conversation belongs to that model) and reports each
+    exchange back to the router.
+    """
 
     def __init__(
-        self, model: str, system_message: Optional[str] = None, **options: Any
+        self,
+        model: Union[str, Router],
+        system_message: Optional[str] = None,
+        **options: Any,
     ):
-        self.model = model
+        self.model, self.router = _route(model)
         self.system_message = system_message
         self.options = options
         self.history: List[Dict[str, str]] = []
@@ -159,7 +235,7 @@ class SimpleChat:
         self.total_tokens = 0
 
         # Use the existing GenerativeModel under the hood
-        self._gen_model = create_generative_model(model, **options)
+        self._gen_model = create_generative_model(self.model, **options)
         self._chat = self._gen_model.start_chat(
             history=[], system_message=system_message
         )
@@ -171,6 +247,8 @@ class SimpleChat:
         template_variables: Optional[Dict[str, Any]] = None,
     ) -> str:
         """Send a message and get response."""
+        import time
+
         # Handle template if provided
         actual_message = message
         if template_id:
@@ -179,7 +257,97 @@ class SimpleChat:
             )
             actual_message = resolution["prompt"]
 
-        response = self._chat.send_message(actual_message)
+        started = time.perf_counter()
+        try:
+            response = self._chat.send_message(actual_message)
+        except Exception as e:
+            if self.router is not None:
+                self.router.record_error(self.model, e)
+            raise
+        if self.router is not None:
+            self.router.record_exchange(
+                self.model, response, time.perf_counter() - started
+            )
+
+        # Track metrics
+        if hasattr(response, "usage_metadata"):
+            self.total_cost += getattr(response.usage_metadata, "cost", 0)
+            self.total_tokens += getattr(response.usage_metadata, "total_tokens", 0)
+
+        self.history.append({"role": "user", "content": message})
+        self.history.append({"role": "assistant", "content": response.text})
+
+        return response.text
+
+    def clear(self):
+        """Clear conversation history."""
+        self.history = []
+        self.total_cost = 0.0
+        self.total_tokens = 0
+        self._chat = self._gen_model.start_chat(
+            history=[], system_message=self.system_message
+        )
+
+
+class AsyncSimpleChat:
+    """Async counterpart of SimpleChat, returned by :func:`achat`."""
+
+    def __init__(
+        self,
+        model: Union[str, Router],
+        system_message: Optional[str] = None,
+        **options: Any,
+    ):
+        from .async_client import get_global_async_client
+        from .models import get_async_generative_model
+
+        self.model, self.router = _route(model)
+        self.system_message = system_message
+        self.options = options
+        self.history: List[Dict[str, str]] = []
+        self.total_cost = 0.0
+        self.total_tokens = 0
+
+        self._gen_model = get_async_generative_model(
+            get_global_async_client(), self.model, **options
+        )
+        self._chat = self._gen_model.start_chat(
+            history=[], system_message=system_message
+        )
+
+    async def send(
+        self,
+        message: str,
+        template_id: Optional[str] = None,
+        template_variables: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        """Send a message and get response."""
+        import asyncio
+        import functools
+        import time
+
+        actual_message = message
+        if template_id:
+            loop = asyncio.get_running_loop()
+            actual_message, _ = await loop.run_in_executor(
+                None,
+                functools.partial(
+                    _resolve_prompt, message, template_id, template_variables
+                ),
+            )
+
+        started = time.perf_counter()
+        try:
+            await self._gen_model._avalidate_model()
+            response = await self._chat.send_message(actual_message)
+        except Exception as e:
+            if self.router is not None:
+                self.router.record_error(self.model, e)
+            raise
+        if self.router is not None:
+            self.router.record_exchange(
+                self.model, response, time.perf_counter() - started
+            )
 
         # Track metrics
         if hasattr(response, "usage_metadata"):
@@ -202,7 +370,7 @@ class SimpleChat:
 
 
 def ai(
-    model: str,
+    model: Union[str, Router],
     prompt: str,
     template_id: Optional[str] = None,
     template_variables: Optional[Dict[str, Any]] = None,
@@ -215,7 +383,8 @@ def ai(
     Usage and cost tracking is always on; no configuration required.
 
     Args:
-        model: AI model name or constant (e.g., openai.gpt_4, 'gpt-4')
+        model: AI model name or constant (e.g., openai.gpt_4, 'gpt-4'), or
+            a :class:`Router` to pick one per call
         prompt: Your prompt text
         template_id: Optional template ID to use
         template_variables: Optional variables for template
@@ -224,7 +393,9 @@ def ai(
             - system_message (str): System prompt
             - temperature (float): 0-2, default 0.7
             - max_tokens (int): Max response tokens, default 1000
-            - cache (bool): Enable caching, default False
+            - cache (bool): Force (True) or bypass (False) the client's
+              response cache; by default only temperature-0 requests are
+              served from / stored in it
             - cortex (bool): Enable optimization, default False
             - thinking (bool): Enable Claude extended thinking for
               supported Claude models (Opus 4.x, Sonnet 4.x, Sonnet 3.7).
@@ -249,37 +420,39 @@ def ai(
         >>> print(f"Cost: ${response.cost}")
         Cost: $0.0012
     """
-    import time
     import warnings
 
     # Add deprecation warning for string model names
-    if not is_model_constant(model):
+    if not _is_routed_or_constant(model):
         warnings.warn(
-            "⚠️  Deprecation Warning: Using string model names is deprecated and will be removed in a future version.\n"
-            "   Please use type-safe model constants instead for better autocomplete and error prevention:\n"
-            "   Example: from cost_katana import openai, anthropic, google\n"
-            "            response = ck.ai(openai.gpt_4, 'your prompt')\n"
-            "            response = ck.ai(anthropic.claude_3_5_sonnet_20241022, 'your prompt')\n"
-            "            response = ck.ai(google.gemini_2_5_pro, 'your prompt')",
+            _AI_MODEL_NAME_WARNING,
             DeprecationWarning,
             stacklevel=2,
         )
 
+    return _ai_call(
+        model, prompt, template_id, template_variables, enable_ai_logging, options
+    )
+
+
+def _ai_call(
+    model: Union[str, Router],
+    prompt: str,
+    template_id: Optional[str],
+    template_variables: Optional[Dict[str, Any]],
+    enable_ai_logging: bool,
+    options: Dict[str, Any],
+) -> SimpleResponse:
+    """Body of :func:`ai` without the model-name deprecation warning."""
+    import time
+
+    model, router = _route(model)
     start_time = time.time()
-    actual_prompt = prompt
-    template_used = False
-    template_name_val = None
 
     try:
-        # Handle template if provided
-        if template_id:
-            resolution = template_manager.resolve_template(
-                template_id, template_variables or {}
-            )
-            actual_prompt = resolution["prompt"]
-            template_used = True
-            template_name_val = resolution["template"].get("name")
-            logger.debug(f"Template resolved: {template_id}")
+        actual_prompt, template_name_val = _resolve_prompt(
+            prompt, template_id, template_variables
+        )
 
         # Get or create model
         gen_model = create_generative_model(model)
@@ -287,92 +460,424 @@ def ai(
         # Generate content
         response = gen_model.generate_content(actual_prompt, **options)
 
-        # Extract metadata
-        cost = (
-            getattr(response.usage_metadata, "cost", 0.0)
-            if hasattr(response, "usage_metadata")
-            else 0.0
+        simple_response = _finish_ai_call(
+            model,
+            response,
+            actual_prompt,
+            start_time,
+            enable_ai_logging,
+            options,
+            template_id,
+            template_name_val,
+            template_variables,
         )
-        tokens = (
-            getattr(response.usage_metadata, "total_tokens", 0)
-            if hasattr(response, "usage_metadata")
-            else 0
+
+    except Exception as e:
+        if router is not None:
+            router.record_error(model, e)
+        raise _ai_request_error(e)
+
+    if router is not None:
+        router.record_response(model, simple_response, time.time() - start_time)
+    return simple_response
+
+
+def ai_stream(
+    model: Union[str, Router],
+    prompt: str,
+    template_id: Optional[str] = None,
+    template_variables: Optional[Dict[str, Any]] = None,
+    enable_ai_logging: bool = True,
+    **options: Any,
+) -> MessageStream:
+    """
+    Stream a completion as it is generated.
+
+    Same arguments as :func:`ai`. Iterating the returned stream yields text
+    chunks; afterwards ``stream.text``, ``stream.usage`` (cost, tokens),
+    ``stream.thinking``, ``stream.time_to_first_token`` and
+    ``stream.tokens_per_second`` are available. The call is logged once the
+    stream has been fully consumed.
+
+    Example:
+        >>> stream = ck.ai_stream(openai.gpt_4o, 'Write a haiku')
+        >>> for chunk in stream:
+        ...     print(chunk, end='', flush=True)
+        >>> print(stream.usage.get('cost'), stream.time_to_first_token)
+    """
+    import time
+    import warnings
+
+    if not _is_routed_or_constant(model):
+        warnings.warn(_AI_MODEL_NAME_WARNING, DeprecationWarning, stacklevel=2)
+
+    model, router = _route(model)
+    start_time = time.time()
+    try:
+        actual_prompt, template_name_val = _resolve_prompt(
+            prompt, template_id, template_variables
         )
-        cached = (
-            getattr(response.usage_metadata, "cache_hit", False)
-            if hasattr(response, "usage_metadata")
-            else False
+        gen_model = create_generative_model(model)
+        stream = gen_model.generate_content(actual_prompt, stream=True, **options)
+    except Exception as e:
+        if router is not None:
+            router.record_error(model, e)
+        raise _ai_request_error(e)
+
+    if router is not None:
+        stream.add_done_callback(lambda s: router.record_stream(model, s))
+
+    if enable_ai_logging:
+        stream.add_done_callback(
+            lambda s: _finish_ai_call(
+                model,
+                GenerateContentResponse(s.response_data),
+                actual_prompt,
+                start_time,
+                enable_ai_logging,
+                options,
+                template_id,
+                template_name_val,
+                template_variables,
+            )
         )
+    return stream
+
+
+def ai_batch(
+    model: Union[str, Router],
+    prompts: Sequence[str],
+    concurrency: int = 8,
+    progress: Optional[ProgressCallback] = None,
+    template_id: Optional[str] = None,
+    template_variables: Optional[Dict[str, Any]] = None,
+    enable_ai_logging: bool = True,
+    **options: Any,
+) -> BatchResult[SimpleResponse]:
+    """
+    Run many prompts through :func:`ai` with bounded concurrency.
+
+    All requests share the global client's connection pool. Results come back
+    in input order; a failing prompt does not abort the batch — its exception
+    is recorded in ``errors`` and its result is ``None``.
+
+    Args:
+        model: AI model name or constant, or a :class:`Router` (which picks
+            a model for each prompt)
+        prompts: Prompts to run
+        concurrency: Maximum requests in flight (default: 8)
+        progress: Optional ``progress(completed, total)`` callback
+        template_id / template_variables / enable_ai_logging / **options:
+            Same as :func:`ai`, applied to every prompt
+
+    Returns:
+        BatchResult of SimpleResponse, with ``total_cost``, ``total_tokens``,
+        ``throughput`` and ``summary()``.
+
+    Example:
+        >>> batch = ck.ai_batch(openai.gpt_4o_mini, prompts, concurrency=16)
+        >>> labels = [r.text if r else None for r in batch]
+        >>> print(batch.summary())
+    """
+    import warnings
+
+    if not _is_routed_or_constant(model):
+        warnings.warn(_AI_MODEL_NAME_WARNING, DeprecationWarning, stacklevel=2)
+
+    return run_batch(
+        lambda prompt: _ai_call(
+            model, prompt, template_id, template_variables, enable_ai_logging, options
+        ),
+        prompts,
+        concurrency,
+        lambda response: (response.cost, response.tokens),
+        progress,
+    )
+
+
+async def aai_stream(
+    model: Union[str, Router],
+    prompt: str,
+    template_id: Optional[str] = None,
+    template_variables: Optional[Dict[str, Any]] = None,
+    enable_ai_logging: bool = True,
+    **options: Any,
+) -> AsyncMessageStream:
+    """
+    Async counterpart of :func:`ai_stream`.
 
-        # Determine provider from model name
-        provider = _infer_provider(model)
-        response_time = int((time.time() - start_time) * 1000)
-
-        # Log AI call if enabled
-        if enable_ai_logging:
-            ai_logger.log_ai_call(
-                {
-                    "service": provider,
-                    "operation": "chat_completion",
-                    "aiModel": model,
-                    "statusCode": 200,
-                    "responseTime": response_time,
-                    "prompt": actual_prompt,
-                    "result": response.text,
-                    "inputTokens": (
-                        getattr(response.usage_metadata, "prompt_tokens", 0)
-                        if hasattr(response, "usage_metadata")
-                        else 0
-                    ),
-                    "outputTokens": (
-                        getattr(response.usage_metadata, "completion_tokens", 0)
-                        if hasattr(response, "usage_metadata")
-                        else 0
-                    ),
-                    "totalTokens": tokens,
-                    "cost": cost,
-                    "success": True,
-                    "cacheHit": cached,
-                    "cortexEnabled": options.get("cortex", False),
-                    "templateId": template_id,
-                    "templateName": template_name_val,
-                    "templateVariables": template_variables,
-                }
+    Example:
+        >>> stream = await ck.aai_stream(openai.gpt_4o, 'Write a haiku')
+        >>> async for chunk in stream:
+        ...     print(chunk, end='', flush=True)
+    """
+    import asyncio
+    import functools
+    import time
+    import warnings
+    from .async_client import get_global_async_client
+    from .models import get_async_generative_model
+
+    if not _is_routed_or_constant(model):
+        warnings.warn(_AI_MODEL_NAME_WARNING, DeprecationWarning, stacklevel=2)
+
+    model, router = _route(model)
+    start_time = time.time()
+    try:
+        actual_prompt, template_name_val = prompt, None
+        if template_id:
+            loop = asyncio.get_running_loop()
+            actual_prompt, template_name_val = await loop.run_in_executor(
+                None,
+                functools.partial(
+                    _resolve_prompt, prompt, template_id, template_variables
+                ),
+            )
+        gen_model = get_async_generative_model(get_global_async_client(), model)
+        stream = cast(
+            AsyncMessageStream,
+            await gen_model.generate_content(actual_prompt, stream=True, **options),
+        )
+    except Exception as e:
+        if router is not None:
+            router.record_error(model, e)
+        raise _ai_request_error(e)
+
+    if router is not None:
+        stream.add_done_callback(lambda s: router.record_stream(model, s))
+
+    if enable_ai_logging:
+        stream.add_done_callback(
+            lambda s: _finish_ai_call(
+                model,
+                GenerateContentResponse(s.response_data),
+                actual_prompt,
+                start_time,
+                enable_ai_logging,
+                options,
+                template_id,
+                template_name_val,
+                template_variables,
             )
+        )
+    return stream
+
+
+def _resolve_prompt(
+    prompt: str,
+    template_id: Optional[str],
+    template_variables: Optional[Dict[str, Any]],
+) -> Tuple[str, Optional[str]]:
+    """Resolve a template if given; returns (prompt, template name)."""
+    if not template_id:
+        return prompt, None
+    resolution = template_manager.resolve_template(
+        template_id, template_variables or {}
+    )
+    logger.debug(f"Template resolved: {template_id}")
+    return resolution["prompt"], resolution["template"].get("name")
+
+
+def _finish_ai_call(
+    model: str,
+    response: Any,
+    actual_prompt: str,
+    start_time: float,
+    enable_ai_logging: bool,
+    options: Dict[str, Any],
+    template_id: Optional[str],
+    template_name_val: Optional[str],
+    template_variables: Optional[Dict[str, Any]],
+) -> SimpleResponse:
+    """Log an ai()/aai() call and wrap its response in a SimpleResponse."""
+    import time
 
-        result = SimpleResponse(
-            text=response.text,
-            cost=cost,
-            tokens=tokens,
-            model=model,
-            provider=provider,
-            cached=cached,
-            optimized=options.get("cortex", False),
-            thinking=getattr(response, "thinking", None),
-            templateUsed=template_used,
+    # Extract metadata
+    cost = (
+        getattr(response.usage_metadata, "cost", 0.0)
+        if hasattr(response, "usage_metadata")
+        else 0.0
+    )
+    tokens = (
+        getattr(response.usage_metadata, "total_tokens", 0)
+        if hasattr(response, "usage_metadata")
+        else 0
+    )
+    cached = (
+        getattr(response.usage_metadata, "cache_hit", False)
+        if hasattr(response, "usage_metadata")
+        else False
+    )
+    # A local cache hit or a coalesced call sent no request of its own, so
+    # nothing was billed for it
+    coalesced = getattr(response, "coalesced", False)
+    saved_amount = 0.0
+    if getattr(response, "local_cache_hit", False) or coalesced:
+        saved_amount, cost = cost, 0.0
+
+    # Attribute the call to the model that served it (a failover fallback
+    # may have stood in for the requested one)
+    failover = getattr(response, "failover", None)
+    hedge = getattr(response, "hedge", None)
+    served_model = failover["to"] if failover else model
+
+    # Determine provider from model name
+    provider = _infer_provider(served_model)
+    response_time = int((time.time() - start_time) * 1000)
+
+    # Phases measured by the client, widened to the whole ai() call (the
+    # logged breakdown is taken before the entry itself is redacted)
+    timing = getattr(response, "timing", None)
+    if timing is not None:
+        timing.finish((time.time() - start_time) * 1000)
+
+    # Log AI call if enabled
+    ai_log = _client_ai_logger() if enable_ai_logging else None
+    if ai_log is not None:
+        ai_log.log_ai_call(
+            {
+                "service": provider,
+                "operation": "chat_completion",
+                "aiModel": served_model,
+                "requestedModel": model,
+                "failover": failover,
+                "hedge": hedge,
+                "statusCode": 200,
+                "responseTime": response_time,
+                "prompt": actual_prompt,
+                "result": response.text,
+                "inputTokens": (
+                    getattr(response.usage_metadata, "prompt_tokens", 0)
+                    if hasattr(response, "usage_metadata")
+                    else 0
+                ),
+                "outputTokens": (
+                    getattr(response.usage_metadata, "completion_tokens", 0)
+                    if hasattr(response, "usage_metadata")
+                    else 0
+                ),
+                "totalTokens": tokens,
+                "cost": cost,
+                "success": True,
+                "cacheHit": cached,
+                "coalesced": coalesced,
+                "latencyBreakdown": timing.to_log() if timing is not None else None,
+                "cortexEnabled": options.get("cortex", False),
+                "templateId": template_id,
+                "templateName": template_name_val,
+                "templateVariables": template_variables,
+            }
         )
-        return result
 
-    except Exception as e:
-        raise CostKatanaError(
-            f"AI request failed: {str(e)}\n\n"
-            f"Troubleshooting:\n"
-            f"1. Check your API key is set correctly\n"
-            f"2. Verify the model name is correct\n"
-            f"3. Ensure you have internet connection\n"
-            f"4. Check your Cost Katana dashboard for usage limits\n\n"
-            f"Get help at: https://docs.costkatana.com/python"
+    simple_response = SimpleResponse(
+        text=response.text,
+        cost=cost,
+        tokens=tokens,
+        model=served_model,
+        provider=provider,
+        cached=cached,
+        optimized=options.get("cortex", False),
+        thinking=getattr(response, "thinking", None),
+        templateUsed=bool(template_id),
+    )
+    simple_response.saved_amount = saved_amount
+    simple_response.coalesced = coalesced
+    simple_response.requested_model = model
+    simple_response.failover = failover
+    simple_response.hedge = hedge
+    if timing is not None:
+        simple_response.timing = timing.finish((time.time() - start_time) * 1000)
+    return simple_response
+
+
+def _ai_request_error(e: Exception) -> CostKatanaError:
+    return CostKatanaError(
+        f"AI request failed: {str(e)}\n\n"
+        f"Troubleshooting:\n"
+        f"1. Check your API key is set correctly\n"
+        f"2. Verify the model name is correct\n"
+        f"3. Ensure you have internet connection\n"
+        f"4. Check your Cost Katana dashboard for usage limits\n\n"
+        f"Get help at: https://docs.costkatana.com/python"
+    )
+
+
+async def aai(
+    model: Union[str, Router],
+    prompt: str,
+    template_id: Optional[str] = None,
+    template_variables: Optional[Dict[str, Any]] = None,
+    enable_ai_logging: bool = True,
+    **options: Any,
+) -> SimpleResponse:
+    """
+    Async counterpart of :func:`ai` — same arguments, same SimpleResponse.
+
+    Runs on :class:`AsyncCostKatanaClient`, so many calls can share one event loop.
+
+    Example:
+        >>> response = await ck.aai(openai.gpt_4o, 'Hello, world!')
+        >>> print(response.text)
+    """
+    import asyncio
+    import functools
+    import time
+    import warnings
+    from .async_client import get_global_async_client
+    from .models import get_async_generative_model
+
+    if not _is_routed_or_constant(model):
+        warnings.warn(_AI_MODEL_NAME_WARNING, DeprecationWarning, stacklevel=2)
+
+    model, router = _route(model)
+    start_time = time.time()
+
+    try:
+        actual_prompt, template_name_val = prompt, None
+        if template_id:
+            # Template backend fetches are synchronous; keep them off the loop
+            loop = asyncio.get_running_loop()
+            actual_prompt, template_name_val = await loop.run_in_executor(
+                None,
+                functools.partial(
+                    _resolve_prompt, prompt, template_id, template_variables
+                ),
+            )
+
+        gen_model = get_async_generative_model(get_global_async_client(), model)
+        response = await gen_model.generate_content(actual_prompt, **options)
+
+        simple_response = _finish_ai_call(
+            model,
+            response,
+            actual_prompt,
+            start_time,
+            enable_ai_logging,
+            options,
+            template_id,
+            template_name_val,
+            template_variables,
         )
 
+    except Exception as e:
+        if router is not None:
+            router.record_error(model, e)
+        raise _ai_request_error(e)
+
+    if router is not None:
+        router.record_response(model, simple_response, time.time() - start_time)
+    return simple_response
+
 
 def chat(
-    model: str, system_message: Optional[str] = None, **options: Any
+    model: Union[str, Router], system_message: Optional[str] = None, **options: Any
 ) -> SimpleChat:
     """
     Create a chat session with conversation history.
 
     Args:
-        model: AI model name or constant (e.g., openai.gpt_4, 'gpt-4')
+        model: AI model name or constant (e.g., openai.gpt_4, 'gpt-4'), or
+            a :class:`Router` to pick the session's model
         system_message: Optional system prompt for the session
         **options: Additional options (temperature, max_tokens, etc.)
 
@@ -393,13 +898,9 @@ def chat(
     import warnings
 
     # Add deprecation warning for string model names
-    if not is_model_constant(model):
+    if not _is_routed_or_constant(model):
         warnings.warn(
-            "⚠️  Deprecation Warning: Using string model names is deprecated and will be removed in a future version.\n"
-            "   Please use type-safe model constants instead:\n"
-            "   Example: from cost_katana import openai, anthropic\n"
-            "            session = ck.chat(openai.gpt_4, system_message='...')\n"
-            "            session = ck.chat(anthropic.claude_3_5_sonnet_20241022, system_message='...')",
+            _CHAT_MODEL_NAME_WARNING,
             DeprecationWarning,
             stacklevel=2,
         )
@@ -407,6 +908,37 @@ def chat(
     return SimpleChat(model, system_message, **options)
 
 
+def achat(
+    model: Union[str, Router], system_message: Optional[str] = None, **options: Any
+) -> AsyncSimpleChat:
+    """
+    Async counterpart of :func:`chat`.
+
+    Example:
+        >>> session = ck.achat(openai.gpt_4)
+        >>> await session.send('Hello!')
+        'Hi! How can I help you today?'
+    """
+    import warnings
+
+    if not _is_routed_or_constant(model):
+        warnings.warn(_CHAT_MODEL_NAME_WARNING, DeprecationWarning, stacklevel=2)
+
+    return AsyncSimpleChat(model, system_message, **options)
+
+
+def _route(model: Union[str, Router]) -> Tuple[str, Optional[Router]]:
+    """The model to call, and the Router that picked it if ``model`` is one."""
+    if isinstance(model, Router):
+        return model.select(), model
+    return model, None
+
+
+def _is_routed_or_constant(model: Union[str, Router]) -> bool:
+    # Routers hold their own candidates, so there is no model name to warn about
+    return isinstance(model, Router) or is_model_constant(model)
+
+
 def _infer_provider(model: str) -> str:
     """Infer provider from model name."""
     model_lower = model.lower()
@@ -435,6 +967,14 @@ __all__ = [
     # Simple API (recommended)
     "ai",
     "chat",
+    "aai",
+    "achat",
+    "ai_batch",
+    "ai_stream",
+    "aai_stream",
+    "BatchResult",
+    "MessageStream",
+    "AsyncMessageStream",
     "configure",
     "auto_configure",
     "from_env",
@@ -457,7 +997,11 @@ __all__ = [
     "GenerativeModel",
     "create_generative_model",
     "ChatSession",
+    "AsyncChatSession",
     "CostKatanaClient",
+    "AsyncCostKatanaClient",
+    "get_global_async_client",
+    "clear_model_cache",
     # Logging & Templates
     "AILogger",
     "ai_logger",
@@ -470,9 +1014,28 @@ __all__ = [
     "AuthenticationError",
     "ModelNotAvailableError",
     "RateLimitError",
+    "ClientRateLimitError",
+    "CircuitOpenError",
     "CostLimitExceededError",
     # Config
     "Config",
+    "RateLimiter",
+    "ResponseCache",
+    "CircuitBreaker",
+    "FailoverPolicy",
+    "HedgePolicy",
+    "CostBudget",
+    "Router",
+    "ModelStats",
+    "min_latency",
+    "min_cost",
+    "ConnectionPool",
+    "SimilarityCache",
+    "RequestTiming",
+    "MetricsRegistry",
+    "metrics_registry",
+    "start_metrics_server",
+    "RateLimitRule",
     # Gateway (direct HTTP to /api/gateway)
     "gateway_request_headers",
     "GATEWAY_API_PREFIX",
@@ -0,0 +1,463 @@
+"""
+Cost Katana async HTTP client
+asyncio counterpart of CostKatanaClient, built on httpx.AsyncClient
+"""
+
+import asyncio
+import functools
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import httpx
+
+from .budget import CostBudget
+from .cache import ResponseCache
+from .catalog import AsyncModelCatalog
+from .circuit_breaker import CircuitBreaker
+from .client import _BaseClient, _response_usage, _send_error, get_global_client
+from .config import Config
+from .exceptions import CostKatanaError
+from .failover import FailoverPolicy, arun_with_failover
+from .hedging import HedgePolicy, arun_hedged
+from .logging import AILogger
+from .gateway import GATEWAY_API_PREFIX
+from .rate_limit import RateLimiter, estimate_request_tokens
+from .metrics import record_usage, track_request
+from .pool import ConnectionPool
+from .retry import get_last_attempts
+from .similarity import SimilarityCache
+from .singleflight import AsyncSingleFlight, mark_coalesced
+from .streaming import AsyncMessageStream, aiter_sse_events
+from .timing import async_timing_hooks, attach_timing
+
+_global_async_client: Optional["AsyncCostKatanaClient"] = None
+_global_async_source: Optional[object] = None
+
+
+def get_global_async_client() -> "AsyncCostKatanaClient":
+    """
+    Return an AsyncCostKatanaClient sharing the global client's configuration.
+
+    Rebuilt whenever :func:`cost_katana.configure` replaces the global client.
+    """
+    global _global_async_client, _global_async_source
+    sync_client = get_global_client()
+    if _global_async_client is None or _global_async_source is not sync_client:
+        if _global_async_client is not None:
+            from .models import discard_cached_models
+
+            discard_cached_models(_global_async_client)
+        _global_async_client = AsyncCostKatanaClient(
+            config=sync_client.config,
+            rate_limiter=sync_client.rate_limiter,
+            response_cache=sync_client.response_cache,
+            similarity_cache=sync_client.similarity_cache,
+            connection_pool=sync_client.connection_pool,
+            circuit_breaker=sync_client.circuit_breaker,
+            failover_policy=sync_client.failover_policy,
+            hedge_policy=sync_client.hedge_policy,
+            cost_budget=sync_client.cost_budget,
+            # One logger per Config: a WAL directory can't have two writers
+            ai_logger=sync_client.ai_logger,
+        )
+        _global_async_source = sync_client
+    return _global_async_client
+
+
+class AsyncCostKatanaClient(_BaseClient):
+    """
+    Async HTTP client for Cost Katana API.
+
+    Same configuration, payloads and exception mapping as CostKatanaClient;
+    every request method is a coroutine, so one event loop can drive many
+    concurrent calls without a thread per request.
+
+    Example:
+        async with AsyncCostKatanaClient.from_env() as client:
+            data = await client.send_message("Hello", model_id="amazon.nova-lite-v1:0")
+    """
+
+    single_flight: AsyncSingleFlight
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None,
+        config_file: Optional[str] = None,
+        timeout: Optional[int] = None,
+        config: Optional[Config] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        response_cache: Optional[ResponseCache] = None,
+        similarity_cache: Optional[SimilarityCache] = None,
+        connection_pool: Optional[ConnectionPool] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        failover_policy: Optional[FailoverPolicy] = None,
+        hedge_policy: Optional[HedgePolicy] = None,
+        cost_budget: Optional[CostBudget] = None,
+        ai_logger: Optional[AILogger] = None,
+        **kwargs,
+    ):
+        super().__init__(
+            api_key=api_key,
+            base_url=base_url,
+            config_file=config_file,
+            timeout=timeout,
+            config=config,
+            rate_limiter=rate_limiter,
+            response_cache=response_cache,
+            similarity_cache=similarity_cache,
+            connection_pool=connection_pool,
+            circuit_breaker=circuit_breaker,
+            failover_policy=failover_policy,
+            hedge_policy=hedge_policy,
+            cost_budget=cost_budget,
+            ai_logger=ai_logger,
+            **kwargs,
+        )
+
+        # Initialize HTTP client (pool limits from the config)
+        self.client = self.connection_pool.async_client(
+            base_url=self.config.base_url,
+            headers=self.headers,
+            timeout=self.timeout,
+            event_hooks=async_timing_hooks(),
+        )
+
+        # Coalesces identical concurrent send_message calls on this loop
+        self.single_flight = AsyncSingleFlight()
+
+        # Cached model catalog (TTL + ETag revalidation)
+        self.model_catalog = AsyncModelCatalog(
+            fetch=self._fetch_model_catalog,
+            ttl=self.config.model_catalog_ttl,
+            stale_ttl=self.config.model_catalog_stale_ttl,
+            persist_path=self.config.model_catalog_path,
+            scope=self._catalog_scope,
+        )
+
+    @classmethod
+    def from_env(cls) -> "AsyncCostKatanaClient":
+        """Zero-config client from COST_KATANA_API_KEY and optional PROJECT_ID."""
+        return cls(config=Config.from_env())
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.aclose()
+
+    async def aclose(self):
+        """Close the HTTP client"""
+        from .models import discard_cached_models
+
+        discard_cached_models(self)
+        if hasattr(self, "client"):
+            await self.client.aclose()
+
+    async def _request(self, method: str, path: str, **kwargs) -> httpx.Response:
+        """Send a request through the retry policy"""
+        return await self.retry_policy.arun(
+            method,
+            path,
+            lambda timeout: self.client.request(
+                method, path, timeout=timeout, **kwargs
+            ),
+            timeout=self.timeout,
+        )
+
+    async def _fetch_model_catalog(
+        self, etag: Optional[str]
+    ) -> Tuple[Optional[List[Dict[str, Any]]], Optional[str]]:
+        """Fetch /api/chat/models; returns (None, etag) on 304 Not Modified"""
+        try:
+            headers = {"If-None-Match": etag} if etag else None
+            response = await self._request("GET", "/api/chat/models", headers=headers)
+            if response.status_code == 304:
+                return None, response.headers.get("ETag", etag)
+            data = self._handle_response(response)
+            return data.get("data", []), response.headers.get("ETag")
+        except Exception as e:
+            if isinstance(e, CostKatanaError):
+                raise
+            raise CostKatanaError(f"Failed to get models: {str(e)}")
+
+    async def get_available_models(
+        self, force_refresh: bool = False
+    ) -> List[Dict[str, Any]]:
+        """Get list of available models (served from the model catalog cache)"""
+        return await self.model_catalog.get_models(force_refresh=force_refresh)
+
+    async def find_model(self, model_id: str) -> Optional[Dict[str, Any]]:
+        """Look up a catalog model by id or alias"""
+        return await self.model_catalog.find(model_id)
+
+    async def _resolve_template(
+        self, template_id: str, template_variables: Optional[Dict[str, Any]]
+    ) -> str:
+        # TemplateManager is synchronous; keep backend fetches off the event loop
+        loop = asyncio.get_running_loop()
+        resolution = await loop.run_in_executor(
+            None,
+            functools.partial(
+                self.template_manager.resolve_template,
+                template_id,
+                template_variables or {},
+            ),
+        )
+        return resolution["prompt"]
+
+    async def _prepare_payload(
+        self,
+        message: str,
+        model_id: str,
+        template_id: Optional[str] = None,
+        template_variables: Optional[Dict[str, Any]] = None,
+        max_tokens: int = 2000,
+        **kwargs,
+    ) -> Dict[str, Any]:
+        """Resolve the template, apply client-side rate limits and build the payload"""
+        # Handle template if provided
+        actual_message = message
+        if template_id and self.template_manager:
+            actual_message = await self._resolve_template(
+                template_id, template_variables
+            )
+
+        if self.rate_limiter:
+            await self.rate_limiter.aacquire(
+                model_id,
+                self.config.project_id,
+                estimate_request_tokens(actual_message, max_tokens),
+            )
+
+        return self._build_message_payload(
+            actual_message,
+            model_id,
+            max_tokens=max_tokens,
+            template_id=template_id,
+            template_variables=template_variables,
+            **kwargs,
+        )
+
+    async def send_message(
+        self,
+        message: str,
+        model_id: str,
+        conversation_id: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: int = 2000,
+        chat_mode: str = "balanced",
+        use_multi_agent: bool = False,
+        template_id: Optional[str] = None,
+        template_variables: Optional[Dict[str, Any]] = None,
+        thinking: Optional[bool] = None,
+        thinking_effort: Optional[str] = None,
+        thinking_budget_tokens: Optional[int] = None,
+        **kwargs,
+    ) -> Dict[str, Any]:
+        """
+        Send a message to the AI model via Cost Katana.
+
+        Arguments and return value match :meth:`CostKatanaClient.send_message`.
+        """
+        request = dict(
+            conversation_id=conversation_id,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            chat_mode=chat_mode,
+            use_multi_agent=use_multi_agent,
+            template_id=template_id,
+            template_variables=template_variables,
+            thinking=thinking,
+            thinking_effort=thinking_effort,
+            thinking_budget_tokens=thinking_budget_tokens,
+            **kwargs,
+        )
+
+        async def send(model: str) -> Dict[str, Any]:
+            started = time.perf_counter()
+            self._check_circuit(model, "/api/chat/message")
+            payload = await self._prepare_payload(message, model, **request)
+            with self._budget_call(model, payload) as reservation:
+                try:
+                    with self._circuit_call(model, "/api/chat/message") as outcome:
+                        response = await self._request(
+                            "POST", "/api/chat/message", json=payload
+                        )
+                        outcome.status = response.status_code
+                        result = self._handle_response(response)
+                except Exception as e:
+                    if isinstance(e, CostKatanaError):
+                        raise
+                    raise _send_error(e)
+                if reservation is not None:
+                    reservation.settle(_response_usage(result)[0])
+            record_usage(model, result)
+            return attach_timing(result, response, started, get_last_attempts())
+
+        async def hedged(model: str) -> Dict[str, Any]:
+            policy = self._hedge_policy_for(request)
+            if policy is None:
+                return await send(model)
+            return await arun_hedged(
+                policy,
+                model,
+                functools.partial(send, model),
+                lambda result: self._log_discarded_hedge(model, result),
+            )
+
+        async def run(model: str) -> Dict[str, Any]:
+            key = self._coalesce_key(message, model, request)
+            if key is None:
+                return await hedged(model)
+            result, coalesced = await self.single_flight.do(
+                key, functools.partial(hedged, model)
+            )
+            return mark_coalesced(result) if coalesced else result
+
+        with track_request(model_id):
+            return await arun_with_failover(
+                self._failover_chain(model_id, conversation_id),
+                run,
+                self._failover_reasons,
+            )
+
+    async def stream_message(
+        self,
+        message: str,
+        model_id: str,
+        conversation_id: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: int = 2000,
+        chat_mode: str = "balanced",
+        use_multi_agent: bool = False,
+        template_id: Optional[str] = None,
+        template_variables: Optional[Dict[str, Any]] = None,
+        thinking: Optional[bool] = None,
+        thinking_effort: Optional[str] = None,
+        thinking_budget_tokens: Optional[int] = None,
+        **kwargs,
+    ) -> AsyncMessageStream:
+        """
+        Stream a reply as server-sent events.
+
+        Async counterpart of :meth:`CostKatanaClient.stream_message`.
+
+        Example:
+            stream = await client.stream_message("Hello", "amazon.nova-lite-v1:0")
+            async for chunk in stream:
+                print(chunk, end="", flush=True)
+        """
+        started = time.perf_counter()
+        payload = await self._prepare_payload(
+            message,
+            model_id,
+            conversation_id=conversation_id,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            chat_mode=chat_mode,
+            use_multi_agent=use_multi_agent,
+            template_id=template_id,
+            template_variables=template_variables,
+            thinking=thinking,
+            thinking_effort=thinking_effort,
+            thinking_budget_tokens=thinking_budget_tokens,
+            stream=True,
+            **kwargs,
+        )
+        stream = AsyncMessageStream(self._stream_events(payload), started)
+        self._budget_stream(model_id, payload, stream)
+        return stream
+
+    async def _stream_events(
+        self, payload: Dict[str, Any]
+    ) -> AsyncIterator[Dict[str, Any]]:
+        path = "/api/chat/message"
+        try:
+            response = await self.retry_policy.arun(
+                "POST",
+                path,
+                lambda timeout: self.client.send(
+                    self.client.build_request(
+                        "POST",
+                        path,
+                        json=payload,
+                        headers={"Accept": "text/event-stream"},
+                        timeout=timeout,
+                    ),
+                    stream=True,
+                ),
+                timeout=self.timeout,
+            )
+        except Exception as e:
+            raise CostKatanaError(f"Failed to stream message: {str(e)}")
+
+        try:
+            if not response.is_success:
+                await response.aread()
+                self._handle_response(response)
+            async for event in aiter_sse_events(response.aiter_lines()):
+                yield event
+        except CostKatanaError:
+            raise
+        except Exception as e:
+            raise CostKatanaError(f"Failed to stream message: {str(e)}")
+        finally:
+            await response.aclose()
+
+    async def create_conversation(
+        self, title: Optional[str] = None, model_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Create a new conversation"""
+        payload = {}
+        if title:
+            payload["title"] = title
+        if model_id:
+            payload["modelId"] = model_id
+
+        try:
+            response = await self._request(
+                "POST", "/api/chat/conversations", json=payload
+            )
+            return self._handle_response(response)
+        except Exception as e:
+            if isinstance(e, CostKatanaError):
+                raise
+            raise CostKatanaError(f"Failed to create conversation: {str(e)}")
+
+    async def get_conversation_history(self, conversation_id: str) -> Dict[str, Any]:
+        """Get conversation history"""
+        try:
+            response = await self._request(
+                "GET", f"/api/chat/conversations/{conversation_id}/history"
+            )
+            return self._handle_response(response)
+        except Exception as e:
+            if isinstance(e, CostKatanaError):
+                raise
+            raise CostKatanaError(f"Failed to get conversation history: {str(e)}")
+
+    async def delete_conversation(self, conversation_id: str) -> Dict[str, Any]:
+        """Delete a conversation"""
+        try:
+            response = await self._request(
+                "DELETE", f"/api/chat/conversations/{conversation_id}"
+            )
+            return self._handle_response(response)
+        except Exception as e:
+            if isinstance(e, CostKatanaError):
+                raise
+            raise CostKatanaError(f"Failed to delete conversation: {str(e)}")
+
+    async def get_gateway_security_summary(self) -> Dict[str, Any]:
+        """Fetch aggregated gateway security stats (``GET /api/gateway/security/summary``)."""
+        try:
+            response = await self._request(
+                "GET", f"{GATEWAY_API_PREFIX}/security/summary"
+            )
+            data = self._handle_response(response)
+            return data.get("data", data)
+        except Exception as e:
+            if isinstance(e, CostKatanaError):
+                raise
+            raise CostKatanaError(f"Failed to get gateway security summary: {str(e)}")
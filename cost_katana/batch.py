@@ -0,0 +1,133 @@
+"""
+Batch execution for Cost Katana
+Bounded thread-pool fan-out with ordered results and per-item error capture
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Generic,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# progress(completed, total) — called on the caller's thread
+ProgressCallback = Callable[[int, int], None]
+
+
+class BatchResult(Generic[R]):
+    """
+    Ordered results of a batch run.
+
+    ``results[i]`` and ``errors[i]`` correspond to input ``i``; exactly one of
+    them is set. Iterating yields the results (``None`` for failed items).
+    """
+
+    def __init__(
+        self,
+        results: List[Optional[R]],
+        errors: List[Optional[BaseException]],
+        elapsed: float,
+        measure: Callable[[R], Tuple[float, int]],
+    ):
+        self.results = results
+        self.errors = errors
+        self.elapsed = elapsed
+
+        self.total_cost = 0.0
+        self.total_tokens = 0
+        for result in results:
+            if result is not None:
+                cost, tokens = measure(result)
+                self.total_cost += cost
+                self.total_tokens += tokens
+
+    @property
+    def succeeded(self) -> int:
+        return sum(1 for e in self.errors if e is None)
+
+    @property
+    def failed(self) -> int:
+        return len(self.errors) - self.succeeded
+
+    @property
+    def throughput(self) -> float:
+        """Completed items per second"""
+        return len(self.results) / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def tokens_per_second(self) -> float:
+        return self.total_tokens / self.elapsed if self.elapsed > 0 else 0.0
+
+    def summary(self) -> Dict[str, Any]:
+        """Aggregate cost, tokens and throughput"""
+        return {
+            "total": len(self.results),
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "total_cost": self.total_cost,
+            "total_tokens": self.total_tokens,
+            "elapsed": self.elapsed,
+            "items_per_second": self.throughput,
+            "tokens_per_second": self.tokens_per_second,
+        }
+
+    def __len__(self) -> int:
+        return len(self.results)
+
+    def __getitem__(self, index: int) -> Optional[R]:
+        return self.results[index]
+
+    def __iter__(self) -> Iterator[Optional[R]]:
+        return iter(self.results)
+
+    def __repr__(self) -> str:
+        return (
+            f"<BatchResult {self.succeeded}/{len(self.results)} ok "
+            f"cost=${self.total_cost:.4f} {self.throughput:.1f} items/s>"
+        )
+
+
+def run_batch(
+    func: Callable[[T], R],
+    items: Sequence[T],
+    concurrency: int,
+    measure: Callable[[R], Tuple[float, int]],
+    progress: Optional[ProgressCallback] = None,
+) -> BatchResult[R]:
+    """Run ``func`` over ``items`` on at most ``concurrency`` threads"""
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+
+    total = len(items)
+    results: List[Optional[R]] = [None] * total
+    errors: List[Optional[BaseException]] = [None] * total
+    started = time.perf_counter()
+
+    with ThreadPoolExecutor(
+        max_workers=min(concurrency, max(total, 1)),
+        thread_name_prefix="cost-katana-batch",
+    ) as executor:
+        futures = {executor.submit(func, item): i for i, item in enumerate(items)}
+        completed = 0
+        for future in as_completed(futures):
+            index = futures[future]
+            try:
+                results[index] = future.result()
+            except Exception as e:
+                errors[index] = e
+            completed += 1
+            if progress:
+                progress(completed, total)
+
+    return BatchResult(results, errors, time.perf_counter() - started, measure)
@@ -0,0 +1,354 @@
+"""
+Client-side cost budgets for Cost Katana
+Enforces Config.cost_limit_per_request / cost_limit_per_day locally: a
+ledger of the spend reported in responses over a rolling window, and a
+pre-send estimate from a pricing table so over-budget requests are refused
+without a network round trip
+"""
+
+import os
+import time
+from collections import deque
+from pathlib import Path
+from threading import Lock
+from typing import IO, Any, Deque, Dict, Iterable, Optional, Sequence, Tuple
+
+from .exceptions import CostLimitExceededError
+from .metrics import BUDGET_REJECTIONS
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None  # type: ignore[assignment]
+
+DAY = 86400.0
+
+# USD per 1M (input, output) tokens, matched as the longest fragment of the
+# lowercased model id. Used for estimates only; the ledger records the cost
+# the gateway reports.
+DEFAULT_PRICING: Dict[str, Tuple[float, float]] = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4.1-nano": (0.10, 0.40),
+    "gpt-4.1-mini": (0.40, 1.60),
+    "gpt-4.1": (2.00, 8.00),
+    "gpt-4-turbo": (10.00, 30.00),
+    "gpt-4": (30.00, 60.00),
+    "gpt-3.5-turbo": (0.50, 1.50),
+    "o3-mini": (1.10, 4.40),
+    "o1": (15.00, 60.00),
+    "claude-3-opus": (15.00, 75.00),
+    "claude-opus-4": (15.00, 75.00),
+    "claude-sonnet-4": (3.00, 15.00),
+    "claude-3-7-sonnet": (3.00, 15.00),
+    "claude-3-5-sonnet": (3.00, 15.00),
+    "claude-haiku-4-5": (1.00, 5.00),
+    "claude-3-5-haiku": (0.80, 4.00),
+    "claude-3-haiku": (0.25, 1.25),
+    "gemini-2.5-pro": (1.25, 10.00),
+    "gemini-2.5-flash": (0.30, 2.50),
+    "gemini-2.0-flash": (0.10, 0.40),
+    "gemini-1.5-pro": (1.25, 5.00),
+    "gemini-1.5-flash": (0.075, 0.30),
+    "nova-micro": (0.035, 0.14),
+    "nova-lite": (0.06, 0.24),
+    "nova-pro": (0.80, 3.20),
+    "mistral-large": (2.00, 6.00),
+}
+
+
+def estimate_cost(
+    model_id: str,
+    message: str,
+    max_tokens: int,
+    pricing: Optional[Dict[str, Sequence[float]]] = None,
+) -> Optional[float]:
+    """
+    Upper-bound cost of a request: ~4 characters per prompt token, and
+    ``max_tokens`` of output. None when the model is not in ``pricing``.
+    """
+    table = pricing if pricing is not None else DEFAULT_PRICING
+    model = model_id.lower()
+    matches = [key for key in table if key in model]
+    if not matches:
+        return None
+    input_price, output_price = table[max(matches, key=len)]
+    input_tokens = len(message) // 4 + 1
+    return (input_tokens * input_price + max_tokens * output_price) / 1_000_000
+
+
+class MemorySpendStore:
+    """Spend entries of one process, pruned past the window"""
+
+    def __init__(self) -> None:
+        self._entries: Deque[Tuple[float, float]] = deque()
+        self._total = 0.0
+        self._lock = Lock()
+
+    def add(self, cost: float, now: float) -> None:
+        with self._lock:
+            self._entries.append((now, cost))
+            self._total += cost
+
+    def total(self, since: float) -> float:
+        """Spend recorded at or after ``since``"""
+        with self._lock:
+            while self._entries and self._entries[0][0] < since:
+                self._total -= self._entries.popleft()[1]
+            if not self._entries:
+                self._total = 0.0
+            return self._total
+
+
+class FileSpendStore(MemorySpendStore):
+    """
+    Spend entries in an append-only file shared by every process on the host.
+
+    Each entry is a ``timestamp cost`` line. Writers append under an
+    exclusive lock on ``<path>.lock`` (``fcntl``; on platforms without it
+    only threads of one process are serialized); readers pick up other
+    processes' entries incrementally. Once ``compact_every`` entries have
+    been appended by this process, entries older than the last window are
+    dropped by atomically replacing the file.
+    """
+
+    def __init__(self, path: str, compact_every: int = 1000):
+        super().__init__()
+        self.path = Path(path).expanduser()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.compact_every = compact_every
+        self._lock_path = self.path.with_name(self.path.name + ".lock")
+        self._inode: Optional[int] = None
+        self._offset = 0
+        self._appended = 0
+        self._since = 0.0
+
+    def add(self, cost: float, now: float) -> None:
+        with self._lock, self._file_lock(exclusive=True):
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(f"{now:.6f} {cost!r}\n")
+            self._appended += 1
+            if self._appended >= self.compact_every:
+                self._appended = 0
+                self._compact()
+
+    def total(self, since: float) -> float:
+        with self._lock:
+            self._since = since
+            with self._file_lock(exclusive=False):
+                self._catch_up()
+        return super().total(since)
+
+    def _file_lock(self, exclusive: bool) -> "_FileLock":
+        return _FileLock(self._lock_path, exclusive)
+
+    def _catch_up(self) -> None:
+        """Read entries appended since the last call (all of them after a compaction)"""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return
+        if stat.st_ino != self._inode or stat.st_size < self._offset:
+            self._inode, self._offset = stat.st_ino, 0
+            self._entries.clear()
+            self._total = 0.0
+        with open(self.path, "r", encoding="utf-8") as f:
+            f.seek(self._offset)
+            chunk = f.read()
+        complete = chunk[: chunk.rfind("\n") + 1]
+        self._offset += len(complete.encode("utf-8"))
+        for timestamp, cost in _parse(complete.splitlines()):
+            if timestamp >= self._since:
+                self._entries.append((timestamp, cost))
+                self._total += cost
+
+    def _compact(self) -> None:
+        cutoff = time.time() - DAY if not self._since else self._since
+        with open(self.path, "r", encoding="utf-8") as f:
+            kept = [e for e in _parse(f) if e[0] >= cutoff]
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.writelines(f"{t:.6f} {c!r}\n" for t, c in kept)
+        tmp.replace(self.path)
+
+
+def _parse(lines: Iterable[str]) -> Iterable[Tuple[float, float]]:
+    for line in lines:
+        try:
+            timestamp, cost = line.split()
+            yield float(timestamp), float(cost)
+        except ValueError:
+            continue
+
+
+class _FileLock:
+    def __init__(self, path: Path, exclusive: bool):
+        self.path = path
+        self.exclusive = exclusive
+        self._file: Optional[IO[str]] = None
+
+    def __enter__(self) -> None:
+        if fcntl is None:
+            return
+        self._file = open(self.path, "a")
+        fcntl.flock(self._file, fcntl.LOCK_EX if self.exclusive else fcntl.LOCK_SH)
+
+    def __exit__(self, *exc: Any) -> None:
+        if self._file is not None:
+            fcntl.flock(self._file, fcntl.LOCK_UN)
+            self._file.close()
+            self._file = None
+
+
+class Reservation:
+    """An estimated cost held against the budget while a request is in flight"""
+
+    __slots__ = ("budget", "amount", "_open")
+
+    def __init__(self, budget: "CostBudget", amount: float):
+        self.budget = budget
+        self.amount = amount
+        self._open = True
+
+    def settle(self, cost: float) -> None:
+        """Replace the estimate with the cost the gateway reported"""
+        if self._open:
+            self._open = False
+            self.budget._settle(self.amount, cost)
+
+    def release(self) -> None:
+        """Drop the estimate (the request failed and nothing was billed)"""
+        self.settle(0.0)
+
+
+class CostBudget:
+    """
+    Local spend limits.
+
+    ``per_request`` caps the estimated cost of a single request (see
+    :func:`estimate_cost`; the estimate assumes all ``max_tokens`` are
+    generated). ``per_day`` caps the spend over the last ``window`` seconds:
+    what the gateway reported for completed calls plus the estimates of
+    calls still in flight. Either check raises CostLimitExceededError before
+    anything is sent. Requests to models missing from ``pricing`` can't be
+    estimated; they are only refused once the window's budget is used up.
+
+    ``store`` holds the completed spend: a MemorySpendStore (per process,
+    the default) or a FileSpendStore shared by processes on one host.
+    """
+
+    def __init__(
+        self,
+        per_request: Optional[float] = None,
+        per_day: Optional[float] = None,
+        window: float = DAY,
+        store: Optional[MemorySpendStore] = None,
+        pricing: Optional[Dict[str, Sequence[float]]] = None,
+    ):
+        self.per_request = per_request
+        self.per_day = per_day
+        self.window = window
+        self.store = store or MemorySpendStore()
+        self.pricing: Dict[str, Sequence[float]] = {
+            **DEFAULT_PRICING,
+            **(pricing or {}),
+        }
+        self._reserved = 0.0
+        self._lock = Lock()
+        self._stats = {"requests": 0, "rejected": 0}
+
+    def estimate(self, model_id: str, message: str, max_tokens: int) -> Optional[float]:
+        """Upper-bound cost of a request, or None for an unpriced model"""
+        return estimate_cost(model_id, message, max_tokens, self.pricing)
+
+    def spent(self) -> float:
+        """Spend reported over the current window"""
+        return self.store.total(time.time() - self.window)
+
+    def remaining(self) -> Optional[float]:
+        """Budget left in the window after in-flight estimates (None without per_day)"""
+        if self.per_day is None:
+            return None
+        with self._lock:
+            return max(0.0, self.per_day - self.spent() - self._reserved)
+
+    def reserve(self, model_id: str, estimate: Optional[float]) -> Reservation:
+        """Hold ``estimate`` for a request, or raise CostLimitExceededError"""
+        amount = estimate or 0.0
+        with self._lock:
+            self._stats["requests"] += 1
+            if (
+                self.per_request is not None
+                and estimate is not None
+                and estimate > self.per_request
+            ):
+                self._reject(model_id, "per_request")
+                raise CostLimitExceededError(
+                    f"Estimated cost ${estimate:.4f} for '{model_id}' exceeds "
+                    f"cost_limit_per_request ${self.per_request:.4f}",
+                    limit=self.per_request,
+                    estimated_cost=estimate,
+                )
+            if self.per_day is not None:
+                committed = self.spent() + self._reserved
+                if committed + amount > self.per_day or committed >= self.per_day:
+                    self._reject(model_id, "per_day")
+                    raise CostLimitExceededError(
+                        f"Cost limit reached: ${committed:.4f} spent or in flight of "
+                        f"${self.per_day:.4f} per {self.window / 3600:g}h; "
+                        f"'{model_id}' may cost up to ${amount:.4f}",
+                        limit=self.per_day,
+                        estimated_cost=estimate,
+                        spent=committed,
+                    )
+            self._reserved += amount
+        return Reservation(self, amount)
+
+    def record(self, cost: float) -> None:
+        """Add a reported cost to the ledger"""
+        if cost:
+            self.store.add(cost, time.time())
+
+    def _settle(self, reserved: float, cost: float) -> None:
+        with self._lock:
+            self._reserved = max(0.0, self._reserved - reserved)
+            self.record(cost)
+
+    def _reject(self, model_id: str, limit: str) -> None:
+        self._stats["rejected"] += 1
+        BUDGET_REJECTIONS.inc(1, model_id, limit)
+
+    def stats(self) -> Dict[str, Optional[float]]:
+        """Spend in the window, in-flight estimates, budget left, requests and rejections"""
+        spent = self.spent()
+        with self._lock:
+            reserved = self._reserved
+            stats: Dict[str, Optional[float]] = dict(self._stats)
+        stats.update(
+            spent=spent,
+            reserved=reserved,
+            remaining=(
+                None
+                if self.per_day is None
+                else max(0.0, self.per_day - spent - reserved)
+            ),
+        )
+        return stats
+
+
+def cost_budget_from_config(config: Any) -> Optional[CostBudget]:
+    """Build a CostBudget from Config's cost_limit_* fields, or None if neither is set"""
+    if config.cost_limit_per_request is None and config.cost_limit_per_day is None:
+        return None
+    store = (
+        FileSpendStore(config.cost_ledger_path)
+        if config.cost_ledger_path
+        else MemorySpendStore()
+    )
+    return CostBudget(
+        per_request=config.cost_limit_per_request,
+        per_day=config.cost_limit_per_day,
+        window=config.cost_limit_window,
+        store=store,
+        pricing=config.model_pricing,
+    )
@@ -0,0 +1,419 @@
+"""
+Response cache for Cost Katana
+Exact-match cache of chat completions: an in-process LRU tier with a byte
+budget and per-entry TTL, optionally backed by an SQLite file shared by every
+process on the host
+"""
+
+import contextlib
+import hashlib
+import json
+import sqlite3
+import time
+from collections import OrderedDict
+from pathlib import Path
+from threading import Lock
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from .logging.logger import logger
+
+# Parameters that control caching or routing rather than the completion itself
+_UNKEYED_PARAMS = frozenset({"cache", "conversation_id"})
+
+
+def response_cache_key(
+    scope: str, model_id: str, prompt: str, params: Dict[str, Any]
+) -> str:
+    """
+    Canonical hash of one request.
+
+    Parameters are serialized with sorted keys, so ``{"a": 1, "b": 2}`` and
+    ``{"b": 2, "a": 1}`` share a key; ``scope`` keeps accounts and projects
+    apart.
+    """
+    canonical = json.dumps(
+        {
+            "scope": scope,
+            "model": model_id,
+            "prompt": prompt,
+            "params": {k: v for k, v in params.items() if k not in _UNKEYED_PARAMS},
+        },
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+        default=repr,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def is_cacheable(params: Dict[str, Any]) -> bool:
+    """
+    Whether a request may be served from (and stored in) the cache.
+
+    ``cache=True`` / ``cache=False`` decide explicitly. Otherwise only
+    deterministic requests are cached: temperature 0 and no server-side
+    conversation.
+    """
+    mode = params.get("cache")
+    if mode is not None:
+        return bool(mode)
+    if params.get("conversation_id"):
+        return False
+    return params.get("temperature") == 0
+
+
+class DiskResponseCache:
+    """
+    SQLite-backed response store shared by processes on one host.
+
+    The database runs in WAL mode, so readers never block the single writer
+    and any number of worker processes can open the same file. Entries carry
+    a wall-clock expiry; once the live data exceeds ``max_bytes`` the least
+    recently read entries are deleted. A hit records its read time only when
+    the stored one is more than ``touch_interval`` seconds old, so hot keys
+    are served without a write transaction. :meth:`compact` purges expired
+    rows, checkpoints the WAL and returns free pages to the filesystem.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_bytes: int = 512 * 1024 * 1024,
+        touch_interval: float = 60.0,
+    ):
+        self.path = Path(path).expanduser()
+        self.max_bytes = max_bytes
+        self.touch_interval = touch_interval
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = Lock()
+        self._conn = sqlite3.connect(
+            str(self.path), timeout=5.0, check_same_thread=False, isolation_level=None
+        )
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._transaction():
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY,"
+                " value BLOB NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " expires_at REAL,"
+                " accessed_at REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS responses_accessed"
+                " ON responses (accessed_at)"
+            )
+            # Running byte total kept by triggers, so budget checks are O(1)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS usage (id INTEGER PRIMARY KEY, bytes INTEGER)"
+            )
+            self._conn.execute(
+                "INSERT OR IGNORE INTO usage (id, bytes)"
+                " SELECT 1, COALESCE(SUM(size), 0) FROM responses"
+            )
+            for name, body in (
+                ("AFTER INSERT", "bytes + NEW.size"),
+                ("AFTER DELETE", "bytes - OLD.size"),
+                ("AFTER UPDATE OF size", "bytes + NEW.size - OLD.size"),
+            ):
+                trigger = "responses_" + name.split()[1].lower()
+                self._conn.execute(
+                    f"CREATE TRIGGER IF NOT EXISTS {trigger} {name} ON responses"
+                    f" BEGIN UPDATE usage SET bytes = {body} WHERE id = 1; END"
+                )
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0}
+
+    @contextlib.contextmanager
+    def _transaction(self) -> Iterator[None]:
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._conn.execute("COMMIT")
+
+    def _used_bytes(self) -> int:
+        return self._conn.execute("SELECT bytes FROM usage WHERE id = 1").fetchone()[0]
+
+    def get(self, key: str) -> Optional[Tuple[bytes, Optional[float]]]:
+        """(serialized response, seconds left to live) for ``key``, or None"""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at, accessed_at FROM responses WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                self._stats["misses"] += 1
+                return None
+            value, expires_at, accessed_at = row
+            if expires_at is not None and expires_at <= now:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._stats["expirations"] += 1
+                self._stats["misses"] += 1
+                return None
+            if now - accessed_at >= self.touch_interval:
+                try:
+                    self._conn.execute(
+                        "UPDATE responses SET accessed_at = ? WHERE key = ?",
+                        (now, key),
+                    )
+                except sqlite3.OperationalError as e:
+                    # Another process holds the write lock; the hit still counts
+                    logger.debug(f"Response cache LRU touch skipped: {e}")
+            self._stats["hits"] += 1
+        return bytes(value), (expires_at - now if expires_at is not None else None)
+
+    def set(self, key: str, raw: bytes, ttl: Optional[float] = None) -> None:
+        now = time.time()
+        expires_at = now + ttl if ttl is not None else None
+        with self._lock, self._transaction():
+            self._conn.execute(
+                "INSERT INTO responses (key, value, size, expires_at, accessed_at)"
+                " VALUES (?, ?, ?, ?, ?)"
+                " ON CONFLICT (key) DO UPDATE SET value = excluded.value,"
+                " size = excluded.size, expires_at = excluded.expires_at,"
+                " accessed_at = excluded.accessed_at",
+                (key, raw, len(raw), expires_at, now),
+            )
+            if self._used_bytes() > self.max_bytes:
+                self._evict(now)
+
+    def _evict(self, now: float) -> None:
+        """Drop expired rows, then least recently read rows, until under budget"""
+        cursor = self._conn.execute(
+            "DELETE FROM responses WHERE expires_at IS NOT NULL AND expires_at <= ?",
+            (now,),
+        )
+        self._stats["expirations"] += max(cursor.rowcount, 0)
+
+        # Free a little headroom so the next few writes don't evict again
+        excess = self._used_bytes() - int(self.max_bytes * 0.9)
+        if excess <= 0:
+            return
+        victims = []
+        for key, size in self._conn.execute(
+            "SELECT key, size FROM responses ORDER BY accessed_at"
+        ):
+            victims.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", victims)
+        self._stats["evictions"] += len(victims)
+
+    def invalidate(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+
+    def compact(self) -> None:
+        """Purge expired entries, checkpoint the WAL and release free pages"""
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM responses WHERE expires_at IS NOT NULL AND expires_at <= ?",
+                (time.time(),),
+            )
+            self._stats["expirations"] += max(cursor.rowcount, 0)
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            self._conn.execute("PRAGMA incremental_vacuum")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters for this process plus the shared entry count and size"""
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            return {**self._stats, "entries": entries, "bytes": self._used_bytes()}
+
+
+class ResponseCache:
+    """
+    Thread-safe LRU cache of ``/api/chat/message`` responses.
+
+    Entries are stored as serialized JSON, so hits return an independent copy
+    and the byte budget counts real payload size. The least recently used
+    entries are evicted once either ``max_entries`` or ``max_bytes`` is
+    exceeded; expired entries are dropped on lookup.
+
+    With a ``disk`` tier, memory misses fall through to the shared SQLite
+    store (and are promoted on a hit), and every write goes to both, so
+    co-located workers and restarted processes reuse each other's
+    completions. Disk errors are logged and treated as misses.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        max_bytes: int = 64 * 1024 * 1024,
+        ttl: Optional[float] = 3600.0,
+        disk: Optional[DiskResponseCache] = None,
+    ):
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.disk = disk
+        # key -> (serialized response, expires_at)
+        self._entries: "OrderedDict[str, Tuple[bytes, Optional[float]]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = Lock()
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "disk_hits": 0,
+            "evictions": 0,
+            "expirations": 0,
+        }
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Cached response for ``key``, or None on a miss"""
+        with self._lock:
+            raw = self._get_memory(key)
+            if raw is not None:
+                self._stats["hits"] += 1
+                return json.loads(raw)
+
+        disk_entry = self._get_disk(key)
+        with self._lock:
+            if disk_entry is None:
+                self._stats["misses"] += 1
+                return None
+            raw, ttl = disk_entry
+            self._stats["hits"] += 1
+            self._stats["disk_hits"] += 1
+            if len(raw) <= self.max_bytes:
+                self._put_memory(key, raw, ttl)
+        return json.loads(raw)
+
+    def _get_memory(self, key: str) -> Optional[bytes]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        raw, expires_at = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            self._remove(key)
+            self._stats["expirations"] += 1
+            return None
+        self._entries.move_to_end(key)
+        return raw
+
+    def _get_disk(self, key: str) -> Optional[Tuple[bytes, Optional[float]]]:
+        if self.disk is None:
+            return None
+        try:
+            return self.disk.get(key)
+        except sqlite3.Error as e:
+            logger.debug(f"Response cache disk read failed: {e}")
+            return None
+
+    def set(
+        self, key: str, response_data: Dict[str, Any], ttl: Optional[float] = None
+    ) -> bool:
+        """
+        Store a response; returns False when it alone exceeds ``max_bytes``.
+
+        ``ttl`` overrides the cache-wide TTL for this entry.
+        """
+        raw = json.dumps(response_data, separators=(",", ":")).encode("utf-8")
+        if len(raw) > self.max_bytes:
+            return False
+        ttl = self.ttl if ttl is None else ttl
+
+        with self._lock:
+            self._put_memory(key, raw, ttl)
+        if self.disk is not None:
+            try:
+                self.disk.set(key, raw, ttl)
+            except sqlite3.Error as e:
+                logger.debug(f"Response cache disk write failed: {e}")
+        return True
+
+    def _put_memory(self, key: str, raw: bytes, ttl: Optional[float]) -> None:
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (raw, expires_at)
+        self._bytes += len(raw)
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self._stats["evictions"] += 1
+
+    def _remove(self, key: str) -> None:
+        raw, _ = self._entries.pop(key)
+        self._bytes -= len(raw)
+
+    def invalidate(self, key: str) -> None:
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+        if self.disk is not None:
+            try:
+                self.disk.invalidate(key)
+            except sqlite3.Error as e:
+                logger.debug(f"Response cache disk invalidate failed: {e}")
+
+    def clear(self) -> None:
+        """Empty the memory tier (and the shared disk tier, if any)"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+        if self.disk is not None:
+            try:
+                self.disk.clear()
+            except sqlite3.Error as e:
+                logger.debug(f"Response cache disk clear failed: {e}")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss/eviction counters plus current size"""
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            stats: Dict[str, Any] = {
+                **self._stats,
+                "hit_rate": self._stats["hits"] / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+            }
+        if self.disk is not None:
+            try:
+                stats["disk"] = self.disk.stats()
+            except sqlite3.Error as e:
+                logger.debug(f"Response cache disk stats failed: {e}")
+        return stats
+
+
+def response_cache_from_config(config: Any) -> Optional[ResponseCache]:
+    """Build a ResponseCache from Config fields, or None when disabled"""
+    if not config.response_cache_enabled:
+        return None
+    disk = None
+    if config.response_cache_path:
+        try:
+            disk = DiskResponseCache(
+                config.response_cache_path,
+                max_bytes=config.response_cache_disk_max_bytes,
+            )
+        except (OSError, sqlite3.Error) as e:
+            logger.warn(f"Response cache file unavailable, using memory only: {e}")
+    return ResponseCache(
+        max_entries=config.response_cache_max_entries,
+        max_bytes=config.response_cache_max_bytes,
+        ttl=config.response_cache_ttl,
+        disk=disk,
+    )
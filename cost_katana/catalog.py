@@ -0,0 +1,337 @@
+"""
+Model catalog cache for Cost Katana
+Keeps /api/chat/models in memory with TTL, ETag revalidation and optional
+on-disk persistence
+"""
+
+import asyncio
+import contextlib
+import functools
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from threading import Lock, Thread
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from .logging.logger import logger
+
+# fetch(etag) -> (models, etag); models is None when the server answered 304
+CatalogFetcher = Callable[
+    [Optional[str]], Tuple[Optional[List[Dict[str, Any]]], Optional[str]]
+]
+AsyncCatalogFetcher = Callable[
+    [Optional[str]], Awaitable[Tuple[Optional[List[Dict[str, Any]]], Optional[str]]]
+]
+
+
+class _CatalogState:
+    """
+    What ModelCatalog and AsyncModelCatalog share: the cached catalog, its
+    index, TTL bookkeeping and on-disk persistence. Fetching and waiting
+    for refreshes is left to the subclasses.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 300.0,
+        stale_ttl: float = 3600.0,
+        persist_path: Optional[str] = None,
+        scope: str = "",
+    ):
+        self.ttl = ttl
+        self.stale_ttl = max(stale_ttl, ttl)
+        self.persist_path = Path(persist_path).expanduser() if persist_path else None
+        self.scope = scope
+
+        self._models: List[Dict[str, Any]] = []
+        self._index: Dict[str, Dict[str, Any]] = {}
+        self._etag: Optional[str] = None
+        self._fetched_at: Optional[float] = None
+        self._lock = Lock()
+
+    @staticmethod
+    def _build_index(models: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        index: Dict[str, Dict[str, Any]] = {}
+        for model in models:
+            keys = [model.get("id"), model.get("modelId")]
+            keys.extend(model.get("aliases") or [])
+            for key in keys:
+                if key and key not in index:
+                    index[key] = model
+        return index
+
+    def _install(
+        self,
+        models: List[Dict[str, Any]],
+        etag: Optional[str],
+        fetched_at: float,
+    ) -> None:
+        index = self._build_index(models)
+        with self._lock:
+            self._models = models
+            self._index = index
+            self._etag = etag
+            self._fetched_at = fetched_at
+
+    def _age(self) -> Optional[float]:
+        with self._lock:
+            if self._fetched_at is None:
+                return None
+            return time.time() - self._fetched_at
+
+    def _conditional_etag(self) -> Optional[str]:
+        with self._lock:
+            return self._etag if self._models else None
+
+    def _apply_fetch(
+        self, models: Optional[List[Dict[str, Any]]], new_etag: Optional[str]
+    ) -> Tuple[List[Dict[str, Any]], Optional[str], float]:
+        """Install a fetch result; returns what to persist"""
+        now = time.time()
+        if models is None:
+            # 304 Not Modified — keep the catalog, restart its TTL
+            with self._lock:
+                self._fetched_at = now
+                models = self._models
+                new_etag = new_etag or self._etag
+        else:
+            self._install(models, new_etag, now)
+        logger.debug(f"Model catalog refreshed ({len(models)} models)")
+        return models, new_etag, now
+
+    def _snapshot(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return list(self._models)
+
+    def _lookup(self, model_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._index.get(model_id)
+
+    def _ids(self) -> List[str]:
+        with self._lock:
+            return [m.get("id", m.get("modelId", "")) for m in self._models]
+
+    def invalidate(self) -> None:
+        """Force the next lookup to refetch (the ETag is kept for revalidation)."""
+        with self._lock:
+            self._fetched_at = None
+
+    def _load_from_disk(self) -> None:
+        if self.persist_path is None or not self.persist_path.exists():
+            return
+        try:
+            with open(self.persist_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("scope") != self.scope:
+                return
+            self._install(data["models"], data.get("etag"), float(data["fetchedAt"]))
+            logger.debug(f"Model catalog loaded from {self.persist_path}")
+        except Exception as e:
+            logger.debug(f"Ignoring unreadable model catalog file: {e}")
+
+    def _save_to_disk(
+        self, models: List[Dict[str, Any]], etag: Optional[str], fetched_at: float
+    ) -> None:
+        if not self.persist_path:
+            return
+        payload = {
+            "scope": self.scope,
+            "etag": etag,
+            "fetchedAt": fetched_at,
+            "models": models,
+        }
+        tmp_path: Optional[str] = None
+        try:
+            self.persist_path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(
+                dir=str(self.persist_path.parent), suffix=".tmp"
+            )
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(payload, f)
+            os.replace(tmp_path, self.persist_path)
+        except Exception as e:
+            logger.debug(f"Failed to persist model catalog: {e}")
+            if tmp_path:
+                with contextlib.suppress(Exception):
+                    os.unlink(tmp_path)
+
+
+class ModelCatalog(_CatalogState):
+    """
+    Cached view of the model catalog.
+
+    - Within ``ttl`` seconds of the last fetch the cached catalog is served as-is.
+    - Between ``ttl`` and ``stale_ttl`` the cached catalog is served immediately
+      and refreshed on a background thread (stale-while-revalidate).
+    - Past ``stale_ttl`` (or with no catalog yet) the caller blocks on a refresh.
+
+    Refreshes send ``If-None-Match`` when an ETag is known, so an unchanged
+    catalog costs a bodiless 304. Lookups by id or alias are O(1).
+    """
+
+    def __init__(
+        self,
+        fetch: CatalogFetcher,
+        ttl: float = 300.0,
+        stale_ttl: float = 3600.0,
+        persist_path: Optional[str] = None,
+        scope: str = "",
+    ):
+        super().__init__(
+            ttl=ttl, stale_ttl=stale_ttl, persist_path=persist_path, scope=scope
+        )
+        self._fetch = fetch
+        self._refresh_lock = Lock()
+        self._refresh_thread: Optional[Thread] = None
+        self._load_from_disk()
+
+    def refresh(self, if_older_than: Optional[float] = None) -> None:
+        """
+        Fetch the catalog now (conditionally, when an ETag is known).
+
+        With ``if_older_than``, skip the fetch if another thread refreshed the
+        catalog while this one waited for the refresh lock.
+        """
+        with self._refresh_lock:
+            if if_older_than is not None:
+                age = self._age()
+                if age is not None and age < if_older_than:
+                    return
+            models, new_etag = self._fetch(self._conditional_etag())
+            self._save_to_disk(*self._apply_fetch(models, new_etag))
+
+    def _refresh_in_background(self) -> None:
+        with self._lock:
+            if self._refresh_thread and self._refresh_thread.is_alive():
+                return
+
+            def run():
+                try:
+                    self.refresh()
+                except Exception as e:
+                    logger.debug(f"Background model catalog refresh failed: {e}")
+
+            self._refresh_thread = Thread(target=run, daemon=True)
+            self._refresh_thread.start()
+
+    def _ensure_loaded(self, force_refresh: bool = False) -> None:
+        age = self._age()
+        if force_refresh:
+            self.refresh()
+        elif age is None:
+            self.refresh(if_older_than=self.ttl)
+        elif age >= self.stale_ttl:
+            try:
+                self.refresh(if_older_than=self.stale_ttl)
+            except Exception as e:
+                logger.warn(f"Model catalog refresh failed, serving stale copy: {e}")
+        elif age >= self.ttl:
+            self._refresh_in_background()
+
+    def get_models(self, force_refresh: bool = False) -> List[Dict[str, Any]]:
+        """Return the catalog as a list of model dicts."""
+        self._ensure_loaded(force_refresh)
+        return self._snapshot()
+
+    def find(self, model_id: str) -> Optional[Dict[str, Any]]:
+        """Look up a model by id, modelId or alias."""
+        self._ensure_loaded()
+        return self._lookup(model_id)
+
+    def model_ids(self) -> List[str]:
+        """Ids of all catalog models, in catalog order."""
+        self._ensure_loaded()
+        return self._ids()
+
+
+class AsyncModelCatalog(_CatalogState):
+    """
+    Model catalog for AsyncCostKatanaClient.
+
+    Same TTL / ETag / persistence rules as :class:`ModelCatalog`, with
+    coroutine lookups: refreshes are awaited, stale-while-revalidate runs as
+    a task on the running event loop, and the catalog file is read and
+    written on the default executor rather than on the loop.
+    """
+
+    def __init__(
+        self,
+        fetch: AsyncCatalogFetcher,
+        ttl: float = 300.0,
+        stale_ttl: float = 3600.0,
+        persist_path: Optional[str] = None,
+        scope: str = "",
+    ):
+        super().__init__(
+            ttl=ttl, stale_ttl=stale_ttl, persist_path=persist_path, scope=scope
+        )
+        self._fetch = fetch
+        self._refresh_lock: Optional[asyncio.Lock] = None
+        self._refresh_task: Optional["asyncio.Task[None]"] = None
+        # The persisted catalog is read on first use, off the event loop
+        self._disk_loaded = self.persist_path is None
+
+    @staticmethod
+    async def _off_loop(function: Callable[..., None], *args: Any) -> None:
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, functools.partial(function, *args))
+
+    async def refresh(self, if_older_than: Optional[float] = None) -> None:
+        """Fetch the catalog now (conditionally, when an ETag is known)."""
+        if self._refresh_lock is None:
+            self._refresh_lock = asyncio.Lock()
+        async with self._refresh_lock:
+            if if_older_than is not None:
+                age = self._age()
+                if age is not None and age < if_older_than:
+                    return
+            models, new_etag = await self._fetch(self._conditional_etag())
+            persisted = self._apply_fetch(models, new_etag)
+            if self.persist_path:
+                await self._off_loop(self._save_to_disk, *persisted)
+
+    def _refresh_in_background(self) -> None:
+        if self._refresh_task and not self._refresh_task.done():
+            return
+
+        async def run():
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.debug(f"Background model catalog refresh failed: {e}")
+
+        self._refresh_task = asyncio.ensure_future(run())
+
+    async def _ensure_loaded(self, force_refresh: bool = False) -> None:
+        if not self._disk_loaded:
+            self._disk_loaded = True
+            await self._off_loop(self._load_from_disk)
+        age = self._age()
+        if force_refresh:
+            await self.refresh()
+        elif age is None:
+            await self.refresh(if_older_than=self.ttl)
+        elif age >= self.stale_ttl:
+            try:
+                await self.refresh(if_older_than=self.stale_ttl)
+            except Exception as e:
+                logger.warn(f"Model catalog refresh failed, serving stale copy: {e}")
+        elif age >= self.ttl:
+            self._refresh_in_background()
+
+    async def get_models(self, force_refresh: bool = False) -> List[Dict[str, Any]]:
+        """Return the catalog as a list of model dicts."""
+        await self._ensure_loaded(force_refresh)
+        return self._snapshot()
+
+    async def find(self, model_id: str) -> Optional[Dict[str, Any]]:
+        """Look up a model by id, modelId or alias."""
+        await self._ensure_loaded()
+        return self._lookup(model_id)
+
+    async def model_ids(self) -> List[str]:
+        """Ids of all catalog models, in catalog order."""
+        await self._ensure_loaded()
+        return self._ids()
@@ -0,0 +1,288 @@
+"""
+Circuit breaker for Cost Katana
+Per model / endpoint failure tracking that fails fast while a provider is
+degraded instead of waiting out the request timeout
+"""
+
+import time
+from collections import deque
+from contextlib import contextmanager
+from threading import Lock
+from typing import Any, Deque, Dict, Iterator, NoReturn, Optional, Tuple
+
+from .exceptions import CircuitOpenError, CostKatanaError
+from .metrics import CIRCUIT_REJECTIONS, CIRCUIT_TRANSITIONS
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CallOutcome:
+    """Yielded by :meth:`CircuitBreaker.call`; set ``status`` from the response"""
+
+    __slots__ = ("status",)
+
+    def __init__(self) -> None:
+        self.status: Optional[int] = None
+
+
+class Circuit:
+    """
+    State of one (model id, endpoint) pair.
+
+    Outcomes of the last ``window_size`` calls are kept as (failed, slow)
+    pairs. Once at least ``minimum_calls`` are recorded, the circuit opens
+    when the failure rate or the slow-call rate reaches its threshold. After
+    ``open_duration`` seconds it lets ``half_open_calls`` probes through:
+    if they all succeed it closes, any failure opens it again.
+    """
+
+    def __init__(self, breaker: "CircuitBreaker", model_id: str, endpoint: str):
+        self.breaker = breaker
+        self.model_id = model_id
+        self.endpoint = endpoint
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self.outcomes: Deque[Tuple[bool, bool]] = deque(maxlen=breaker.window_size)
+        self.probes = 0
+        self.probe_successes = 0
+        # Bumped on every transition; outcomes of calls admitted under an
+        # earlier state don't count towards the current one
+        self.generation = 0
+        self.stats = {
+            "calls": 0,
+            "failures": 0,
+            "slow_calls": 0,
+            "rejected": 0,
+            "opened": 0,
+        }
+
+    def _transition(self, state: str, now: float) -> None:
+        self.state = state
+        self.generation += 1
+        if state == OPEN:
+            self.opened_at = now
+            self.stats["opened"] += 1
+        self.outcomes.clear()
+        self.probes = self.probe_successes = 0
+        CIRCUIT_TRANSITIONS.inc(1, self.model_id, state)
+
+    def retry_after(self, now: float) -> float:
+        """Seconds until an open circuit lets a probe through"""
+        if self.state != OPEN:
+            return 0.0
+        return max(0.0, self.opened_at + self.breaker.open_duration - now)
+
+    def acquire(self, now: float) -> int:
+        """
+        Admit one call and return the current generation, or raise
+        CircuitOpenError (caller holds the breaker lock)
+        """
+        if self.state == OPEN and self.retry_after(now) == 0:
+            self._transition(HALF_OPEN, now)
+        if self.state == HALF_OPEN and self.probes < self.breaker.half_open_calls:
+            self.probes += 1
+            return self.generation
+        if self.state == CLOSED:
+            return self.generation
+        self.reject(now)
+
+    def reject(self, now: float) -> NoReturn:
+        """Count a fast-failed call and raise CircuitOpenError"""
+        self.stats["rejected"] += 1
+        CIRCUIT_REJECTIONS.inc(1, self.model_id, self.endpoint)
+        retry_after = self.retry_after(now)
+        raise CircuitOpenError(
+            f"Circuit open for model '{self.model_id}' on {self.endpoint} "
+            f"(retry in {retry_after:.1f}s)",
+            model_id=self.model_id,
+            endpoint=self.endpoint,
+            retry_after=retry_after,
+        )
+
+    def record(self, generation: int, failed: bool, slow: bool, now: float) -> None:
+        """Record one admitted call (caller holds the breaker lock)"""
+        self.stats["calls"] += 1
+        self.stats["failures"] += failed
+        self.stats["slow_calls"] += slow
+        if generation != self.generation:
+            return
+
+        if self.state == HALF_OPEN:
+            if failed or slow:
+                self._transition(OPEN, now)
+                return
+            self.probe_successes += 1
+            if self.probe_successes >= self.breaker.half_open_calls:
+                self._transition(CLOSED, now)
+            return
+
+        self.outcomes.append((failed, slow))
+        calls = len(self.outcomes)
+        if calls < self.breaker.minimum_calls:
+            return
+        failure_rate = sum(f for f, _ in self.outcomes) / calls
+        slow_rate = sum(s for _, s in self.outcomes) / calls
+        if (
+            failure_rate >= self.breaker.failure_rate_threshold
+            or slow_rate >= self.breaker.slow_call_rate_threshold
+        ):
+            self._transition(OPEN, now)
+
+    def release(self, generation: int) -> None:
+        """Give back a half-open probe slot for a call that was cancelled"""
+        if generation == self.generation and self.state == HALF_OPEN:
+            self.probes -= 1
+
+
+def is_failure(error: Optional[BaseException], status: Optional[int]) -> bool:
+    """
+    Whether a call counts against the circuit: transport errors, timeouts and
+    5xx responses do; 4xx responses (bad key, unknown model, rate limited)
+    mean the provider answered and don't.
+    """
+    if status is not None and status >= 500:
+        return True
+    return error is not None and not isinstance(error, CostKatanaError)
+
+
+class CircuitBreaker:
+    """
+    Circuit breakers keyed by (model id, endpoint).
+
+    While a circuit is open, :meth:`call` raises :class:`CircuitOpenError`
+    immediately, without a network round trip; the error's ``retry_after``
+    says when the next probe will be let through. Calls slower than
+    ``slow_call_duration`` seconds (if set) count as slow even when they
+    succeed, so a model that has become too slow to be useful trips as well.
+    """
+
+    def __init__(
+        self,
+        failure_rate_threshold: float = 0.5,
+        slow_call_duration: Optional[float] = None,
+        slow_call_rate_threshold: float = 0.5,
+        minimum_calls: int = 10,
+        window_size: int = 20,
+        open_duration: float = 30.0,
+        half_open_calls: int = 1,
+    ):
+        if not 0 < failure_rate_threshold <= 1 or not 0 < slow_call_rate_threshold <= 1:
+            raise ValueError("Circuit breaker rate thresholds must be in (0, 1]")
+        if minimum_calls < 1 or window_size < minimum_calls or half_open_calls < 1:
+            raise ValueError(
+                "Circuit breaker needs 1 <= minimum_calls <= window_size "
+                "and half_open_calls >= 1"
+            )
+        self.failure_rate_threshold = failure_rate_threshold
+        self.slow_call_duration = slow_call_duration
+        self.slow_call_rate_threshold = slow_call_rate_threshold
+        self.minimum_calls = minimum_calls
+        self.window_size = window_size
+        self.open_duration = open_duration
+        self.half_open_calls = half_open_calls
+        self._circuits: Dict[Tuple[str, str], Circuit] = {}
+        self._lock = Lock()
+
+    def _circuit(self, model_id: str, endpoint: str) -> Circuit:
+        circuit = self._circuits.get((model_id, endpoint))
+        if circuit is None:
+            circuit = self._circuits.setdefault(
+                (model_id, endpoint), Circuit(self, model_id, endpoint)
+            )
+        return circuit
+
+    def state(self, model_id: str, endpoint: str) -> str:
+        """Current state (``closed``, ``open`` or ``half_open``) of a circuit"""
+        with self._lock:
+            circuit = self._circuit(model_id, endpoint)
+            if circuit.state == OPEN and circuit.retry_after(time.monotonic()) == 0:
+                return HALF_OPEN
+            return circuit.state
+
+    def allows(self, model_id: str, endpoint: str) -> bool:
+        """Whether a call would be admitted right now (does not take a probe slot)"""
+        return self.state(model_id, endpoint) != OPEN
+
+    def check(self, model_id: str, endpoint: str) -> None:
+        """Raise CircuitOpenError if the circuit is open (does not take a probe slot)"""
+        with self._lock:
+            circuit = self._circuit(model_id, endpoint)
+            now = time.monotonic()
+            if circuit.state == OPEN and circuit.retry_after(now) > 0:
+                circuit.reject(now)
+
+    @contextmanager
+    def call(self, model_id: str, endpoint: str) -> Iterator[CallOutcome]:
+        """
+        Guard one call to ``endpoint`` for ``model_id``.
+
+        Raises CircuitOpenError before the body runs if the circuit is open.
+        The body should set ``outcome.status`` to the response status code so
+        5xx responses count as failures.
+        """
+        with self._lock:
+            circuit = self._circuit(model_id, endpoint)
+            generation = circuit.acquire(time.monotonic())
+
+        outcome = CallOutcome()
+        started = time.monotonic()
+        try:
+            yield outcome
+        except Exception as e:
+            self._record(circuit, generation, e, outcome.status, started)
+            raise
+        except BaseException:
+            # Cancelled / interrupted: no verdict on the provider
+            with self._lock:
+                circuit.release(generation)
+            raise
+        self._record(circuit, generation, None, outcome.status, started)
+
+    def _record(
+        self,
+        circuit: Circuit,
+        generation: int,
+        error: Optional[BaseException],
+        status: Optional[int],
+        started: float,
+    ) -> None:
+        now = time.monotonic()
+        threshold = self.slow_call_duration
+        slow = threshold is not None and now - started >= threshold
+        with self._lock:
+            circuit.record(generation, is_failure(error, status), slow, now)
+
+    def reset(self) -> None:
+        """Close every circuit and forget recorded outcomes"""
+        with self._lock:
+            self._circuits.clear()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-circuit state and counters, keyed by ``"model_id endpoint"``"""
+        with self._lock:
+            now = time.monotonic()
+            return {
+                f"{circuit.model_id} {circuit.endpoint}": {
+                    "state": circuit.state,
+                    "retry_after": circuit.retry_after(now),
+                    **circuit.stats,
+                }
+                for circuit in self._circuits.values()
+            }
+
+
+def circuit_breaker_from_config(config: Any) -> Optional[CircuitBreaker]:
+    """Build a CircuitBreaker from Config's circuit_breaker_* fields, or None"""
+    if not config.circuit_breaker_enabled:
+        return None
+    return CircuitBreaker(
+        failure_rate_threshold=config.circuit_breaker_failure_rate,
+        slow_call_duration=config.circuit_breaker_slow_call_duration,
+        slow_call_rate_threshold=config.circuit_breaker_slow_call_rate,
+        minimum_calls=config.circuit_breaker_minimum_calls,
+        window_size=config.circuit_breaker_window_size,
+        open_duration=config.circuit_breaker_open_duration,
+        half_open_calls=config.circuit_breaker_half_open_calls,
+    )
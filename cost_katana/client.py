@@ -5,8 +5,27 @@ Handles communication with the Cost Katana backend API
 
 import json
 import os
-from typing import Dict, Any, Optional, List
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from threading import Lock
+from typing import (
+    Dict,
+    Any,
+    FrozenSet,
+    Iterator,
+    Optional,
+    List,
+    Sequence,
+    Tuple,
+    Union,
+)
 import httpx
+from .batch import BatchResult, ProgressCallback, run_batch
+from .budget import CostBudget, Reservation, cost_budget_from_config
+from .cache import ResponseCache, response_cache_from_config, response_cache_key
+from .catalog import ModelCatalog
+from .circuit_breaker import CallOutcome, CircuitBreaker, circuit_breaker_from_config
 from .config import Config
 from .exceptions import (
     CostKatanaError,
@@ -14,8 +33,26 @@ from .exceptions import (
     ModelNotAvailableError,
     RateLimitError,
     CostLimitExceededError,
+    ModelTimeoutError,
+    NetworkError,
+    ServerError,
+)
+from .failover import (
+    DEFAULT_FAILOVER_REASONS,
+    FailoverPolicy,
+    failover_policy_from_config,
+    run_with_failover,
 )
+from .hedging import HedgePolicy, hedge_policy_from_config, run_hedged
 from .logging import AILogger
+from .metrics import record_usage, track_request
+from .rate_limit import RateLimiter, estimate_request_tokens, rate_limiter_from_config
+from .pool import ConnectionPool, shared_connection_pool
+from .similarity import SimilarityCache, similarity_cache_from_config
+from .singleflight import AsyncSingleFlight, SingleFlight, mark_coalesced
+from .streaming import MessageStream, iter_sse_events
+from .retry import AttemptRecord, RetryPolicy, get_last_attempts
+from .timing import attach_timing, timing_hooks
 from .logging.logger import logger
 from .templates import TemplateManager
 from .gateway import GATEWAY_API_PREFIX
@@ -93,6 +130,11 @@ def configure(
         cost_katana.configure(config_file='config.json')
     """
     global _global_client
+    from .models import discard_cached_models
+
+    if _global_client is not None:
+        # Let the replaced client (and its logger thread) be freed
+        discard_cached_models(_global_client)
     _global_client = CostKatanaClient(
         api_key=api_key, base_url=base_url, config_file=config_file, **kwargs
     )
@@ -112,8 +154,26 @@ def get_global_client() -> "CostKatanaClient":
     return _global_client
 
 
-class CostKatanaClient:
-    """HTTP client for Cost Katana API"""
+def _send_error(e: Exception) -> CostKatanaError:
+    """Wrap a non-SDK send_message failure, keeping timeouts and connection errors apart"""
+    message = f"Failed to send message: {str(e)}"
+    if isinstance(e, httpx.TimeoutException):
+        return ModelTimeoutError(message)
+    if isinstance(e, httpx.TransportError):
+        return NetworkError(message)
+    return CostKatanaError(message)
+
+
+def _response_usage(data: Dict[str, Any]) -> Tuple[float, int]:
+    """(cost, tokens) reported in a /api/chat/message response"""
+    body = data.get("data", {}) or {}
+    return body.get("cost", 0.0) or 0.0, body.get("tokenCount", 0) or 0
+
+
+class _BaseClient:
+    """Configuration, headers and response handling shared by the sync and async clients"""
+
+    single_flight: Union[SingleFlight, AsyncSingleFlight]
 
     def __init__(
         self,
@@ -122,18 +182,17 @@ class CostKatanaClient:
         config_file: Optional[str] = None,
         timeout: Optional[int] = None,
         config: Optional[Config] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        response_cache: Optional[ResponseCache] = None,
+        similarity_cache: Optional[SimilarityCache] = None,
+        connection_pool: Optional[ConnectionPool] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        failover_policy: Optional[FailoverPolicy] = None,
+        hedge_policy: Optional[HedgePolicy] = None,
+        cost_budget: Optional[CostBudget] = None,
+        ai_logger: Optional[AILogger] = None,
         **kwargs,
     ):
-        """
-        Initialize Cost Katana client.
-
-        Args:
-            api_key: Your Cost Katana API key
-            base_url: Base URL for the API (optional override)
-            config_file: Path to JSON configuration file
-            timeout: Request timeout in seconds
-            config: Pre-built Config (e.g. from Config.from_env())
-        """
         if config is not None:
             self.config = config
         elif config_file:
@@ -165,31 +224,75 @@ class CostKatanaClient:
 
         _maybe_log_hosted_models_notice()
 
-        effective_timeout = timeout if timeout is not None else self.config.timeout
+        self.timeout = timeout if timeout is not None else self.config.timeout
 
-        headers: Dict[str, str] = {
+        self.headers: Dict[str, str] = {
             "Authorization": f"Bearer {self.config.api_key}",
             "Content-Type": "application/json",
             "User-Agent": "cost-katana-python/2.5.7",
         }
         if self.config.project_id:
-            headers["x-project-id"] = self.config.project_id
+            self.headers["x-project-id"] = self.config.project_id
+
+        # Retries for transient failures (backoff, Retry-After, deadline)
+        self.retry_policy = RetryPolicy(
+            max_retries=self.config.max_retries,
+            base_delay=self.config.retry_delay,
+            max_delay=self.config.retry_max_delay,
+            deadline=self.config.retry_deadline,
+        )
 
-        # Initialize HTTP client
-        self.client = httpx.Client(
-            base_url=self.config.base_url,
-            timeout=effective_timeout,
-            headers=headers,
+        # Optional client-side pacing (requests/s, tokens/min)
+        self.rate_limiter = rate_limiter or rate_limiter_from_config(self.config)
+
+        # Exact-match cache consulted by generate_content / ai()
+        self.response_cache = response_cache or response_cache_from_config(self.config)
+        self.similarity_cache = similarity_cache or similarity_cache_from_config(
+            self.config
         )
 
-        # Initialize AI logger
+        # Fast-fail per model / endpoint while a provider is degraded
+        self.circuit_breaker = circuit_breaker or circuit_breaker_from_config(
+            self.config
+        )
+
+        # Fallback models for failed / timed-out calls (Config.enable_failover)
+        self.failover_policy = failover_policy or failover_policy_from_config(
+            self.config
+        )
+
+        # Duplicate slow send_message calls (Config.hedge_enabled)
+        self.hedge_policy = hedge_policy or hedge_policy_from_config(self.config)
+
+        # Local enforcement of cost_limit_per_request / cost_limit_per_day
+        self.cost_budget = cost_budget or cost_budget_from_config(self.config)
+
+        # One pool of keep-alive connections for every component below
+        self.connection_pool = connection_pool or shared_connection_pool(self.config)
+
+        # Initialize AI logger (ai()/track() log through the global client's)
         self.ai_logger: Optional[AILogger]
-        if getattr(self.config, "enable_ai_logging", True):
+        if ai_logger is not None:
+            self.ai_logger = ai_logger
+        elif getattr(self.config, "enable_ai_logging", True):
             self.ai_logger = AILogger(
                 api_key=self.config.api_key,
                 project_id=self.config.project_id,
                 base_url=self.config.base_url,
+                batch_size=self.config.ai_logging_batch_size,
+                flush_interval=self.config.ai_logging_flush_interval,
                 enable_logging=True,
+                connection_pool=self.connection_pool,
+                max_queue_size=self.config.ai_logging_max_queue_size,
+                overflow_policy=self.config.ai_logging_overflow_policy,
+                block_timeout=self.config.ai_logging_block_timeout,
+                max_queue_bytes=self.config.ai_logging_max_queue_bytes,
+                spool_dir=self.config.ai_logging_spool_dir,
+                spool_max_bytes=self.config.ai_logging_spool_max_bytes,
+                wal_dir=self.config.ai_logging_wal_dir,
+                wal_sync_interval=self.config.ai_logging_wal_sync_interval,
+                compression=self.config.ai_logging_compression,
+                max_batch_bytes=self.config.ai_logging_max_batch_bytes,
             )
         else:
             self.ai_logger = None
@@ -198,23 +301,153 @@ class CostKatanaClient:
         self.template_manager = TemplateManager(
             api_key=self.config.api_key,
             base_url=self.config.base_url,
+            connection_pool=self.connection_pool,
         )
 
-    @classmethod
-    def from_env(cls) -> "CostKatanaClient":
-        """Zero-config client from COST_KATANA_API_KEY and optional PROJECT_ID."""
-        return cls(config=Config.from_env())
+    @property
+    def last_attempts(self) -> List[AttemptRecord]:
+        """Per-attempt timing of the most recent request in this thread / task"""
+        return get_last_attempts()
+
+    def retry_stats(self) -> Dict[str, float]:
+        """Aggregate retry counters (requests, attempts, retries, wait seconds)"""
+        return self.retry_policy.stats()
+
+    def _coalesce_key(
+        self, message: str, model_id: str, request: Dict[str, Any]
+    ) -> Optional[str]:
+        """Single-flight key for a send_message call, or None to send it alone"""
+        if not self.config.coalesce_requests or request.get("conversation_id"):
+            return None
+        return response_cache_key(self._catalog_scope, model_id, message, request)
+
+    def coalesce_stats(self) -> Dict[str, int]:
+        """Single-flight counters: calls sent, callers coalesced, calls in flight"""
+        return self.single_flight.stats()
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """Response cache counters: hits, misses, evictions, entries, bytes"""
+        stats = self.response_cache.stats() if self.response_cache else {}
+        if self.similarity_cache:
+            stats["similarity"] = self.similarity_cache.stats()
+        return stats
+
+    def rate_limit_stats(self) -> Dict[str, Dict[str, float]]:
+        """Per-scope limiter counters: requests, delayed, rejected, wait time, queue depth"""
+        return self.rate_limiter.stats() if self.rate_limiter else {}
+
+    def circuit_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per model / endpoint circuit state, calls, failures, rejections"""
+        return self.circuit_breaker.stats() if self.circuit_breaker else {}
+
+    @contextmanager
+    def _circuit_call(self, model_id: str, endpoint: str) -> Iterator[CallOutcome]:
+        """Guard a request with the circuit breaker (a no-op when it is disabled)"""
+        if self.circuit_breaker is None:
+            yield CallOutcome()
+            return
+        with self.circuit_breaker.call(model_id, endpoint) as outcome:
+            yield outcome
+
+    def _check_circuit(self, model_id: str, endpoint: str) -> None:
+        """Raise CircuitOpenError before any work is done for an open circuit"""
+        if self.circuit_breaker is not None:
+            self.circuit_breaker.check(model_id, endpoint)
+
+    def hedge_stats(self) -> Dict[str, float]:
+        """Hedging counters: calls, hedges sent, hedges that won, skipped over budget"""
+        return self.hedge_policy.stats() if self.hedge_policy else {}
+
+    def _hedge_policy_for(self, request: Dict[str, Any]) -> Optional[HedgePolicy]:
+        """The policy to hedge a send_message call with (never inside a conversation)"""
+        if request.get("conversation_id"):
+            return None
+        return self.hedge_policy
+
+    def _log_discarded_hedge(self, model_id: str, result: Dict[str, Any]) -> None:
+        """Log the copy of a hedged call that lost the race; it was billed all the same"""
+        if self.ai_logger is None:
+            return
+        from . import _infer_provider
+
+        cost, tokens = _response_usage(result)
+        self.ai_logger.log_ai_call(
+            {
+                "service": _infer_provider(model_id),
+                "operation": "hedge_duplicate",
+                "aiModel": model_id,
+                "statusCode": 200,
+                "responseTime": int((result.get("timing") or {}).get("total", 0)),
+                "totalTokens": tokens,
+                "cost": cost,
+                "success": True,
+                "hedge": {"discarded": True},
+            }
+        )
 
-    def __enter__(self):
-        return self
+    def budget_stats(self) -> Dict[str, Optional[float]]:
+        """Local cost budget: spend in the window, in flight, remaining, rejections"""
+        return self.cost_budget.stats() if self.cost_budget else {}
 
-    def __exit__(self, exc_type, exc_val, exc_tb):
-        self.close()
-
-    def close(self):
-        """Close the HTTP client"""
-        if hasattr(self, "client"):
-            self.client.close()
+    @contextmanager
+    def _budget_call(
+        self, model_id: str, payload: Dict[str, Any]
+    ) -> Iterator[Optional[Reservation]]:
+        """
+        Hold a request's estimated cost against the local budget (raising
+        CostLimitExceededError if it doesn't fit) until it is settled with the
+        reported cost; released if the request fails
+        """
+        if self.cost_budget is None:
+            yield None
+            return
+        estimate = self.cost_budget.estimate(
+            model_id, payload["message"], payload["maxTokens"]
+        )
+        reservation = self.cost_budget.reserve(model_id, estimate)
+        try:
+            yield reservation
+        finally:
+            reservation.release()
+
+    def _budget_stream(
+        self, model_id: str, payload: Dict[str, Any], stream: Any
+    ) -> None:
+        """Check a stream against the local budget and record its cost once consumed"""
+        budget = self.cost_budget
+        if budget is None:
+            return
+        estimate = budget.estimate(model_id, payload["message"], payload["maxTokens"])
+        budget.reserve(model_id, estimate).release()
+
+        def record(s: Any) -> None:
+            # A stream stopped before its final event has no reported cost;
+            # charge an estimate for the output received
+            cost = s.usage.get("cost")
+            if cost is None:
+                cost = budget.estimate(model_id, payload["message"], s.output_tokens)
+            budget.record(cost or 0.0)
+
+        stream.add_done_callback(record)
+
+    def _failover_chain(
+        self, model_id: str, conversation_id: Optional[str] = None
+    ) -> List[str]:
+        """Models to try for a send_message call, requested model first"""
+        # A conversation stays on its model; its history lives with it
+        if self.failover_policy is None or conversation_id is not None:
+            return [model_id]
+        return self.failover_policy.chain(model_id)
+
+    @property
+    def _failover_reasons(self) -> FrozenSet[str]:
+        if self.failover_policy is None:
+            return DEFAULT_FAILOVER_REASONS
+        return self.failover_policy.reasons
+
+    @property
+    def _catalog_scope(self) -> str:
+        return f"{self.config.base_url}|{self.config.project_id or ''}"
 
     def _handle_response(self, response: httpx.Response) -> Dict[str, Any]:
         """Handle HTTP response and raise appropriate exceptions"""
@@ -233,6 +466,8 @@ class CostKatanaClient:
             raise RateLimitError(data.get("message", "Rate limit exceeded"))
         elif response.status_code == 400 and "cost" in data.get("message", "").lower():
             raise CostLimitExceededError(data.get("message", "Cost limit exceeded"))
+        elif response.status_code >= 500:
+            raise ServerError(data.get("message", f"API error: {response.status_code}"))
         elif not response.is_success:
             raise CostKatanaError(
                 data.get("message", f"API error: {response.status_code}")
@@ -240,17 +475,246 @@ class CostKatanaClient:
 
         return data
 
-    def get_available_models(self) -> List[Dict[str, Any]]:
-        """Get list of available models"""
+    def _build_message_payload(
+        self,
+        message: str,
+        model_id: str,
+        conversation_id: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: int = 2000,
+        chat_mode: str = "balanced",
+        use_multi_agent: bool = False,
+        template_id: Optional[str] = None,
+        template_variables: Optional[Dict[str, Any]] = None,
+        thinking: Optional[bool] = None,
+        thinking_effort: Optional[str] = None,
+        thinking_budget_tokens: Optional[int] = None,
+        **kwargs,
+    ) -> Dict[str, Any]:
+        """Build the /api/chat/message body (message is already template-resolved)"""
+        payload = {
+            "message": message,
+            "modelId": model_id,
+            "temperature": temperature,
+            "maxTokens": max_tokens,
+            "chatMode": chat_mode,
+            "useMultiAgent": use_multi_agent,
+            **kwargs,
+        }
+
+        if thinking:
+            thinking_payload: Dict[str, Any] = {"enabled": True}
+            if thinking_effort:
+                thinking_payload["effort"] = thinking_effort
+            if thinking_budget_tokens:
+                thinking_payload["budgetTokens"] = thinking_budget_tokens
+            payload["thinking"] = thinking_payload
+
+        if conversation_id:
+            payload["conversationId"] = conversation_id
+        if template_id:
+            payload["templateId"] = template_id
+            if template_variables:
+                payload["templateVariables"] = template_variables
+
+        return payload
+
+
+class CostKatanaClient(_BaseClient):
+    """HTTP client for Cost Katana API"""
+
+    single_flight: SingleFlight
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None,
+        config_file: Optional[str] = None,
+        timeout: Optional[int] = None,
+        config: Optional[Config] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        response_cache: Optional[ResponseCache] = None,
+        similarity_cache: Optional[SimilarityCache] = None,
+        connection_pool: Optional[ConnectionPool] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        failover_policy: Optional[FailoverPolicy] = None,
+        hedge_policy: Optional[HedgePolicy] = None,
+        cost_budget: Optional[CostBudget] = None,
+        **kwargs,
+    ):
+        """
+        Initialize Cost Katana client.
+
+        Args:
+            api_key: Your Cost Katana API key
+            base_url: Base URL for the API (optional override)
+            config_file: Path to JSON configuration file
+            timeout: Request timeout in seconds
+            config: Pre-built Config (e.g. from Config.from_env())
+            rate_limiter: Optional client-side RateLimiter (default: built
+                from the config's rate_limit_* settings, if any)
+            response_cache: Optional ResponseCache (default: built from the
+                config's response_cache_* settings)
+            similarity_cache: Optional near-duplicate SimilarityCache
+                (default: built from the config's similarity_cache_* settings)
+            connection_pool: ConnectionPool to share (default: the process-wide
+                pool for the config's http_* limits)
+            circuit_breaker: Optional CircuitBreaker (default: built from the
+                config's circuit_breaker_* settings)
+            failover_policy: Optional FailoverPolicy (default: built from
+                the config's failover_chains, providers block and
+                default_model when enable_failover is set)
+            hedge_policy: Optional HedgePolicy (default: built from the
+                config's hedge_* settings when hedge_enabled is set)
+            cost_budget: Optional CostBudget (default: built from the
+                config's cost_limit_* settings when a limit is set)
+        """
+        super().__init__(
+            api_key=api_key,
+            base_url=base_url,
+            config_file=config_file,
+            timeout=timeout,
+            config=config,
+            rate_limiter=rate_limiter,
+            response_cache=response_cache,
+            similarity_cache=similarity_cache,
+            connection_pool=connection_pool,
+            circuit_breaker=circuit_breaker,
+            failover_policy=failover_policy,
+            hedge_policy=hedge_policy,
+            cost_budget=cost_budget,
+            **kwargs,
+        )
+
+        # Initialize HTTP client (on the shared connection pool)
+        self.client = self.connection_pool.client(
+            base_url=self.config.base_url,
+            headers=self.headers,
+            timeout=self.timeout,
+            event_hooks=timing_hooks(),
+        )
+
+        # Coalesces identical concurrent send_message calls
+        self.single_flight = SingleFlight()
+
+        # Threads for hedged calls, started on first use
+        self._hedge_executor: Optional[ThreadPoolExecutor] = None
+        self._hedge_executor_lock = Lock()
+
+        # Cached model catalog (TTL + ETag revalidation)
+        self.model_catalog = ModelCatalog(
+            fetch=self._fetch_model_catalog,
+            ttl=self.config.model_catalog_ttl,
+            stale_ttl=self.config.model_catalog_stale_ttl,
+            persist_path=self.config.model_catalog_path,
+            scope=self._catalog_scope,
+        )
+
+    @classmethod
+    def from_env(cls) -> "CostKatanaClient":
+        """Zero-config client from COST_KATANA_API_KEY and optional PROJECT_ID."""
+        return cls(config=Config.from_env())
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        """Close the HTTP client"""
+        from .models import discard_cached_models
+
+        discard_cached_models(self)
+        if getattr(self, "_hedge_executor", None) is not None:
+            self._hedge_executor.shutdown(wait=False)
+        if hasattr(self, "client"):
+            self.client.close()
+
+    def _hedge_pool(self) -> ThreadPoolExecutor:
+        """Executor for both copies of hedged calls, as wide as the connection pool"""
+        with self._hedge_executor_lock:
+            if self._hedge_executor is None:
+                self._hedge_executor = ThreadPoolExecutor(
+                    max_workers=self.config.http_max_connections or 100,
+                    thread_name_prefix="cost-katana-hedge",
+                )
+            return self._hedge_executor
+
+    def _request(self, method: str, path: str, **kwargs) -> httpx.Response:
+        """Send a request through the retry policy"""
+        return self.retry_policy.run(
+            method,
+            path,
+            lambda timeout: self.client.request(
+                method, path, timeout=timeout, **kwargs
+            ),
+            timeout=self.timeout,
+        )
+
+    def _fetch_model_catalog(
+        self, etag: Optional[str]
+    ) -> Tuple[Optional[List[Dict[str, Any]]], Optional[str]]:
+        """Fetch /api/chat/models; returns (None, etag) on 304 Not Modified"""
         try:
-            response = self.client.get("/api/chat/models")
+            headers = {"If-None-Match": etag} if etag else None
+            response = self._request("GET", "/api/chat/models", headers=headers)
+            if response.status_code == 304:
+                return None, response.headers.get("ETag", etag)
             data = self._handle_response(response)
-            return data.get("data", [])
+            return data.get("data", []), response.headers.get("ETag")
         except Exception as e:
             if isinstance(e, CostKatanaError):
                 raise
             raise CostKatanaError(f"Failed to get models: {str(e)}")
 
+    def get_available_models(self, force_refresh: bool = False) -> List[Dict[str, Any]]:
+        """
+        Get list of available models.
+
+        Served from the client's model catalog cache; pass ``force_refresh=True``
+        to revalidate with the server first.
+        """
+        return self.model_catalog.get_models(force_refresh=force_refresh)
+
+    def find_model(self, model_id: str) -> Optional[Dict[str, Any]]:
+        """Look up a catalog model by id or alias (O(1), served from cache)"""
+        return self.model_catalog.find(model_id)
+
+    def _prepare_payload(
+        self,
+        message: str,
+        model_id: str,
+        template_id: Optional[str] = None,
+        template_variables: Optional[Dict[str, Any]] = None,
+        max_tokens: int = 2000,
+        **kwargs,
+    ) -> Dict[str, Any]:
+        """Resolve the template, apply client-side rate limits and build the payload"""
+        # Handle template if provided
+        actual_message = message
+        if template_id and self.template_manager:
+            resolution = self.template_manager.resolve_template(
+                template_id, template_variables or {}
+            )
+            actual_message = resolution["prompt"]
+
+        if self.rate_limiter:
+            self.rate_limiter.acquire(
+                model_id,
+                self.config.project_id,
+                estimate_request_tokens(actual_message, max_tokens),
+            )
+
+        return self._build_message_payload(
+            actual_message,
+            model_id,
+            max_tokens=max_tokens,
+            template_id=template_id,
+            template_variables=template_variables,
+            **kwargs,
+        )
+
     def send_message(
         self,
         message: str,
@@ -295,47 +759,204 @@ class CostKatanaClient:
             Response data from the API. When thinking is enabled, the
             response may include a `thinking` field with the reasoning
             content (thinking tokens are billed as output tokens).
+
+            Identical concurrent calls (outside a conversation) share one
+            request; the callers that waited on another's request get a copy
+            with ``"coalesced": True``.
+
+            With ``Config.enable_failover``, a call outside a conversation
+            that can't connect, gets a 5xx or hits an open circuit (plus
+            any ``Config.failover_reasons``) is retried on the next model
+            of its failover chain. The
+            response then carries ``"failover": {"from", "to", "reason",
+            "failed"}``, ``"to"`` being the model that served it.
+
+            With ``Config.hedge_enabled``, a call still in flight after the
+            hedge delay is sent a second time and the first reply wins; the
+            response then carries ``"hedge": {"winner", "delay"}`` (ms).
+
+        Raises:
+            CircuitOpenError: The model's circuit breaker is open (and no
+                fallback model could serve the call).
+            CostLimitExceededError: The request's estimated cost doesn't fit
+                the local cost_limit_per_request / cost_limit_per_day budget
+                (nothing is sent), or the gateway refused it.
         """
-        # Handle template if provided
-        actual_message = message
-        if template_id and self.template_manager:
-            resolution = self.template_manager.resolve_template(
-                template_id, template_variables or {}
+        request = dict(
+            conversation_id=conversation_id,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            chat_mode=chat_mode,
+            use_multi_agent=use_multi_agent,
+            template_id=template_id,
+            template_variables=template_variables,
+            thinking=thinking,
+            thinking_effort=thinking_effort,
+            thinking_budget_tokens=thinking_budget_tokens,
+            **kwargs,
+        )
+
+        def send(model: str) -> Dict[str, Any]:
+            started = time.perf_counter()
+            self._check_circuit(model, "/api/chat/message")
+            payload = self._prepare_payload(message, model, **request)
+            with self._budget_call(model, payload) as reservation:
+                try:
+                    with self._circuit_call(model, "/api/chat/message") as outcome:
+                        response = self._request(
+                            "POST", "/api/chat/message", json=payload
+                        )
+                        outcome.status = response.status_code
+                        result = self._handle_response(response)
+                except Exception as e:
+                    if isinstance(e, CostKatanaError):
+                        raise
+                    raise _send_error(e)
+                if reservation is not None:
+                    reservation.settle(_response_usage(result)[0])
+            record_usage(model, result)
+            return attach_timing(result, response, started, get_last_attempts())
+
+        def hedged(model: str) -> Dict[str, Any]:
+            policy = self._hedge_policy_for(request)
+            if policy is None:
+                return send(model)
+            return run_hedged(
+                policy,
+                model,
+                lambda: send(model),
+                self._hedge_pool(),
+                lambda result: self._log_discarded_hedge(model, result),
             )
-            actual_message = resolution["prompt"]
 
-        payload = {
-            "message": actual_message,
-            "modelId": model_id,
-            "temperature": temperature,
-            "maxTokens": max_tokens,
-            "chatMode": chat_mode,
-            "useMultiAgent": use_multi_agent,
-            **kwargs,
-        }
+        def run(model: str) -> Dict[str, Any]:
+            key = self._coalesce_key(message, model, request)
+            if key is None:
+                return hedged(model)
+            result, coalesced = self.single_flight.do(key, lambda: hedged(model))
+            return mark_coalesced(result) if coalesced else result
+
+        with track_request(model_id):
+            return run_with_failover(
+                self._failover_chain(model_id, conversation_id),
+                run,
+                self._failover_reasons,
+            )
 
-        if thinking:
-            thinking_payload: Dict[str, Any] = {"enabled": True}
-            if thinking_effort:
-                thinking_payload["effort"] = thinking_effort
-            if thinking_budget_tokens:
-                thinking_payload["budgetTokens"] = thinking_budget_tokens
-            payload["thinking"] = thinking_payload
+    def stream_message(
+        self,
+        message: str,
+        model_id: str,
+        conversation_id: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: int = 2000,
+        chat_mode: str = "balanced",
+        use_multi_agent: bool = False,
+        template_id: Optional[str] = None,
+        template_variables: Optional[Dict[str, Any]] = None,
+        thinking: Optional[bool] = None,
+        thinking_effort: Optional[str] = None,
+        thinking_budget_tokens: Optional[int] = None,
+        **kwargs,
+    ) -> MessageStream:
+        """
+        Stream a reply as server-sent events.
 
-        if conversation_id:
-            payload["conversationId"] = conversation_id
-        if template_id:
-            payload["templateId"] = template_id
-            if template_variables:
-                payload["templateVariables"] = template_variables
+        Takes the same arguments as :meth:`send_message`. The request is sent
+        when iteration starts; retries only apply until the stream is open.
+
+        Returns:
+            MessageStream yielding text chunks; once exhausted it exposes
+            ``text``, ``usage`` (cost, tokens, ...), ``thinking``,
+            ``time_to_first_token`` and ``tokens_per_second``.
 
+        Example:
+            for chunk in client.stream_message("Hello", "amazon.nova-lite-v1:0"):
+                print(chunk, end="", flush=True)
+        """
+        started = time.perf_counter()
+        payload = self._prepare_payload(
+            message,
+            model_id,
+            conversation_id=conversation_id,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            chat_mode=chat_mode,
+            use_multi_agent=use_multi_agent,
+            template_id=template_id,
+            template_variables=template_variables,
+            thinking=thinking,
+            thinking_effort=thinking_effort,
+            thinking_budget_tokens=thinking_budget_tokens,
+            stream=True,
+            **kwargs,
+        )
+        stream = MessageStream(self._stream_events(payload), started)
+        self._budget_stream(model_id, payload, stream)
+        return stream
+
+    def _stream_events(self, payload: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        path = "/api/chat/message"
         try:
-            response = self.client.post("/api/chat/message", json=payload)
-            return self._handle_response(response)
+            response = self.retry_policy.run(
+                "POST",
+                path,
+                lambda timeout: self.client.send(
+                    self.client.build_request(
+                        "POST",
+                        path,
+                        json=payload,
+                        headers={"Accept": "text/event-stream"},
+                        timeout=timeout,
+                    ),
+                    stream=True,
+                ),
+                timeout=self.timeout,
+            )
         except Exception as e:
-            if isinstance(e, CostKatanaError):
-                raise
-            raise CostKatanaError(f"Failed to send message: {str(e)}")
+            raise CostKatanaError(f"Failed to stream message: {str(e)}")
+
+        try:
+            if not response.is_success:
+                response.read()
+                self._handle_response(response)
+            yield from iter_sse_events(response.iter_lines())
+        except CostKatanaError:
+            raise
+        except Exception as e:
+            raise CostKatanaError(f"Failed to stream message: {str(e)}")
+        finally:
+            response.close()
+
+    def send_messages(
+        self,
+        messages: Sequence[str],
+        model_id: str,
+        concurrency: int = 8,
+        progress: Optional[ProgressCallback] = None,
+        **kwargs,
+    ) -> BatchResult[Dict[str, Any]]:
+        """
+        Send many independent messages concurrently over this client's connection pool.
+
+        Args:
+            messages: Messages to send
+            model_id: ID of the model to use
+            concurrency: Maximum requests in flight
+            progress: Optional ``progress(completed, total)`` callback
+            **kwargs: Passed to :meth:`send_message` for every item
+
+        Returns:
+            BatchResult with response data in input order; failed items are
+            ``None`` in ``results`` and their exception is in ``errors``.
+        """
+        return run_batch(
+            lambda message: self.send_message(message, model_id, **kwargs),
+            messages,
+            concurrency,
+            _response_usage,
+            progress,
+        )
 
     def create_conversation(
         self, title: Optional[str] = None, model_id: Optional[str] = None
@@ -348,7 +969,7 @@ class CostKatanaClient:
             payload["modelId"] = model_id
 
         try:
-            response = self.client.post("/api/chat/conversations", json=payload)
+            response = self._request("POST", "/api/chat/conversations", json=payload)
             return self._handle_response(response)
         except Exception as e:
             if isinstance(e, CostKatanaError):
@@ -358,8 +979,8 @@ class CostKatanaClient:
     def get_conversation_history(self, conversation_id: str) -> Dict[str, Any]:
         """Get conversation history"""
         try:
-            response = self.client.get(
-                f"/api/chat/conversations/{conversation_id}/history"
+            response = self._request(
+                "GET", f"/api/chat/conversations/{conversation_id}/history"
             )
             return self._handle_response(response)
         except Exception as e:
@@ -370,7 +991,9 @@ class CostKatanaClient:
     def delete_conversation(self, conversation_id: str) -> Dict[str, Any]:
         """Delete a conversation"""
         try:
-            response = self.client.delete(f"/api/chat/conversations/{conversation_id}")
+            response = self._request(
+                "DELETE", f"/api/chat/conversations/{conversation_id}"
+            )
             return self._handle_response(response)
         except Exception as e:
             if isinstance(e, CostKatanaError):
@@ -384,7 +1007,7 @@ class CostKatanaClient:
         Calls ``GET /api/gateway/security/summary`` with the same auth as other dashboard APIs.
         """
         try:
-            response = self.client.get(f"{GATEWAY_API_PREFIX}/security/summary")
+            response = self._request("GET", f"{GATEWAY_API_PREFIX}/security/summary")
             data = self._handle_response(response)
             return data.get("data", data)
         except Exception as e:
@@ -11,7 +11,7 @@ not configured via env.
 
 import json
 import os
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from dataclasses import dataclass, asdict, fields
 from pathlib import Path
 
@@ -36,20 +36,115 @@ class Config:
     timeout: int = _DEFAULT_TIMEOUT
     max_retries: int = 3
     retry_delay: float = 1.0
+    retry_max_delay: float = 20.0
+    retry_deadline: Optional[float] = 60.0
     default_model: str = _DEFAULT_MODEL
     default_temperature: float = 0.7
     default_max_tokens: int = 2000
     default_chat_mode: str = "balanced"
     enable_analytics: bool = True
     enable_optimization: bool = True
-    enable_failover: bool = True
+    # Opt-in; fallback models per model (names or models_constants values),
+    # models without a chain use the "providers" block priorities. Failover
+    # reasons default to failover.DEFAULT_FAILOVER_REASONS; "timeout" and
+    # "model_not_available" can be added
+    enable_failover: bool = False
+    failover_chains: Optional[Dict[str, List[str]]] = None
+    failover_max_attempts: int = 3
+    failover_reasons: Optional[List[str]] = None
+    # Enforced locally before sending (estimated from model_pricing, USD per
+    # 1M input / output tokens, merged over budget.DEFAULT_PRICING) and by
+    # the gateway; the daily limit covers a rolling cost_limit_window (s).
+    # cost_ledger_path shares the spend ledger between processes on a host
     cost_limit_per_request: Optional[float] = None
     cost_limit_per_day: Optional[float] = None
+    cost_limit_window: float = 86400.0
+    cost_ledger_path: Optional[str] = None
+    model_pricing: Optional[Dict[str, List[float]]] = None
+
+    # Client-side rate limiting (per-model / per-project rules go in a
+    # "rate_limits" block of the config file); policy is "block" or "fail_fast"
+    rate_limit_requests_per_second: Optional[float] = None
+    rate_limit_tokens_per_minute: Optional[float] = None
+    rate_limit_policy: str = "block"
+    rate_limit_max_wait: Optional[float] = None
+
+    # HTTP connection pool shared by the client, AI logger and template manager
+    http_max_connections: Optional[int] = 100
+    http_max_keepalive_connections: Optional[int] = 20
+    http_keepalive_expiry: Optional[float] = 30.0
+    # Multiplex requests over HTTP/2 when the server negotiates it (needs h2)
+    http2: bool = False
+
+    # Model catalog cache (seconds); path enables on-disk persistence
+    model_catalog_ttl: float = 300.0
+    model_catalog_stale_ttl: float = 3600.0
+    model_catalog_path: Optional[str] = None
+
+    # In-process response cache; only deterministic (temperature 0) requests
+    # are cached unless a call passes cache=True
+    response_cache_enabled: bool = True
+    response_cache_max_entries: int = 1024
+    response_cache_max_bytes: int = 64 * 1024 * 1024
+    response_cache_ttl: Optional[float] = 3600.0
+    # SQLite file shared by all processes on the host (disk tier, optional)
+    response_cache_path: Optional[str] = None
+    response_cache_disk_max_bytes: int = 512 * 1024 * 1024
+    # Near-duplicate (MinHash) cache for prompts that differ only slightly;
+    # off by default, same cacheability rules and TTL as the response cache
+    similarity_cache_enabled: bool = False
+    similarity_cache_threshold: float = 0.9
+    similarity_cache_max_entries: int = 1024
+
+    # Per model / endpoint circuit breaker: while a model fails or is slow,
+    # send_message raises CircuitOpenError at once (or fails over when
+    # enable_failover is set) instead of waiting out timeout
+    circuit_breaker_enabled: bool = True
+    circuit_breaker_failure_rate: float = 0.5
+    circuit_breaker_slow_call_duration: Optional[float] = None
+    circuit_breaker_slow_call_rate: float = 0.5
+    circuit_breaker_minimum_calls: int = 10
+    circuit_breaker_window_size: int = 20
+    circuit_breaker_open_duration: float = 30.0
+    circuit_breaker_half_open_calls: int = 1
+
+    # Opt-in request hedging: once a send_message call has been in flight for
+    # hedge_delay seconds (or, if unset, the model's observed hedge_percentile
+    # latency) a duplicate is sent and the first reply wins; hedge_max_rate
+    # caps duplicates per request. Calls in a conversation are never hedged
+    hedge_enabled: bool = False
+    hedge_delay: Optional[float] = None
+    hedge_percentile: float = 0.95
+    hedge_max_rate: float = 0.05
+
+    # Share one in-flight request between identical concurrent send_message calls
+    coalesce_requests: bool = True
 
     # Logging configuration
     enable_ai_logging: bool = True
     ai_logging_batch_size: int = 50
     ai_logging_flush_interval: float = 5.0
+    # Entries waiting for upload; when full, "drop_oldest", "drop_newest" or
+    # "block" (for up to ai_logging_block_timeout seconds, then drop)
+    ai_logging_max_queue_size: int = 10000
+    ai_logging_overflow_policy: str = "drop_oldest"
+    ai_logging_block_timeout: float = 1.0
+    # Memory cap on queued entries by serialized size; with a spool dir,
+    # entries past either cap go to disk (up to ai_logging_spool_max_bytes)
+    # and are uploaded when the backend is reachable again
+    ai_logging_max_queue_bytes: int = 32 * 1024 * 1024
+    ai_logging_spool_dir: Optional[str] = None
+    ai_logging_spool_max_bytes: int = 256 * 1024 * 1024
+    # Durable mode: every entry is appended to a write-ahead log in this
+    # directory before log_ai_call returns (fsync'd at most every
+    # ai_logging_wal_sync_interval seconds) and uploaded from there, so
+    # entries unacknowledged at a crash are resent on the next start
+    ai_logging_wal_dir: Optional[str] = None
+    ai_logging_wal_sync_interval: float = 0.1
+    # Upload bodies: Content-Encoding ("none", or opt-in "gzip" / "zstd" with
+    # the zstandard package), and a byte budget per batch alongside batch_size
+    ai_logging_compression: str = "none"
+    ai_logging_max_batch_bytes: int = 1024 * 1024
     log_level: str = "info"
 
     def __post_init__(self):
@@ -153,6 +248,25 @@ class Config:
             return self._extra_data["providers"].get(provider, {})
         return {}
 
+    def get_providers_config(self) -> Dict[str, Dict[str, Any]]:
+        """Get the whole ``providers`` block (provider name -> priority, models)"""
+        if hasattr(self, "_extra_data"):
+            return self._extra_data.get("providers", {})
+        return {}
+
+    def get_rate_limit_config(self) -> Dict[str, Any]:
+        """
+        Get the ``rate_limits`` block from the config file, e.g.::
+
+            "rate_limits": {
+                "models": {"gpt-4": {"requests_per_second": 2, "tokens_per_minute": 40000}},
+                "projects": {"proj_123": {"requests_per_second": 10}}
+            }
+        """
+        if hasattr(self, "_extra_data"):
+            return self._extra_data.get("rate_limits", {})
+        return {}
+
     def get_model_mapping(self, model_name: str) -> str:
         """
         Map user-friendly model names to internal model IDs.
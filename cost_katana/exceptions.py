@@ -2,6 +2,8 @@
 Custom exceptions for Cost Katana
 """
 
+from typing import Optional
+
 
 class CostKatanaError(Exception):
     """Base exception for Cost Katana errors"""
@@ -27,10 +29,47 @@ class RateLimitError(CostKatanaError):
     pass
 
 
-class CostLimitExceededError(CostKatanaError):
-    """Raised when cost limits are exceeded"""
+class ClientRateLimitError(RateLimitError):
+    """Raised when the client-side rate limiter rejects a request before sending it"""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
 
-    pass
+
+class CircuitOpenError(CostKatanaError):
+    """Raised without a network round trip while a model's circuit breaker is open"""
+
+    def __init__(
+        self,
+        message: str,
+        model_id: Optional[str] = None,
+        endpoint: Optional[str] = None,
+        retry_after: Optional[float] = None,
+    ):
+        super().__init__(message)
+        self.model_id = model_id
+        self.endpoint = endpoint
+        self.retry_after = retry_after
+
+
+class CostLimitExceededError(CostKatanaError):
+    """
+    Raised when cost limits are exceeded, by the gateway or, without a
+    network round trip, by the client's local budget
+    """
+
+    def __init__(
+        self,
+        message: str,
+        limit: Optional[float] = None,
+        estimated_cost: Optional[float] = None,
+        spent: Optional[float] = None,
+    ):
+        super().__init__(message)
+        self.limit = limit
+        self.estimated_cost = estimated_cost
+        self.spent = spent
 
 
 class ConversationNotFoundError(CostKatanaError):
@@ -45,6 +84,12 @@ class InvalidConfigurationError(CostKatanaError):
     pass
 
 
+class ServerError(CostKatanaError):
+    """Raised when the gateway or the model provider returns a 5xx response"""
+
+    pass
+
+
 class NetworkError(CostKatanaError):
     """Raised when network requests fail"""
 
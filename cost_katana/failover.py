@@ -0,0 +1,213 @@
+"""
+Model failover for Cost Katana
+Ordered fallback chains per model (explicit, or from the config file's
+provider priorities) and the loop that walks them when a request fails
+"""
+
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from .exceptions import (
+    CircuitOpenError,
+    CostKatanaError,
+    ModelNotAvailableError,
+    ModelTimeoutError,
+    NetworkError,
+    ServerError,
+)
+from .logging.logger import logger
+
+# Failures another model may not share, and the reason recorded for each
+_FAILOVER_REASONS: Tuple[Tuple[type, str], ...] = (
+    (CircuitOpenError, "circuit_open"),
+    (ModelTimeoutError, "timeout"),
+    (NetworkError, "network_error"),
+    (ServerError, "server_error"),
+    (ModelNotAvailableError, "model_not_available"),
+)
+
+# Reasons that fail over unless a policy lists its own. A timed-out request
+# may already have been served and billed, and a 404 is usually a mistyped
+# model id or an unknown conversation, so both have to be opted into
+DEFAULT_FAILOVER_REASONS: FrozenSet[str] = frozenset(
+    {"circuit_open", "network_error", "server_error"}
+)
+
+
+def failover_reason(error: BaseException) -> Optional[str]:
+    """Why ``error`` warrants trying the next model, or None if it doesn't"""
+    for error_type, reason in _FAILOVER_REASONS:
+        if isinstance(error, error_type):
+            return reason
+    return None
+
+
+class FailoverPolicy:
+    """
+    Fallback models to try, in order, when a request to a model fails.
+
+    ``chains`` maps a model to its explicit fallbacks (an empty list turns
+    failover off for that model). Models without a chain that are listed in
+    ``providers`` (the config file's ``{"name": {"priority": n, "models":
+    [...]}}`` block) fall back to the other listed models, lowest priority
+    number first. Anything else falls back to ``default_model`` if one is
+    given, and otherwise isn't failed over. Names are passed through
+    ``resolve`` (e.g. ``Config.get_model_mapping``) so chains can use the
+    same aliases and ``models_constants`` values as ``ai()``. At most
+    ``max_attempts`` models are tried per call, and only failures whose
+    :func:`failover_reason` is in ``reasons`` (default:
+    ``DEFAULT_FAILOVER_REASONS``) move on to the next one.
+    """
+
+    def __init__(
+        self,
+        chains: Optional[Dict[str, Sequence[str]]] = None,
+        providers: Optional[Dict[str, Dict[str, Any]]] = None,
+        default_model: Optional[str] = None,
+        max_attempts: int = 3,
+        resolve: Optional[Callable[[str], str]] = None,
+        reasons: Optional[Iterable[str]] = None,
+    ):
+        if max_attempts < 1:
+            raise ValueError("max_attempts must be at least 1")
+        self.reasons = (
+            DEFAULT_FAILOVER_REASONS if reasons is None else frozenset(reasons)
+        )
+        unknown = self.reasons - {reason for _, reason in _FAILOVER_REASONS}
+        if unknown:
+            raise ValueError(f"Unknown failover reasons: {sorted(unknown)}")
+        self.max_attempts = max_attempts
+        self._resolve = resolve or (lambda name: name)
+        self.default_model = self._resolve(default_model) if default_model else None
+        self.chains = {
+            self._resolve(model): [self._resolve(m) for m in fallbacks]
+            for model, fallbacks in (chains or {}).items()
+        }
+
+        ranked = sorted(
+            (settings.get("priority", float("inf")), index, settings.get("models", []))
+            for index, settings in enumerate((providers or {}).values())
+        )
+        self.priority_models: List[str] = []
+        for _, _, models in ranked:
+            for model in models:
+                model_id = self._resolve(model)
+                if model_id not in self.priority_models:
+                    self.priority_models.append(model_id)
+
+    def chain(self, model_id: str) -> List[str]:
+        """``model_id`` followed by the models to fail over to, in order"""
+        fallbacks = self.chains.get(model_id)
+        if fallbacks is None:
+            if model_id in self.priority_models:
+                fallbacks = self.priority_models
+            else:
+                fallbacks = [self.default_model] if self.default_model else []
+
+        chain = [model_id]
+        for model in fallbacks:
+            if len(chain) >= self.max_attempts:
+                break
+            if model not in chain:
+                chain.append(model)
+        return chain
+
+
+def failover_policy_from_config(config: Any) -> Optional[FailoverPolicy]:
+    """
+    Build a FailoverPolicy from Config (None unless enable_failover is set).
+    Only models with a ``failover_chains`` entry or in the ``providers``
+    block fail over; ``default_model`` is not used as a fallback.
+    """
+    if not config.enable_failover:
+        return None
+    return FailoverPolicy(
+        chains=config.failover_chains,
+        providers=config.get_providers_config(),
+        max_attempts=config.failover_max_attempts,
+        resolve=config.get_model_mapping,
+        reasons=config.failover_reasons,
+    )
+
+
+def mark_failover(
+    result: Dict[str, Any],
+    requested: str,
+    served_by: str,
+    failures: List[Tuple[str, str]],
+) -> Dict[str, Any]:
+    """
+    Record on a send_message result which model served it; ``failures`` are
+    the (model, reason) pairs tried before it. Returned unchanged if the
+    requested model served it.
+    """
+    if not failures:
+        return result
+    result = dict(result)
+    result["failover"] = {
+        "from": requested,
+        "to": served_by,
+        "reason": failures[0][1],
+        "failed": [{"model": model, "reason": reason} for model, reason in failures],
+    }
+    return result
+
+
+def _record_failure(
+    error: CostKatanaError,
+    model: str,
+    next_model: str,
+    failures: List[Tuple[str, str]],
+    reasons: FrozenSet[str],
+) -> None:
+    """Note a failure that moves the call on to ``next_model``, or re-raise it"""
+    reason = failover_reason(error)
+    if reason is None or reason not in reasons:
+        raise error
+    failures.append((model, reason))
+    logger.warn(f"{error} — failing over from '{model}' to '{next_model}'")
+
+
+def run_with_failover(
+    chain: List[str],
+    send: Callable[[str], Dict[str, Any]],
+    reasons: FrozenSet[str] = DEFAULT_FAILOVER_REASONS,
+) -> Dict[str, Any]:
+    """
+    Call ``send(model)`` for each model of ``chain`` until one succeeds.
+
+    Only failures whose :func:`failover_reason` is in ``reasons`` move on to
+    the next model; anything else, and the last model's failure, is raised.
+    """
+    failures: List[Tuple[str, str]] = []
+    for model, next_model in zip(chain, chain[1:]):
+        try:
+            return mark_failover(send(model), chain[0], model, failures)
+        except CostKatanaError as e:
+            _record_failure(e, model, next_model, failures, reasons)
+    return mark_failover(send(chain[-1]), chain[0], chain[-1], failures)
+
+
+async def arun_with_failover(
+    chain: List[str],
+    send: Callable[[str], Awaitable[Dict[str, Any]]],
+    reasons: FrozenSet[str] = DEFAULT_FAILOVER_REASONS,
+) -> Dict[str, Any]:
+    """Async counterpart of :func:`run_with_failover`"""
+    failures: List[Tuple[str, str]] = []
+    for model, next_model in zip(chain, chain[1:]):
+        try:
+            return mark_failover(await send(model), chain[0], model, failures)
+        except CostKatanaError as e:
+            _record_failure(e, model, next_model, failures, reasons)
+    return mark_failover(await send(chain[-1]), chain[0], chain[-1], failures)
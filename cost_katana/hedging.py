@@ -0,0 +1,235 @@
+"""
+Request hedging for Cost Katana
+Send a duplicate of a slow request and keep whichever reply arrives first
+"""
+
+import asyncio
+import contextvars
+import math
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from threading import Lock
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Union
+
+from .metrics import HEDGES
+
+PRIMARY = "primary"
+HEDGE = "hedge"
+
+Discarded = Callable[[Dict[str, Any]], None]
+
+
+class HedgePolicy:
+    """
+    When to hedge a request, and how many hedges may be sent.
+
+    A duplicate is sent once a call has been in flight for ``delay`` seconds,
+    or, without a fixed delay, for the model's observed ``percentile``
+    latency (once ``min_samples`` calls have completed; the last ``window``
+    are kept). Every call earns ``max_rate`` hedge credits (up to ``burst``)
+    and a hedge spends one, so at most about ``max_rate`` duplicates are sent
+    per request however slow the gateway gets.
+    """
+
+    def __init__(
+        self,
+        delay: Optional[float] = None,
+        percentile: float = 0.95,
+        max_rate: float = 0.05,
+        burst: float = 10.0,
+        min_samples: int = 20,
+        window: int = 200,
+    ):
+        if not 0 < percentile < 1:
+            raise ValueError("percentile must be between 0 and 1")
+        if max_rate < 0:
+            raise ValueError("max_rate must not be negative")
+        self.delay = delay
+        self.percentile = percentile
+        self.max_rate = max_rate
+        self.burst = burst
+        self.min_samples = min_samples
+        self.window = window
+        self._latencies: Dict[str, Deque[float]] = {}
+        self._credits = 0.0
+        self._lock = Lock()
+        self._stats = {
+            "requests": 0,
+            "hedged": 0,
+            "hedge_wins": 0,
+            "over_budget": 0,
+        }
+
+    def hedge_delay(self, model_id: str) -> Optional[float]:
+        """Seconds to wait before hedging a call to ``model_id`` (None: don't hedge)"""
+        with self._lock:
+            self._stats["requests"] += 1
+            self._credits = min(self.burst, self._credits + self.max_rate)
+            if self.delay is not None:
+                return self.delay
+            samples = self._latencies.get(model_id)
+            if samples is None or len(samples) < self.min_samples:
+                return None
+            ordered = sorted(samples)
+            index = math.ceil(self.percentile * len(ordered)) - 1
+            return ordered[min(len(ordered) - 1, index)]
+
+    def observe(self, model_id: str, seconds: float) -> None:
+        """Record the latency of a completed call"""
+        with self._lock:
+            samples = self._latencies.get(model_id)
+            if samples is None:
+                samples = self._latencies[model_id] = deque(maxlen=self.window)
+            samples.append(seconds)
+
+    def try_hedge(self) -> bool:
+        """Spend one hedge credit; False when the hedge budget is exhausted"""
+        with self._lock:
+            if self._credits < 1:
+                self._stats["over_budget"] += 1
+                return False
+            self._credits -= 1
+            self._stats["hedged"] += 1
+            return True
+
+    def record_winner(self, model_id: str, winner: str) -> None:
+        """Count a hedged call by which copy answered first"""
+        HEDGES.inc(1, model_id, winner)
+        if winner == HEDGE:
+            with self._lock:
+                self._stats["hedge_wins"] += 1
+
+    def stats(self) -> Dict[str, float]:
+        """Calls seen, hedges sent, hedges that won, hedges skipped over budget"""
+        with self._lock:
+            return dict(self._stats)
+
+
+def _mark_hedged(result: Dict[str, Any], winner: str, delay: float) -> Dict[str, Any]:
+    result = dict(result)
+    result["hedge"] = {"winner": winner, "delay": round(delay * 1000, 3)}
+    return result
+
+
+def _succeeded(future: "Union[Future[Any], asyncio.Future[Any]]") -> bool:
+    return not future.cancelled() and future.exception() is None
+
+
+def run_hedged(
+    policy: HedgePolicy,
+    model_id: str,
+    send: Callable[[], Dict[str, Any]],
+    executor: ThreadPoolExecutor,
+    on_discarded: Optional[Discarded] = None,
+) -> Dict[str, Any]:
+    """
+    Call ``send`` and hedge it per ``policy``.
+
+    Both copies run on ``executor``. A blocking httpx request can't be
+    interrupted, so the slower copy runs to completion in the background and
+    its result goes to ``on_discarded``. If the first copy to finish fails,
+    the other one is awaited; when both fail the primary's error is raised.
+    """
+    started = time.perf_counter()
+    delay = policy.hedge_delay(model_id)
+    if delay is None:
+        result = send()
+        policy.observe(model_id, time.perf_counter() - started)
+        return result
+
+    primary = executor.submit(contextvars.copy_context().run, send)
+    try:
+        result = primary.result(timeout=delay)
+    except FutureTimeoutError:
+        pass
+    else:
+        policy.observe(model_id, time.perf_counter() - started)
+        return result
+
+    if not policy.try_hedge():
+        result = primary.result()
+        policy.observe(model_id, time.perf_counter() - started)
+        return result
+
+    hedge = executor.submit(contextvars.copy_context().run, send)
+    copies = {primary: PRIMARY, hedge: HEDGE}
+    done, pending = wait(copies, return_when=FIRST_COMPLETED)
+    winner = next((f for f in done if _succeeded(f)), None)
+    if winner is None:
+        # The first copy to finish failed; the other one may still succeed
+        wait(pending)
+        winner = next((f for f in copies if _succeeded(f)), primary)
+
+    loser = hedge if winner is primary else primary
+
+    def discard(future: Future) -> None:
+        if on_discarded is not None and _succeeded(future):
+            on_discarded(future.result())
+
+    loser.add_done_callback(discard)
+    result = winner.result()
+    policy.observe(model_id, time.perf_counter() - started)
+    policy.record_winner(model_id, copies[winner])
+    return _mark_hedged(result, copies[winner], delay)
+
+
+async def arun_hedged(
+    policy: HedgePolicy,
+    model_id: str,
+    send: Callable[[], Awaitable[Dict[str, Any]]],
+    on_discarded: Optional[Discarded] = None,
+) -> Dict[str, Any]:
+    """
+    Async counterpart of :func:`run_hedged`: both copies are tasks on the
+    running loop and the slower one is cancelled. ``on_discarded`` only sees
+    a loser that had already completed.
+    """
+    started = time.perf_counter()
+    delay = policy.hedge_delay(model_id)
+    if delay is None:
+        result = await send()
+        policy.observe(model_id, time.perf_counter() - started)
+        return result
+
+    primary = asyncio.ensure_future(send())
+    copies = {primary: PRIMARY}
+    try:
+        done, _ = await asyncio.wait({primary}, timeout=delay)
+        if done or not policy.try_hedge():
+            result = await primary
+            policy.observe(model_id, time.perf_counter() - started)
+            return result
+
+        hedge = asyncio.ensure_future(send())
+        copies[hedge] = HEDGE
+        done, pending = await asyncio.wait(copies, return_when=asyncio.FIRST_COMPLETED)
+        winner = next((t for t in done if _succeeded(t)), None)
+        if winner is None:
+            await asyncio.wait(pending)
+            winner = next((t for t in copies if _succeeded(t)), primary)
+    finally:
+        # The slower copy (or both, if the caller was cancelled)
+        for task in copies:
+            if not task.done():
+                task.cancel()
+
+    loser = hedge if winner is primary else primary
+    if loser.done() and _succeeded(loser) and on_discarded is not None:
+        on_discarded(loser.result())
+    result = winner.result()
+    policy.observe(model_id, time.perf_counter() - started)
+    policy.record_winner(model_id, copies[winner])
+    return _mark_hedged(result, copies[winner], delay)
+
+
+def hedge_policy_from_config(config: Any) -> Optional[HedgePolicy]:
+    """Build a HedgePolicy from Config's hedge_* fields, or None"""
+    if not config.hedge_enabled:
+        return None
+    return HedgePolicy(
+        delay=config.hedge_delay,
+        percentile=config.hedge_percentile,
+        max_rate=config.hedge_max_rate,
+    )
@@ -4,21 +4,106 @@ Non-blocking async logging with batching for AI operations
 """
 
 import contextlib
+import gzip
+import json
 import os
 import re
 import time
 import uuid
+import weakref
+from collections import deque
 from datetime import datetime
-from threading import Lock, Thread
-from typing import Any, Dict, List, Optional, cast
+from threading import Condition, Lock, Thread, current_thread
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple, cast
 
 import httpx
 
+from ..metrics import (
+    LOG_DROPPED,
+    LOG_ENQUEUED,
+    LOG_FLUSH_DURATION,
+    LOG_QUEUE_DEPTH,
+    LOG_UPLOAD_BYTES,
+)
+from ..pool import ConnectionPool, shared_connection_pool
 from .logger import logger
+from .spool import LogSpool
+from .wal import WriteAheadLog
+
+# Live loggers, summed into the queue-depth gauge when metrics are collected
+_loggers: "weakref.WeakSet[AILogger]" = weakref.WeakSet()
+
+
+def _queue_depth() -> Dict[tuple, float]:
+    return {(): float(sum(len(log.log_buffer) for log in list(_loggers)))}
+
+
+LOG_QUEUE_DEPTH.set_function(_queue_depth)
+
+# What log_ai_call does when max_queue_size entries are already waiting
+DROP_OLDEST = "drop_oldest"
+DROP_NEWEST = "drop_newest"
+BLOCK = "block"
+_OVERFLOW_POLICIES = (DROP_OLDEST, DROP_NEWEST, BLOCK)
+
+# Content-Encoding of upload bodies
+_COMPRESSIONS = ("gzip", "zstd", "none")
+
+
+def _compressor(name: str) -> Tuple[Optional[str], Callable[[bytes], bytes]]:
+    """The Content-Encoding header value and compress function for ``name``"""
+    if name not in _COMPRESSIONS:
+        raise ValueError(f"Unknown compression: {name}")
+    if name == "zstd":
+        try:
+            import zstandard
+
+            return "zstd", zstandard.ZstdCompressor(level=3).compress
+        except ImportError:
+            logger.warn(
+                "zstd compression requested but the 'zstandard' package is not "
+                "installed (pip install 'cost-katana[zstd]'); using gzip"
+            )
+            name = "gzip"
+    if name == "gzip":
+        return "gzip", lambda body: gzip.compress(body, compresslevel=6)
+    return None, lambda body: body
 
 
 class AILogger:
-    """AI Logger with batching and async processing"""
+    """
+    AI Logger with batching and async processing.
+
+    Entries wait in a bounded queue drained by one background worker, which
+    wakes once ``batch_size`` entries are queued or ``flush_interval``
+    seconds have passed (after a failed upload it waits the full interval).
+    ``log_ai_call`` only queues a shallow copy of the entry; enrichment,
+    redaction and truncation run when the worker takes it into a batch.
+    The queue holds at most ``max_queue_size`` entries and
+    ``max_queue_bytes`` of serialized entries. With a ``spool_dir``, entries
+    past those limits are moved, oldest first, to an on-disk
+    :class:`LogSpool` (at most ``spool_max_bytes``) that is uploaded before
+    the queue. Without one, ``overflow_policy`` decides what happens to a
+    new entry when the queue is full: ``"drop_oldest"`` (default) evicts
+    the oldest, ``"drop_newest"`` discards the new entry, ``"block"`` makes
+    the caller wait up to ``block_timeout`` seconds for room before
+    discarding it.
+
+    An upload carries at most ``batch_size`` entries and, past the first,
+    ``max_batch_bytes`` of serialized JSON; a queue holding that many bytes
+    wakes the worker like a full batch does. Bodies are sent uncompressed
+    by default; ``compression="gzip"`` or ``"zstd"`` (needs the
+    ``zstandard`` package, else gzip) sets ``Content-Encoding``.
+
+    With a ``wal_dir`` the logger runs in durable mode: each entry is
+    prepared and appended to a :class:`WriteAheadLog` before
+    ``log_ai_call`` returns
+    (``fsync`` batched every ``wal_sync_interval`` seconds), the queue is
+    bypassed, and uploads are read from the log and acknowledged there.
+    Entries a crashed process never got acknowledged are uploaded again by
+    the next logger on the same directory, with their original
+    ``requestId`` so the backend can deduplicate them.
+    """
 
     def __init__(
         self,
@@ -31,7 +116,21 @@ class AILogger:
         max_prompt_length: int = 1000,
         max_result_length: int = 1000,
         redact_sensitive_data: bool = True,
+        connection_pool: Optional[ConnectionPool] = None,
+        max_queue_size: int = 10000,
+        overflow_policy: str = DROP_OLDEST,
+        block_timeout: float = 1.0,
+        max_queue_bytes: int = 32 * 1024 * 1024,
+        spool_dir: Optional[str] = None,
+        spool_max_bytes: int = 256 * 1024 * 1024,
+        wal_dir: Optional[str] = None,
+        wal_sync_interval: float = 0.1,
+        compression: str = "none",
+        max_batch_bytes: int = 1024 * 1024,
     ):
+        if overflow_policy not in _OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {overflow_policy}")
+        self._content_encoding, self._compress = _compressor(compression)
         self.config = {
             "api_key": api_key or "",
             "project_id": project_id or "",
@@ -42,13 +141,56 @@ class AILogger:
             "max_prompt_length": max_prompt_length,
             "max_result_length": max_result_length,
             "redact_sensitive_data": redact_sensitive_data,
+            "max_queue_size": max_queue_size,
+            "overflow_policy": overflow_policy,
+            "block_timeout": block_timeout,
+            "max_queue_bytes": max_queue_bytes,
+            "compression": self._content_encoding or "none",
+            "max_batch_bytes": max_batch_bytes,
         }
 
-        self.log_buffer: List[Dict[str, Any]] = []
+        self.log_buffer: Deque[Dict[str, Any]] = deque()
+        # Serialized size of each queued entry, and their sum
+        self._sizes: Deque[int] = deque()
+        self._queued_bytes = 0
         self.buffer_lock = Lock()
+        # Wakes the worker (batch full, shutdown) / callers blocked on a full queue
+        self._wakeup = Condition(self.buffer_lock)
+        self._not_full = Condition(self.buffer_lock)
+        # One upload at a time, whether from the worker or an explicit flush()
+        self._flush_lock = Lock()
+        self._stats = {
+            "enqueued": 0,
+            "dropped_oldest": 0,
+            "dropped_newest": 0,
+            "dropped_timeout": 0,
+            "dropped_spool": 0,
+            "spooled": 0,
+            "flushed": 0,
+            "flush_failures": 0,
+            # Upload bodies before and after compression, failed attempts included
+            "bytes_uncompressed": 0,
+            "bytes_sent": 0,
+        }
+        self.spool: Optional[LogSpool] = None
+        self.durable = bool(wal_dir)
+        # Durable mode: a full batch (or a previous run's backlog) is waiting
+        self._wal_ready = False
+        if wal_dir:
+            self.spool = WriteAheadLog(
+                wal_dir, sync_interval=wal_sync_interval, max_bytes=spool_max_bytes
+            )
+            self._wal_ready = len(self.spool) > 0
+        elif spool_dir:
+            self.spool = LogSpool(spool_dir, max_bytes=spool_max_bytes)
+        # Held while moving entries from the queue to the spool, so they
+        # reach it in order
+        self._spool_lock = Lock()
         self.is_shutting_down = False
         self.flush_thread: Optional[Thread] = None
         self.client: Optional[httpx.Client] = None
+        self.connection_pool = connection_pool
+        _loggers.add(self)
 
         # Sensitive data patterns
         self.sensitive_patterns = [
@@ -74,45 +216,177 @@ class AILogger:
         }
         if self.config["project_id"]:
             headers["x-project-id"] = self.config["project_id"]
-        self.client = httpx.Client(
-            base_url=self.config["base_url"],
+        pool = self.connection_pool or shared_connection_pool()
+        self.client = pool.client(
+            base_url=cast(str, self.config["base_url"]),
             headers=headers,
             timeout=10.0,
         )
 
     def _start_periodic_flush(self):
-        """Start periodic flush in background thread"""
-
-        def flush_periodically():
-            while not self.is_shutting_down:
-                time.sleep(self.config["flush_interval"])
-                try:
-                    self.flush()
-                except Exception as e:
-                    logger.debug(f"Periodic flush failed: {e}")
-
-        self.flush_thread = Thread(target=flush_periodically, daemon=True)
+        """Start the background worker that uploads queued entries"""
+        self.flush_thread = Thread(
+            target=self._run_worker, name="cost-katana-ai-logger", daemon=True
+        )
         self.flush_thread.start()
 
+    def _run_worker(self) -> None:
+        interval = cast(float, self.config["flush_interval"])
+        backing_off = False
+        while True:
+            deadline = time.monotonic() + interval
+            with self.buffer_lock:
+                while not self.is_shutting_down and (
+                    backing_off or not self._batch_ready()
+                ):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._wakeup.wait(remaining)
+                if self.is_shutting_down:
+                    return
+                self._wal_ready = False
+            if self.durable:
+                cast(WriteAheadLog, self.spool).sync()
+            try:
+                backing_off = not self._flush()
+            except Exception as e:
+                backing_off = True
+                logger.debug(f"Periodic flush failed: {e}")
+
     def log_ai_call(self, entry: Dict[str, Any]) -> None:
         """Log an AI operation (async, non-blocking)"""
         if not self.config["enable_logging"]:
             return
 
         try:
-            enriched_entry = self._enrich_log_entry(entry)
+            self._enqueue(dict(entry))
+        except Exception as e:
+            LOG_DROPPED.inc(1, "error")
+            logger.error(f"Failed to log AI call: {e}")
 
-            with self.buffer_lock:
-                self.log_buffer.append(enriched_entry)
-                logger.debug(f"AI call logged to buffer (size: {len(self.log_buffer)})")
+    def _enqueue(self, entry: Dict[str, Any]) -> None:
+        if self.durable:
+            # Only redacted entries reach the disk, with the requestId they keep
+            self._append_wal(self._prepare(entry))
+            return
+        size = _entry_size(entry)
+        policy = self.config["overflow_policy"]
+        with self.buffer_lock:
+            if self.spool is None and not self._has_room(size):
+                if policy == DROP_NEWEST:
+                    self._dropped("dropped_newest")
+                    return
+                if policy == BLOCK:
+                    if not self._not_full.wait_for(
+                        lambda: self._has_room(size),
+                        cast(float, self.config["block_timeout"]),
+                    ):
+                        self._dropped("dropped_timeout")
+                        return
+                else:
+                    while self.log_buffer and not self._has_room(size):
+                        self._pop()
+                        self._dropped("dropped_oldest")
+
+            self._push(entry, size)
+            self._stats["enqueued"] += 1
+            LOG_ENQUEUED.inc()
+            if self._batch_ready():
+                self._wakeup.notify()
+            spill = self.spool is not None and self._over_limit()
+        if spill:
+            self._spill()
+
+    def _prepare(self, entry: Dict[str, Any]) -> Dict[str, Any]:
+        """The entry as uploaded: enriched, redacted and truncated, once"""
+        if isinstance(entry, _Prepared):
+            return entry
+        return _Prepared(self._enrich_log_entry(entry))
+
+    def _append_wal(self, entry: Dict[str, Any]) -> None:
+        wal = cast(WriteAheadLog, self.spool)
+        dropped = wal.append([entry])
+        pending = len(wal)
+        with self.buffer_lock:
+            self._stats["enqueued"] += 1
+            LOG_ENQUEUED.inc()
+            if dropped:
+                self._dropped("dropped_spool", dropped, "spool_full")
+            if pending >= cast(int, self.config["batch_size"]):
+                self._wal_ready = True
+                self._wakeup.notify()
+
+    # Queue bookkeeping; callers hold buffer_lock
+
+    def _batch_ready(self) -> bool:
+        return (
+            self._wal_ready
+            or len(self.log_buffer) >= cast(int, self.config["batch_size"])
+            or self._queued_bytes >= cast(int, self.config["max_batch_bytes"])
+        )
 
-                # Flush if buffer is full
-                if len(self.log_buffer) >= cast(int, self.config["batch_size"]):
-                    # Spawn thread to flush without blocking
-                    Thread(target=self.flush, daemon=True).start()
+    def _has_room(self, size: int) -> bool:
+        return len(self.log_buffer) < cast(int, self.config["max_queue_size"]) and (
+            not self.log_buffer
+            or self._queued_bytes + size <= cast(int, self.config["max_queue_bytes"])
+        )
 
-        except Exception as e:
-            logger.error(f"Failed to log AI call: {e}")
+    def _over_limit(self) -> bool:
+        return len(self.log_buffer) > cast(int, self.config["max_queue_size"]) or (
+            len(self.log_buffer) > 1
+            and self._queued_bytes > cast(int, self.config["max_queue_bytes"])
+        )
+
+    def _push(self, entry: Dict[str, Any], size: int, front: bool = False) -> None:
+        if front:
+            self.log_buffer.appendleft(entry)
+            self._sizes.appendleft(size)
+        else:
+            self.log_buffer.append(entry)
+            self._sizes.append(size)
+        self._queued_bytes += size
+
+    def _pop(self) -> Tuple[Dict[str, Any], int]:
+        size = self._sizes.popleft()
+        self._queued_bytes -= size
+        return self.log_buffer.popleft(), size
+
+    def _dropped(
+        self, counter: str, count: int = 1, reason: str = "queue_full"
+    ) -> None:
+        """Count entries discarded for lack of room"""
+        self._stats[counter] += count
+        LOG_DROPPED.inc(count, reason)
+
+    def _spill(self, everything: bool = False) -> None:
+        """
+        Move the oldest queued entries to the spool until the queue is back
+        within its limits (at least a batch at a time, to amortize the write)
+        """
+        spool = cast(LogSpool, self.spool)
+        batch_size = cast(int, self.config["batch_size"])
+        with self._spool_lock:
+            with self.buffer_lock:
+                entries: List[Dict[str, Any]] = []
+                while self.log_buffer and (
+                    everything or self._over_limit() or len(entries) < batch_size
+                ):
+                    entries.append(self._pop()[0])
+                self._not_full.notify_all()
+            if not entries:
+                return
+            try:
+                dropped = spool.append([self._prepare(entry) for entry in entries])
+            except OSError as e:
+                logger.warn(f"Failed to spool AI logs: {e}")
+                with self.buffer_lock:
+                    self._dropped("dropped_spool", len(entries), "spool_error")
+                return
+        with self.buffer_lock:
+            self._stats["spooled"] += len(entries)
+            if dropped:
+                self._dropped("dropped_spool", dropped, "spool_full")
 
     def log_template_usage(
         self,
@@ -214,23 +488,115 @@ class AILogger:
         return "INFO"
 
     def flush(self) -> None:
-        """Flush buffered logs to backend"""
+        """Flush buffered logs to backend, in batches of ``batch_size`` / ``max_batch_bytes``"""
+        self._flush()
+
+    def _flush(self) -> bool:
+        """Upload the spool, then the queue, until both are empty; False if an upload failed"""
+        batch_size = cast(int, self.config["batch_size"])
+        max_batch_bytes = cast(int, self.config["max_batch_bytes"])
+        with self._flush_lock:
+            # Spooled entries are older than anything still queued
+            while self.spool is not None and self.client:
+                spooled = self.spool.peek(batch_size)
+                if not spooled:
+                    break
+                encoded = _cut([_encode(entry) for entry in spooled], max_batch_bytes)
+                if not self._send(self.client, encoded):
+                    return False
+                self.spool.ack(len(encoded))
+
+            while True:
+                with self.buffer_lock:
+                    if not self.log_buffer or not self.client:
+                        return True
+                    client = self.client
+                    batch = [self._pop()]
+                    batch_bytes = batch[0][1]
+                    while (
+                        self.log_buffer
+                        and len(batch) < batch_size
+                        and batch_bytes + self._sizes[0] <= max_batch_bytes
+                    ):
+                        batch.append(self._pop())
+                        batch_bytes += batch[-1][1]
+                    self._not_full.notify_all()
+                # Requeued as prepared, so a retry carries the same requestId
+                batch = [(self._prepare(entry), size) for entry, size in batch]
+                encoded = _cut([_encode(entry) for entry, _ in batch], max_batch_bytes)
+                if len(encoded) < len(batch):
+                    # Enrichment outgrew the budget; the rest leads the next batch
+                    self._requeue(batch[len(encoded) :])
+                    batch = batch[: len(encoded)]
+                if not self._send(client, encoded):
+                    self._requeue(batch)
+                    return False
+
+    def _send(self, client: httpx.Client, logs_to_send: List[bytes]) -> bool:
+        """POST already-serialized entries as one compressed ``{"logs": [...]}`` body"""
+        body = b'{"logs":[' + b",".join(logs_to_send) + b"]}"
+        payload = self._compress(body)
+        headers = (
+            {"Content-Encoding": self._content_encoding}
+            if self._content_encoding
+            else {}
+        )
+        LOG_UPLOAD_BYTES.inc(len(body), "uncompressed")
+        LOG_UPLOAD_BYTES.inc(len(payload), "sent")
         with self.buffer_lock:
-            if not self.log_buffer or not self.client:
-                return
-
-            logs_to_send = self.log_buffer.copy()
-            self.log_buffer.clear()
-
+            self._stats["bytes_uncompressed"] += len(body)
+            self._stats["bytes_sent"] += len(payload)
+        started = time.perf_counter()
         try:
-            response = self.client.post("/api/ai-logs", json={"logs": logs_to_send})
+            response = client.post("/api/ai-logs", content=payload, headers=headers)
             response.raise_for_status()
+            LOG_FLUSH_DURATION.observe(time.perf_counter() - started, "success")
             logger.debug(f"AI logs flushed to backend (count: {len(logs_to_send)})")
+            with self.buffer_lock:
+                self._stats["flushed"] += len(logs_to_send)
+            return True
         except Exception as e:
-            # Put logs back in buffer on failure
+            LOG_FLUSH_DURATION.observe(time.perf_counter() - started, "failure")
             with self.buffer_lock:
-                self.log_buffer.extend(logs_to_send)
+                self._stats["flush_failures"] += 1
             logger.debug(f"Failed to flush AI logs: {e}")
+            return False
+
+    def _requeue(self, batch: List[Tuple[Dict[str, Any], int]]) -> None:
+        """
+        Put a failed batch (or the part of one that didn't fit) back at the
+        front of the queue, oldest first. What
+        no longer fits is the oldest: spooled if there is a spool, else dropped
+        """
+        with self.buffer_lock:
+            for entry, size in reversed(batch):
+                self._push(entry, size, front=True)
+            over = self._over_limit()
+            if over and self.spool is None:
+                while self._over_limit():
+                    self._pop()
+                    self._dropped("dropped_oldest")
+        if over and self.spool is not None:
+            self._spill()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Entries enqueued, dropped (by reason), spooled, uploaded, failed
+        uploads, upload bytes before/after compression and their ratio, and
+        what is queued in memory / pending in the spool now
+        """
+        spool_pending = len(self.spool) if self.spool is not None else 0
+        with self.buffer_lock:
+            sent = self._stats["bytes_sent"]
+            return {
+                **self._stats,
+                "compression_ratio": (
+                    self._stats["bytes_uncompressed"] / sent if sent else 1.0
+                ),
+                "queued": len(self.log_buffer),
+                "queued_bytes": self._queued_bytes,
+                "spool_pending": spool_pending,
+            }
 
     def get_buffer_size(self) -> int:
         """Get buffer size (for testing/debugging)"""
@@ -241,11 +607,24 @@ class AILogger:
         """Clear buffer (for testing)"""
         with self.buffer_lock:
             self.log_buffer.clear()
+            self._sizes.clear()
+            self._queued_bytes = 0
+            self._not_full.notify_all()
 
-    def shutdown(self) -> None:
-        """Shutdown the logger"""
-        self.is_shutting_down = True
+    def shutdown(self, timeout: float = 5.0) -> None:
+        """Stop the worker and upload what is still queued"""
+        with self.buffer_lock:
+            self.is_shutting_down = True
+            self._wakeup.notify_all()
+        worker = self.flush_thread
+        if worker is not None and worker is not current_thread():
+            worker.join(timeout)
         self.flush()
+        if self.durable:
+            cast(WriteAheadLog, self.spool).close()
+        elif self.spool is not None:
+            # Whatever couldn't be uploaded is replayed by the next process
+            self._spill(everything=True)
         if self.client:
             self.client.close()
 
@@ -255,6 +634,35 @@ class AILogger:
             self.shutdown()
 
 
+class _Prepared(dict):
+    """A log entry already enriched by :meth:`AILogger._prepare`"""
+
+
+def _entry_size(entry: Dict[str, Any]) -> int:
+    """
+    Approximate serialized size of a log entry, as counted against
+    max_queue_bytes: string lengths plus a flat allowance per field
+    """
+    size = 2
+    for key, value in entry.items():
+        size += len(key) + (len(value) if isinstance(value, str) else 16) + 6
+    return size
+
+
+def _encode(entry: Dict[str, Any]) -> bytes:
+    return json.dumps(entry, default=str).encode("utf-8")
+
+
+def _cut(encoded: List[bytes], max_bytes: int) -> List[bytes]:
+    """The longest prefix of ``encoded`` within ``max_bytes`` (always at least one entry)"""
+    total = 0
+    for i, item in enumerate(encoded):
+        total += len(item)
+        if i and total > max_bytes:
+            return encoded[:i]
+    return encoded
+
+
 class _LazyAILogger:
     """
     Defers real AILogger construction until first use, reading COST_KATANA_API_KEY
@@ -0,0 +1,152 @@
+"""
+On-disk spool for AI log entries that don't fit in the AILogger's memory
+Append-only JSON-lines segments, replayed oldest first and deleted once the
+backend has acknowledged them
+"""
+
+import json
+import os
+from pathlib import Path
+from threading import Lock
+from typing import Any, Dict, List, Optional, Tuple
+
+from .logger import logger
+
+_SUFFIX = ".jsonl"
+
+
+class LogSpool:
+    """
+    Segmented spool under ``directory``.
+
+    Entries are appended to the newest segment, which is sealed once it
+    reaches ``segment_bytes`` (or when a reader wants it). :meth:`peek`
+    returns unacknowledged entries of the oldest segment and :meth:`ack`
+    acknowledges them; a fully acknowledged segment is deleted. Past
+    ``max_bytes`` on disk the oldest segments are deleted unsent. Segments
+    left by an earlier process are picked up and replayed first.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        segment_bytes: int = 1024 * 1024,
+        max_bytes: int = 256 * 1024 * 1024,
+    ):
+        self.directory = Path(directory).expanduser()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.segment_bytes = segment_bytes
+        self.max_bytes = max_bytes
+        self._lock = Lock()
+        # Sealed and open segments, oldest first, with their size and entry count
+        self._segments: List[Tuple[int, int, int]] = []
+        self._open: Optional[int] = None
+        # Entries of the oldest segment already acknowledged
+        self._acked = 0
+        self._loaded: Optional[Tuple[int, List[Dict[str, Any]]]] = None
+        self.dropped = 0
+
+        for path in sorted(self.directory.glob(f"*{_SUFFIX}")):
+            try:
+                seq = int(path.stem)
+            except ValueError:
+                continue
+            with open(path, "rb") as f:
+                count = sum(1 for _ in f)
+            self._segments.append((seq, path.stat().st_size, count))
+
+    def _path(self, seq: int) -> Path:
+        return self.directory / f"{seq:012d}{_SUFFIX}"
+
+    def __len__(self) -> int:
+        """Entries spooled and not yet acknowledged"""
+        with self._lock:
+            return sum(count for _, _, count in self._segments) - self._acked
+
+    @property
+    def size_bytes(self) -> int:
+        """Bytes of spooled segment files, acknowledged entries included"""
+        with self._lock:
+            return sum(size for _, size, _ in self._segments)
+
+    def append(self, entries: List[Dict[str, Any]]) -> int:
+        """Write ``entries`` to the newest segment; returns entries dropped to stay under max_bytes"""
+        data = "".join(json.dumps(e, default=str) + "\n" for e in entries).encode(
+            "utf-8"
+        )
+        with self._lock:
+            if self._open is None or self._segments[-1][1] >= self.segment_bytes:
+                seq = self._segments[-1][0] + 1 if self._segments else 1
+                self._segments.append((seq, 0, 0))
+                self._open = seq
+            seq, size, count = self._segments[-1]
+            self._write(seq, data)
+            self._segments[-1] = (seq, size + len(data), count + len(entries))
+            return self._enforce_limit()
+
+    def _write(self, seq: int, data: bytes) -> None:
+        with open(self._path(seq), "ab") as f:
+            f.write(data)
+
+    def _enforce_limit(self) -> int:
+        dropped = 0
+        while (
+            len(self._segments) > 1
+            and sum(size for _, size, _ in self._segments) > self.max_bytes
+        ):
+            seq, _, count = self._segments.pop(0)
+            dropped += count - self._acked
+            self._acked = 0
+            self._loaded = None
+            self._remove(seq)
+        if dropped:
+            self.dropped += dropped
+            logger.warn(
+                f"AI log spool over {self.max_bytes} bytes; dropped {dropped} entries"
+            )
+        return dropped
+
+    def peek(self, limit: int) -> List[Dict[str, Any]]:
+        """Up to ``limit`` unacknowledged entries, oldest first"""
+        with self._lock:
+            if not self._segments:
+                return []
+            seq = self._segments[0][0]
+            if seq == self._open:
+                # Seal it so later appends start a new segment
+                self._open = None
+            if self._loaded is None or self._loaded[0] != seq:
+                self._loaded = (seq, self._read(seq))
+            return self._loaded[1][self._acked : self._acked + limit]
+
+    def ack(self, count: int) -> None:
+        """Acknowledge the first ``count`` entries returned by :meth:`peek`"""
+        with self._lock:
+            if not self._segments:
+                return
+            self._acked += count
+            seq, _, total = self._segments[0]
+            if self._acked >= total:
+                self._segments.pop(0)
+                self._acked = 0
+                self._loaded = None
+                self._remove(seq)
+
+    def _read(self, seq: int) -> List[Dict[str, Any]]:
+        entries = []
+        with open(self._path(seq), "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    # A torn last line from a crash mid-write
+                    continue
+        # Keep the segment's count in step with what can actually be sent
+        self._segments[0] = (seq, self._segments[0][1], len(entries))
+        return entries
+
+    def _remove(self, seq: int) -> None:
+        try:
+            os.remove(self._path(seq))
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,112 @@
+"""
+Write-ahead log for AI log entries in durable mode
+Every entry is written to a log file before log_ai_call returns, so a crashed
+process doesn't lose what it hadn't uploaded yet
+"""
+
+import contextlib
+import os
+import time
+from typing import IO, Optional
+
+from .spool import LogSpool
+
+_CHECKPOINT = "checkpoint"
+
+
+class WriteAheadLog(LogSpool):
+    """
+    :class:`LogSpool` written on every append and acknowledged per upload.
+
+    Appends go straight to the kernel through one open segment file, which
+    survives the process being killed; ``fsync`` (needed to survive the
+    host going down) is batched: once ``sync_every`` entries or
+    ``sync_interval`` seconds have accumulated, and on :meth:`sync`. How far
+    the oldest segment has been acknowledged is checkpointed, so after a
+    restart only unacknowledged entries are sent again. Anything sent twice
+    (a crash between upload and checkpoint) carries the same ``requestId``
+    for the backend to deduplicate on. A directory belongs to one process
+    at a time.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        sync_interval: float = 0.1,
+        sync_every: int = 100,
+        segment_bytes: int = 4 * 1024 * 1024,
+        max_bytes: int = 256 * 1024 * 1024,
+    ):
+        super().__init__(directory, segment_bytes=segment_bytes, max_bytes=max_bytes)
+        self.sync_interval = sync_interval
+        self.sync_every = sync_every
+        self._file: Optional[IO[bytes]] = None
+        self._file_seq: Optional[int] = None
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+        try:
+            seq, acked = (
+                int(part) for part in (self.directory / _CHECKPOINT).read_text().split()
+            )
+        except (OSError, ValueError):
+            return
+        if self._segments and self._segments[0][0] == seq:
+            self._acked = acked
+
+    def _write(self, seq: int, data: bytes) -> None:
+        if self._file_seq != seq:
+            self._close_file()
+            self._file = open(self._path(seq), "ab")
+            self._file_seq = seq
+        file = self._file
+        assert file is not None
+        file.write(data)
+        file.flush()
+        self._unsynced += data.count(b"\n")
+        if (
+            self._unsynced >= self.sync_every
+            or time.monotonic() - self._last_sync >= self.sync_interval
+        ):
+            self._sync_file()
+
+    def sync(self) -> None:
+        """fsync entries appended since the last sync"""
+        with self._lock:
+            self._sync_file()
+
+    def _sync_file(self) -> None:
+        if self._file is not None and self._unsynced:
+            os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def _close_file(self) -> None:
+        if self._file is not None:
+            self._sync_file()
+            self._file.close()
+            self._file = None
+            self._file_seq = None
+
+    def ack(self, count: int) -> None:
+        super().ack(count)
+        checkpoint = self.directory / _CHECKPOINT
+        with self._lock:
+            if not self._segments:
+                # Sequence numbers start over with the next segment
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(checkpoint)
+                return
+            tmp = checkpoint.with_suffix(".tmp")
+            tmp.write_text(f"{self._segments[0][0]} {self._acked}")
+            os.replace(tmp, checkpoint)
+
+    def _remove(self, seq: int) -> None:
+        if seq == self._file_seq:
+            self._close_file()
+        super()._remove(seq)
+
+    def close(self) -> None:
+        """fsync and close the open segment"""
+        with self._lock:
+            self._close_file()
@@ -0,0 +1,485 @@
+"""
+In-process metrics for Cost Katana
+Counters, gauges and histograms fed by the client, the AI logger and the
+template manager, with a Prometheus text exporter and a pull API
+"""
+
+import math
+import threading
+import time
+import weakref
+from bisect import bisect_left
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+LabelValues = Tuple[str, ...]
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class _Shards:
+    """
+    Per-thread value maps, merged when the metric is collected.
+
+    An update only touches the calling thread's own dict, so recording takes
+    no lock; the lock is taken when a thread records for the first time and
+    at collection. Shards of finished threads are folded into ``retired``.
+    """
+
+    def __init__(self, merge: Callable[[Any, Any], Any]):
+        self._merge = merge
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._shards: List[
+            Tuple["weakref.ref[threading.Thread]", Dict[LabelValues, Any]]
+        ] = []
+        self._retired: Dict[LabelValues, Any] = {}
+
+    def get(self) -> Dict[LabelValues, Any]:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = {}
+            with self._lock:
+                self._shards.append((weakref.ref(threading.current_thread()), shard))
+        return shard
+
+    def collect(self) -> Dict[LabelValues, Any]:
+        with self._lock:
+            live = []
+            for ref, shard in self._shards:
+                thread = ref()
+                if thread is None or not thread.is_alive():
+                    self._fold(self._retired, shard)
+                else:
+                    live.append((ref, shard))
+            self._shards = live
+            merged: Dict[LabelValues, Any] = {}
+            self._fold(merged, self._retired)
+            for _, shard in live:
+                self._fold(merged, shard)
+        return merged
+
+    def _fold(
+        self, into: Dict[LabelValues, Any], shard: Dict[LabelValues, Any]
+    ) -> None:
+        # dict() copies under the GIL; the owning thread may be writing
+        for key, value in dict(shard).items():
+            into[key] = self._merge(into[key], value) if key in into else _copy(value)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._retired.clear()
+            for _, shard in self._shards:
+                shard.clear()
+
+
+def _copy(value: Any) -> Any:
+    return list(value) if isinstance(value, list) else value
+
+
+def _add_rows(a: List[float], b: List[float]) -> List[float]:
+    return [x + y for x, y in zip(a, b)]
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def _key(self, values: Sequence[Any], kwargs: Dict[str, Any]) -> LabelValues:
+        if kwargs:
+            values = [kwargs[name] for name in self.labelnames]
+        if len(values) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        return tuple(map(str, values))
+
+    def samples(self) -> List[Tuple[str, Dict[str, str], float]]:
+        raise NotImplementedError
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonic counter; ``inc(amount, *label_values)``"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._shards = _Shards(lambda a, b: a + b)
+
+    def inc(self, amount: float = 1.0, *labels: Any, **kwlabels: Any) -> None:
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        key = self._key(labels, kwlabels)
+        shard = self._shards.get()
+        shard[key] = shard.get(key, 0.0) + amount
+
+    def values(self) -> Dict[LabelValues, float]:
+        return self._shards.collect()
+
+    def samples(self) -> List[Tuple[str, Dict[str, str], float]]:
+        return [
+            (self.name, dict(zip(self.labelnames, key)), value)
+            for key, value in sorted(self.values().items())
+        ]
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        return [
+            {"labels": labels, "value": value} for _, labels, value in self.samples()
+        ]
+
+
+class Gauge(_Metric):
+    """
+    Point-in-time value. Either ``set()`` it or give it a function that is
+    called at collection time (``set_function``), which keeps the hot path
+    free of updates entirely.
+    """
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        self._function: Optional[Callable[[], Dict[LabelValues, float]]] = None
+
+    def set(self, value: float, *labels: Any, **kwlabels: Any) -> None:
+        self._values[self._key(labels, kwlabels)] = float(value)
+
+    def set_function(self, function: Callable[[], Dict[LabelValues, float]]) -> None:
+        """Collect values from ``function()`` (label values -> value) instead"""
+        self._function = function
+
+    def values(self) -> Dict[LabelValues, float]:
+        if self._function is not None:
+            return dict(self._function())
+        return dict(self._values)
+
+    def samples(self) -> List[Tuple[str, Dict[str, str], float]]:
+        return [
+            (self.name, dict(zip(self.labelnames, key)), value)
+            for key, value in sorted(self.values().items())
+        ]
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        return [
+            {"labels": labels, "value": value} for _, labels, value in self.samples()
+        ]
+
+
+class Histogram(_Metric):
+    """Bucketed distribution with sum and count; ``observe(value, *label_values)``"""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = (
+            0.005,
+            0.01,
+            0.025,
+            0.05,
+            0.1,
+            0.25,
+            0.5,
+            1,
+            2.5,
+            5,
+            10,
+        ),
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(float(b) for b in buckets if not math.isinf(b)))
+        # Row layout: one count per bucket, +Inf, then sum and count
+        self._width = len(self.buckets) + 3
+        self._shards = _Shards(_add_rows)
+
+    def observe(self, value: float, *labels: Any, **kwlabels: Any) -> None:
+        key = self._key(labels, kwlabels)
+        shard = self._shards.get()
+        row = shard.get(key)
+        if row is None:
+            row = shard[key] = [0.0] * self._width
+        row[bisect_left(self.buckets, value)] += 1
+        row[-2] += value
+        row[-1] += 1
+
+    def _rows(self) -> List[Tuple[Dict[str, str], List[float], float, float]]:
+        rows = []
+        for key, row in sorted(self._shards.collect().items()):
+            cumulative, running = [], 0.0
+            for count in row[:-2]:
+                running += count
+                cumulative.append(running)
+            rows.append((dict(zip(self.labelnames, key)), cumulative, row[-2], row[-1]))
+        return rows
+
+    def samples(self) -> List[Tuple[str, Dict[str, str], float]]:
+        samples = []
+        bounds = [_format_value(b) for b in self.buckets] + ["+Inf"]
+        for labels, cumulative, total, count in self._rows():
+            for bound, value in zip(bounds, cumulative):
+                samples.append((f"{self.name}_bucket", {**labels, "le": bound}, value))
+            samples.append((f"{self.name}_sum", labels, total))
+            samples.append((f"{self.name}_count", labels, count))
+        return samples
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        bounds = list(self.buckets) + [math.inf]
+        return [
+            {
+                "labels": labels,
+                "buckets": dict(zip(bounds, cumulative)),
+                "sum": total,
+                "count": count,
+            }
+            for labels, cumulative, total, count in self._rows()
+        ]
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if value == int(value) and abs(value) < 1e15:
+        return f"{int(value)}.0"
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class MetricsRegistry:
+    """
+    A named set of metrics.
+
+    ``snapshot()`` returns current values as plain data and
+    ``to_prometheus()`` renders the Prometheus text exposition format.
+
+    Example:
+        from cost_katana import metrics_registry
+        print(metrics_registry.to_prometheus())
+    """
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> Any:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                if (
+                    type(existing) is not type(metric)
+                    or existing.labelnames != metric.labelnames
+                ):
+                    raise ValueError(
+                        f"Metric {metric.name} already registered differently"
+                    )
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(
+        self, name: str, documentation: str, labelnames: Sequence[str] = ()
+    ) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(
+        self, name: str, documentation: str, labelnames: Sequence[str] = ()
+    ) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Optional[Sequence[float]] = None,
+    ) -> Histogram:
+        if buckets is None:
+            return self._register(Histogram(name, documentation, labelnames))
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def get(self, name: str) -> Optional[_Metric]:
+        return self._metrics.get(name)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Current values: name -> type, help and samples"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return {
+            m.name: {"type": m.kind, "help": m.documentation, "samples": m.snapshot()}
+            for m in metrics
+        }
+
+    def to_prometheus(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {_escape(metric.documentation)}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                if labels:
+                    rendered = ",".join(
+                        f'{k}="{_escape(v)}"' for k, v in labels.items()
+                    )
+                    name = f"{name}{{{rendered}}}"
+                lines.append(f"{name} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        """Zero counters and histograms (for tests)"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            shards = getattr(metric, "_shards", None)
+            if shards is not None:
+                shards.clear()
+            if isinstance(metric, Gauge):
+                metric._values.clear()
+
+
+def start_metrics_server(
+    port: int = 9464,
+    host: str = "127.0.0.1",
+    registry: Optional[MetricsRegistry] = None,
+) -> ThreadingHTTPServer:
+    """
+    Serve ``registry`` (default: the SDK's) at ``http://host:port/metrics`` from
+    a daemon thread, for Prometheus to scrape. Call ``shutdown()`` on the
+    returned server to stop it.
+    """
+    source = registry or metrics_registry
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            if self.path.split("?", 1)[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = source.to_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", PROMETHEUS_CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args: Any) -> None:
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(
+        target=server.serve_forever, name="cost-katana-metrics", daemon=True
+    ).start()
+    return server
+
+
+# Registry the SDK records into
+metrics_registry = MetricsRegistry()
+
+_LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120)
+
+REQUEST_DURATION = metrics_registry.histogram(
+    "costkatana_request_duration_seconds",
+    "send_message latency by model",
+    ["model"],
+    _LATENCY_BUCKETS,
+)
+TOKENS = metrics_registry.counter(
+    "costkatana_tokens_total", "Tokens reported by the gateway, by model", ["model"]
+)
+COST = metrics_registry.counter(
+    "costkatana_cost_usd_total",
+    "Cost reported by the gateway in USD, by model",
+    ["model"],
+)
+ERRORS = metrics_registry.counter(
+    "costkatana_errors_total",
+    "Failed send_message calls by exception class",
+    ["exception"],
+)
+RETRIES = metrics_registry.counter(
+    "costkatana_retries_total", "HTTP attempts repeated by the retry policy", ["path"]
+)
+LOG_QUEUE_DEPTH = metrics_registry.gauge(
+    "costkatana_log_queue_depth", "AI log entries buffered and not yet flushed"
+)
+LOG_FLUSH_DURATION = metrics_registry.histogram(
+    "costkatana_log_flush_duration_seconds",
+    "Time to send one batch of AI logs, by outcome",
+    ["outcome"],
+)
+LOG_ENQUEUED = metrics_registry.counter(
+    "costkatana_log_events_enqueued_total", "AI log entries queued for upload"
+)
+LOG_UPLOAD_BYTES = metrics_registry.counter(
+    "costkatana_log_upload_bytes_total",
+    "Bytes of AI log upload bodies, uncompressed and as sent",
+    ["stage"],
+)
+LOG_DROPPED = metrics_registry.counter(
+    "costkatana_log_events_dropped_total",
+    "AI log entries discarded, by reason",
+    ["reason"],
+)
+CIRCUIT_TRANSITIONS = metrics_registry.counter(
+    "costkatana_circuit_transitions_total",
+    "Circuit breaker state changes by model and new state",
+    ["model", "state"],
+)
+CIRCUIT_REJECTIONS = metrics_registry.counter(
+    "costkatana_circuit_rejections_total",
+    "Calls failed fast by an open circuit breaker",
+    ["model", "endpoint"],
+)
+HEDGES = metrics_registry.counter(
+    "costkatana_hedged_requests_total",
+    "send_message calls that sent a hedge, by model and the copy that answered first",
+    ["model", "winner"],
+)
+BUDGET_REJECTIONS = metrics_registry.counter(
+    "costkatana_budget_rejections_total",
+    "Requests refused by the local cost budget, by model and limit",
+    ["model", "limit"],
+)
+TEMPLATE_LOOKUPS = metrics_registry.counter(
+    "costkatana_template_lookups_total",
+    "Template lookups by where they were served from (local, cache, backend)",
+    ["source"],
+)
+
+
+@contextmanager
+def track_request(model: str) -> Iterator[None]:
+    """Record a send_message call's latency, or its exception class on failure"""
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception as e:
+        ERRORS.inc(1, type(e).__name__)
+        raise
+    REQUEST_DURATION.observe(time.perf_counter() - started, model)
+
+
+def record_usage(model: str, result: Any) -> None:
+    """Count the tokens and cost the gateway reported for a billed response"""
+    data = result.get("data") if isinstance(result, dict) else None
+    if not isinstance(data, dict):
+        return
+    tokens = data.get("tokenCount") or 0
+    cost = data.get("cost") or 0.0
+    if tokens > 0:
+        TOKENS.inc(tokens, model)
+    if cost > 0:
+        COST.inc(cost, model)
@@ -2,11 +2,31 @@
 Generative AI Models - Simple interface similar to google-generative-ai
 """
 
+import json
 import time
-from typing import Dict, Any, Optional, List, Union
-from dataclasses import dataclass
+import weakref
+from collections import OrderedDict
+from threading import Lock
+from typing import (
+    Dict,
+    Any,
+    Callable,
+    Optional,
+    List,
+    Tuple,
+    Union,
+    TYPE_CHECKING,
+    cast,
+)
+from dataclasses import dataclass, asdict
 from .client import CostKatanaClient
+from .cache import is_cacheable, response_cache_key
 from .exceptions import CostKatanaError, ModelNotAvailableError
+from .streaming import AsyncMessageStream, MessageStream
+from .timing import RequestTiming
+
+if TYPE_CHECKING:
+    from .async_client import AsyncCostKatanaClient
 
 
 @dataclass
@@ -40,8 +60,24 @@ class UsageMetadata:
 class GenerateContentResponse:
     """Response from generate_content method"""
 
-    def __init__(self, response_data: Dict[str, Any]):
+    def __init__(self, response_data: Dict[str, Any], local_cache_hit: bool = False):
         self._data = response_data
+        # True when served from the client's response cache (no request sent)
+        self.local_cache_hit = local_cache_hit
+        # Estimated prompt similarity when served by the near-duplicate cache
+        self.cache_similarity: Optional[float] = None
+        # True when this call waited on an identical in-flight request
+        self.coalesced = bool(response_data.get("coalesced", False))
+        # {"from", "to", "reason", "failed"} when a fallback model served it
+        self.failover: Optional[Dict[str, Any]] = response_data.get("failover")
+        # {"winner": "primary" | "hedge", "delay": ms} when a hedge was sent
+        self.hedge: Optional[Dict[str, Any]] = response_data.get("hedge")
+        # Connect / TLS / TTFB / download / SDK overhead breakdown (ms); a
+        # local cache hit has no HTTP phases, only SDK overhead
+        timing = response_data.get("timing")
+        self.timing: Optional[RequestTiming] = (
+            RequestTiming.from_dict(timing) if timing else None
+        )
         self._text = response_data.get("data", {}).get("response", "")
 
         # Extract usage metadata
@@ -56,7 +92,7 @@ class GenerateContentResponse:
             latency=data.get("latency", 0.0),
             model=data.get("model", ""),
             optimizations_applied=data.get("optimizationsApplied"),
-            cache_hit=data.get("cacheHit", False),
+            cache_hit=local_cache_hit or self.coalesced or data.get("cacheHit", False),
             agent_path=data.get("agentPath"),
             risk_level=data.get("riskLevel"),
         )
@@ -81,6 +117,57 @@ class GenerateContentResponse:
         return f"GenerateContentResponse(text='{self._text[:50]}...', cost=${self.usage_metadata.cost:.4f})"
 
 
+def _finish_timing(
+    response: GenerateContentResponse, started: float
+) -> GenerateContentResponse:
+    """Extend a response's timing to the whole generate_content call"""
+    if response.timing is None:
+        response.timing = RequestTiming(attempts=0)
+    response.timing.finish((time.perf_counter() - started) * 1000)
+    return response
+
+
+def _generation_params(
+    config: GenerationConfig,
+    kwargs: Dict[str, Any],
+    model_params: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """Merge a generation config, model parameters and call kwargs into send_message params"""
+    params = {
+        "temperature": kwargs.get("temperature", config.temperature),
+        "max_tokens": kwargs.get("max_tokens", config.max_output_tokens),
+        "chat_mode": kwargs.get("chat_mode", "balanced"),
+        "use_multi_agent": kwargs.get("use_multi_agent", False),
+    }
+
+    # Add any additional parameters from model_params or kwargs
+    if model_params:
+        params.update(model_params)
+    for key, value in kwargs.items():
+        if key not in params:
+            params[key] = value
+    return params
+
+
+def _record_exchange(
+    history: List[Dict[str, Any]], message: str, response_data: Dict[str, Any]
+) -> GenerateContentResponse:
+    """Append a user/assistant exchange to a local chat history"""
+    history.append({"role": "user", "content": message, "timestamp": time.time()})
+
+    response_text = response_data.get("data", {}).get("response", "")
+    history.append(
+        {
+            "role": "assistant",
+            "content": response_text,
+            "timestamp": time.time(),
+            "metadata": response_data.get("data", {}),
+        }
+    )
+
+    return GenerateContentResponse(response_data)
+
+
 class ChatSession:
     """A chat session for maintaining conversation context"""
 
@@ -90,11 +177,13 @@ class ChatSession:
         model_id: str,
         generation_config: Optional[GenerationConfig] = None,
         conversation_id: Optional[str] = None,
+        system_message: Optional[str] = None,
     ):
         self.client = client
         self.model_id = model_id
         self.generation_config = generation_config or GenerationConfig()
         self.conversation_id = conversation_id
+        self.system_message = system_message
         self.history: List[Dict[str, Any]] = []
 
         # Create conversation if not provided
@@ -107,62 +196,50 @@ class ChatSession:
             except Exception as e:
                 raise CostKatanaError(f"Failed to create conversation: {str(e)}")
 
-    def send_message(self, message: str, **kwargs) -> GenerateContentResponse:
+    def send_message(
+        self, message: str, stream: bool = False, **kwargs
+    ) -> Union[GenerateContentResponse, MessageStream]:
         """
         Send a message in the chat session.
 
         Args:
             message: The message to send
+            stream: Return a MessageStream of text chunks instead of waiting
+                for the whole reply; history is updated when it finishes
             **kwargs: Additional parameters to override defaults
 
         Returns:
-            GenerateContentResponse with the model's reply
+            GenerateContentResponse with the model's reply (or a MessageStream)
 
         Example:
             response = chat.send_message("What's the weather like?")
             print(response.text)
         """
         # Merge generation config with kwargs
-        params = {
-            "temperature": kwargs.get(
-                "temperature", self.generation_config.temperature
-            ),
-            "max_tokens": kwargs.get(
-                "max_tokens", self.generation_config.max_output_tokens
-            ),
-            "chat_mode": kwargs.get("chat_mode", "balanced"),
-            "use_multi_agent": kwargs.get("use_multi_agent", False),
-        }
-
-        # Add any additional parameters
-        for key, value in kwargs.items():
-            if key not in params:
-                params[key] = value
+        params = _generation_params(self.generation_config, kwargs)
+        if self.system_message:
+            params.setdefault("systemMessage", self.system_message)
 
-        try:
-            response_data = self.client.send_message(
+        if stream:
+            message_stream = self.client.stream_message(
                 message=message,
                 model_id=self.model_id,
                 conversation_id=self.conversation_id,
                 **params,
             )
-
-            # Add to history
-            self.history.append(
-                {"role": "user", "content": message, "timestamp": time.time()}
+            message_stream.add_done_callback(
+                lambda s: _record_exchange(self.history, message, s.response_data)
             )
+            return message_stream
 
-            response_text = response_data.get("data", {}).get("response", "")
-            self.history.append(
-                {
-                    "role": "assistant",
-                    "content": response_text,
-                    "timestamp": time.time(),
-                    "metadata": response_data.get("data", {}),
-                }
+        try:
+            response_data = self.client.send_message(
+                message=message,
+                model_id=self.model_id,
+                conversation_id=self.conversation_id,
+                **params,
             )
-
-            return GenerateContentResponse(response_data)
+            return _record_exchange(self.history, message, response_data)
 
         except Exception as e:
             if isinstance(e, CostKatanaError):
@@ -231,38 +308,42 @@ class GenerativeModel:
     def _validate_model(self):
         """Validate that the model is available"""
         try:
-            available_models = self.client.get_available_models()
-            model_ids = [
-                model.get("id", model.get("modelId", "")) for model in available_models
-            ]
-
-            if self.model_id not in model_ids and self.model_name not in model_ids:
-                raise ModelNotAvailableError(
-                    f"Model '{self.model_name}' (ID: {self.model_id}) is not available. "
-                    f"Available models: {', '.join(model_ids[:5])}..."
-                )
+            if (
+                self.client.find_model(self.model_id) is None
+                and self.client.find_model(self.model_name) is None
+            ):
+                raise self._not_available_error(self.client.model_catalog.model_ids())
         except ModelNotAvailableError:
             raise
         except Exception as e:
             # If we can't validate, log but don't fail - the model might still work
             print(f"Warning: Could not validate model availability: {e}")
 
+    def _not_available_error(self, model_ids: List[str]) -> ModelNotAvailableError:
+        return ModelNotAvailableError(
+            f"Model '{self.model_name}' (ID: {self.model_id}) is not available. "
+            f"Available models: {', '.join(model_ids[:5])}..."
+        )
+
     def generate_content(
         self,
         prompt: Union[str, List[str]],
         generation_config: Optional[GenerationConfig] = None,
+        stream: bool = False,
         **kwargs,
-    ) -> GenerateContentResponse:
+    ) -> Union[GenerateContentResponse, MessageStream]:
         """
         Generate content from a prompt.
 
         Args:
             prompt: Text prompt or list of prompts
             generation_config: Generation configuration (overrides instance config)
+            stream: Return a MessageStream of text chunks instead of waiting
+                for the whole completion
             **kwargs: Additional parameters
 
         Returns:
-            GenerateContentResponse with the generated content
+            GenerateContentResponse with the generated content (or a MessageStream)
 
         Example:
             model = cost_katana.GenerativeModel('gemini-2.0-flash')
@@ -270,6 +351,8 @@ class GenerativeModel:
             print(response.text)
             print(f"Cost: ${response.usage_metadata.cost:.4f}")
         """
+        started = time.perf_counter()
+
         # Handle multiple prompts
         if isinstance(prompt, list):
             prompt = "\n\n".join(str(p) for p in prompt)
@@ -278,31 +361,83 @@ class GenerativeModel:
         config = generation_config or self.generation_config
 
         # Prepare parameters
-        params = {
-            "temperature": kwargs.get("temperature", config.temperature),
-            "max_tokens": kwargs.get("max_tokens", config.max_output_tokens),
-            "chat_mode": kwargs.get("chat_mode", "balanced"),
-            "use_multi_agent": kwargs.get("use_multi_agent", False),
-        }
+        params = _generation_params(config, kwargs, self.model_params)
+
+        if stream:
+            return self.client.stream_message(
+                message=prompt, model_id=self.model_id, **params
+            )
 
-        # Add any additional parameters from model_params or kwargs
-        params.update(self.model_params)
-        for key, value in kwargs.items():
-            if key not in params:
-                params[key] = value
+        cache_key, cached = self._cache_lookup(prompt, params)
+        if cached is not None:
+            return _finish_timing(cached, started)
 
         try:
             response_data = self.client.send_message(
                 message=prompt, model_id=self.model_id, **params
             )
+            self._cache_store(cache_key, prompt, params, response_data)
 
-            return GenerateContentResponse(response_data)
+            return _finish_timing(GenerateContentResponse(response_data), started)
 
         except Exception as e:
             if isinstance(e, CostKatanaError):
                 raise
             raise CostKatanaError(f"Failed to generate content: {str(e)}")
 
+    def _cache_lookup(
+        self, prompt: str, params: Dict[str, Any]
+    ) -> Tuple[Optional[str], Optional[GenerateContentResponse]]:
+        """Return (cache key, cached response); the key is None when not cacheable"""
+        response_cache = self.client.response_cache
+        similarity_cache = self.client.similarity_cache
+        if (response_cache is None and similarity_cache is None) or not is_cacheable(
+            params
+        ):
+            return None, None
+        key = response_cache_key(
+            self.client._catalog_scope, self.model_id, prompt, params
+        )
+        if response_cache is not None:
+            response_data = response_cache.get(key)
+            if response_data is not None:
+                return key, GenerateContentResponse(response_data, local_cache_hit=True)
+        if similarity_cache is not None:
+            match = similarity_cache.get(self._similarity_partition(params), prompt)
+            if match is not None:
+                response = GenerateContentResponse(match[0], local_cache_hit=True)
+                response.cache_similarity = match[1]
+                return key, response
+        return key, None
+
+    def _similarity_partition(self, params: Dict[str, Any]) -> str:
+        """Near-duplicate matches are only allowed for the same model and parameters"""
+        return response_cache_key(self.client._catalog_scope, self.model_id, "", params)
+
+    def _cache_store(
+        self,
+        key: Optional[str],
+        prompt: str,
+        params: Dict[str, Any],
+        response_data: Dict[str, Any],
+    ) -> None:
+        if key is None or response_data.get("success", True) is False:
+            return
+        # A stand-in model's answer isn't cached under the requested model
+        if "failover" in response_data:
+            return
+        # Timing and hedging describe this request, not the ones served from
+        # the cache
+        response_data = {
+            k: v for k, v in response_data.items() if k not in ("timing", "hedge")
+        }
+        if self.client.response_cache is not None:
+            self.client.response_cache.set(key, response_data)
+        if self.client.similarity_cache is not None:
+            self.client.similarity_cache.set(
+                self._similarity_partition(params), prompt, response_data
+            )
+
     def start_chat(
         self, history: Optional[List[Dict[str, Any]]] = None, **kwargs
     ) -> ChatSession:
@@ -352,3 +487,350 @@ class GenerativeModel:
 
     def __repr__(self) -> str:
         return f"GenerativeModel(model_name='{self.model_name}', model_id='{self.model_id}')"
+
+
+class AsyncChatSession:
+    """
+    Async counterpart of ChatSession for AsyncCostKatanaClient.
+
+    The server-side conversation is created on the first message.
+    """
+
+    def __init__(
+        self,
+        client: "AsyncCostKatanaClient",
+        model_id: str,
+        generation_config: Optional[GenerationConfig] = None,
+        conversation_id: Optional[str] = None,
+        system_message: Optional[str] = None,
+    ):
+        self.client = client
+        self.model_id = model_id
+        self.generation_config = generation_config or GenerationConfig()
+        self.conversation_id = conversation_id
+        self.system_message = system_message
+        self.history: List[Dict[str, Any]] = []
+
+    async def _ensure_conversation(self) -> None:
+        if self.conversation_id:
+            return
+        try:
+            conv_response = await self.client.create_conversation(
+                title=f"Chat with {self.model_id}", model_id=self.model_id
+            )
+            self.conversation_id = conv_response["data"]["id"]
+        except Exception as e:
+            raise CostKatanaError(f"Failed to create conversation: {str(e)}")
+
+    async def send_message(
+        self, message: str, stream: bool = False, **kwargs
+    ) -> Union[GenerateContentResponse, AsyncMessageStream]:
+        """
+        Send a message in the chat session.
+
+        With ``stream=True`` an AsyncMessageStream is returned; history is
+        updated when it finishes.
+
+        Example:
+            response = await chat.send_message("What's the weather like?")
+            print(response.text)
+        """
+        await self._ensure_conversation()
+        params = _generation_params(self.generation_config, kwargs)
+        if self.system_message:
+            params.setdefault("systemMessage", self.system_message)
+
+        if stream:
+            message_stream = await self.client.stream_message(
+                message=message,
+                model_id=self.model_id,
+                conversation_id=self.conversation_id,
+                **params,
+            )
+            message_stream.add_done_callback(
+                lambda s: _record_exchange(self.history, message, s.response_data)
+            )
+            return message_stream
+
+        try:
+            response_data = await self.client.send_message(
+                message=message,
+                model_id=self.model_id,
+                conversation_id=self.conversation_id,
+                **params,
+            )
+            return _record_exchange(self.history, message, response_data)
+
+        except Exception as e:
+            if isinstance(e, CostKatanaError):
+                raise
+            raise CostKatanaError(f"Failed to send message: {str(e)}")
+
+    async def get_history(self) -> List[Dict[str, Any]]:
+        """Get the conversation history"""
+        if not self.conversation_id:
+            return self.history
+
+        try:
+            history_response = await self.client.get_conversation_history(
+                self.conversation_id
+            )
+            return history_response.get("data", [])
+        except Exception:
+            # Fall back to local history if API call fails
+            return self.history
+
+    def clear_history(self):
+        """Clear the local conversation history"""
+        self.history = []
+
+    async def delete_conversation(self):
+        """Delete the conversation from the server"""
+        if not self.conversation_id:
+            self.history = []
+            return
+        try:
+            await self.client.delete_conversation(self.conversation_id)
+            self.conversation_id = None
+            self.history = []
+        except Exception as e:
+            raise CostKatanaError(f"Failed to delete conversation: {str(e)}")
+
+
+class AsyncGenerativeModel(GenerativeModel):
+    """
+    Async counterpart of GenerativeModel for AsyncCostKatanaClient.
+
+    Model validation is deferred to the first ``generate_content`` call, since
+    it needs the (async) model catalog.
+    """
+
+    def __init__(
+        self,
+        client: "AsyncCostKatanaClient",
+        model_name: str,
+        generation_config: Optional[GenerationConfig] = None,
+        **kwargs,
+    ):
+        self._validated = False
+        super().__init__(
+            cast(CostKatanaClient, client),
+            model_name,
+            generation_config=generation_config,
+            **kwargs,
+        )
+
+    def _validate_model(self):
+        """Deferred — see _avalidate_model"""
+
+    async def _avalidate_model(self) -> None:
+        if self._validated:
+            return
+        client = cast("AsyncCostKatanaClient", self.client)
+        try:
+            if (
+                await client.find_model(self.model_id) is None
+                and await client.find_model(self.model_name) is None
+            ):
+                raise self._not_available_error(await client.model_catalog.model_ids())
+        except ModelNotAvailableError:
+            raise
+        except Exception as e:
+            # If we can't validate, log but don't fail - the model might still work
+            print(f"Warning: Could not validate model availability: {e}")
+        self._validated = True
+
+    async def generate_content(  # type: ignore[override]
+        self,
+        prompt: Union[str, List[str]],
+        generation_config: Optional[GenerationConfig] = None,
+        stream: bool = False,
+        **kwargs,
+    ) -> Union[GenerateContentResponse, AsyncMessageStream]:
+        """
+        Generate content from a prompt (``stream=True`` returns an AsyncMessageStream).
+
+        Example:
+            model = AsyncGenerativeModel(async_client, "gemini-2.0-flash")
+            response = await model.generate_content("Tell me about AI")
+        """
+        started = time.perf_counter()
+        await self._avalidate_model()
+
+        if isinstance(prompt, list):
+            prompt = "\n\n".join(str(p) for p in prompt)
+
+        config = generation_config or self.generation_config
+        params = _generation_params(config, kwargs, self.model_params)
+
+        if stream:
+            return await cast("AsyncCostKatanaClient", self.client).stream_message(
+                message=prompt, model_id=self.model_id, **params
+            )
+
+        cache_key, cached = self._cache_lookup(prompt, params)
+        if cached is not None:
+            return _finish_timing(cached, started)
+
+        try:
+            response_data = await cast(
+                "AsyncCostKatanaClient", self.client
+            ).send_message(message=prompt, model_id=self.model_id, **params)
+            self._cache_store(cache_key, prompt, params, response_data)
+
+            return _finish_timing(GenerateContentResponse(response_data), started)
+
+        except Exception as e:
+            if isinstance(e, CostKatanaError):
+                raise
+            raise CostKatanaError(f"Failed to generate content: {str(e)}")
+
+    def start_chat(  # type: ignore[override]
+        self, history: Optional[List[Dict[str, Any]]] = None, **kwargs
+    ) -> AsyncChatSession:
+        """Start an async chat session."""
+        chat_session = AsyncChatSession(
+            client=cast("AsyncCostKatanaClient", self.client),
+            model_id=self.model_id,
+            generation_config=self.generation_config,
+            **kwargs,
+        )
+
+        if history:
+            chat_session.history = history
+
+        return chat_session
+
+    def __repr__(self) -> str:
+        return f"AsyncGenerativeModel(model_name='{self.model_name}', model_id='{self.model_id}')"
+
+
+class _ModelCache:
+    """
+    Bounded, thread-safe LRU of GenerativeModel handles, per client.
+
+    Building a GenerativeModel validates the model against ``/api/chat/models``,
+    so reusing handles keeps ``ai()`` and ``chat()`` to a single round trip.
+    Handles are kept per client (at most ``max_size`` each) in a
+    ``WeakKeyDictionary``, so an entry can only ever be returned for the
+    client it was built with. A handle references its client, so a client's
+    entries are dropped explicitly with :meth:`discard` when it is closed or
+    replaced by :func:`cost_katana.configure`.
+    """
+
+    def __init__(
+        self, max_size: int = 128, factory: Optional[Callable[..., Any]] = None
+    ):
+        self.max_size = max_size
+        self.factory = factory or GenerativeModel
+        self._clients: (
+            "weakref.WeakKeyDictionary[Any, OrderedDict[Tuple[str, str], Any]]"
+        ) = weakref.WeakKeyDictionary()
+        self._lock = Lock()
+
+    @staticmethod
+    def _make_key(
+        model_name: str,
+        generation_config: Optional[GenerationConfig],
+        params: Dict[str, Any],
+    ) -> Tuple[str, str]:
+        config_key = json.dumps(
+            {
+                "generation_config": (
+                    asdict(generation_config) if generation_config else None
+                ),
+                "params": params,
+            },
+            sort_keys=True,
+            default=repr,
+        )
+        return (model_name, config_key)
+
+    def get_or_create(
+        self,
+        client: Any,
+        model_name: str,
+        generation_config: Optional[GenerationConfig] = None,
+        **kwargs,
+    ) -> Any:
+        key = self._make_key(model_name, generation_config, kwargs)
+        with self._lock:
+            entries = self._clients.get(client)
+            if entries is not None and key in entries:
+                entries.move_to_end(key)
+                return entries[key]
+
+        # Validate outside the lock so one slow catalog fetch does not
+        # serialize unrelated models.
+        model = self.factory(
+            client, model_name, generation_config=generation_config, **kwargs
+        )
+
+        with self._lock:
+            entries = self._clients.setdefault(client, OrderedDict())
+            existing = entries.get(key)
+            if existing is not None:
+                entries.move_to_end(key)
+                return existing
+            entries[key] = model
+            while len(entries) > self.max_size:
+                entries.popitem(last=False)
+        return model
+
+    def discard(self, client: Any) -> None:
+        """Drop every handle built with ``client``"""
+        with self._lock:
+            self._clients.pop(client, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._clients.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(len(entries) for entries in self._clients.values())
+
+
+_model_cache = _ModelCache()
+_async_model_cache = _ModelCache(factory=AsyncGenerativeModel)
+
+
+def get_generative_model(
+    client: CostKatanaClient,
+    model_name: str,
+    generation_config: Optional[GenerationConfig] = None,
+    **kwargs,
+) -> GenerativeModel:
+    """
+    Return a shared GenerativeModel for (client, model name, generation config).
+
+    The model is validated once, on first use; later calls with the same
+    arguments reuse the cached handle.
+    """
+    return _model_cache.get_or_create(
+        client, model_name, generation_config=generation_config, **kwargs
+    )
+
+
+def get_async_generative_model(
+    client: "AsyncCostKatanaClient",
+    model_name: str,
+    generation_config: Optional[GenerationConfig] = None,
+    **kwargs,
+) -> AsyncGenerativeModel:
+    """Async counterpart of get_generative_model."""
+    return _async_model_cache.get_or_create(
+        client, model_name, generation_config=generation_config, **kwargs
+    )
+
+
+def discard_cached_models(client: Any) -> None:
+    """Drop the cached handles of a client that is closed or replaced."""
+    _model_cache.discard(client)
+    _async_model_cache.discard(client)
+
+
+def clear_model_cache() -> None:
+    """Drop all cached GenerativeModel handles (e.g. after the catalog changes)."""
+    _model_cache.clear()
+    _async_model_cache.clear()
@@ -0,0 +1,258 @@
+"""
+Shared HTTP connection pool for Cost Katana
+One transport (and one set of keep-alive connections) for the client, the AI
+logger and the template manager
+"""
+
+import asyncio
+import ssl
+from threading import Lock, Thread
+from typing import (
+    Any,
+    Callable,
+    Coroutine,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+import httpx
+
+from .logging.logger import logger
+
+T = TypeVar("T")
+
+
+class _SharedTransport(httpx.BaseTransport):
+    """
+    Delegates to the pool's transport but ignores ``close()``.
+
+    Each component wraps the transport in its own ``httpx.Client`` (own base
+    URL, headers and timeout); closing one of those clients must not tear down
+    connections the others are still using.
+    """
+
+    def __init__(self, transport: httpx.BaseTransport):
+        self._transport = transport
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        return self._transport.handle_request(request)
+
+    def close(self) -> None:
+        pass
+
+
+class _LoopTransport(httpx.BaseTransport):
+    """
+    Sync transport that drives an async transport on a private event loop.
+
+    httpcore's sync HTTP/2 connection allocates stream IDs and encodes headers
+    without a lock, so threads multiplexing one connection can put frames on
+    the wire out of order and the server resets it (PROTOCOL_ERROR). Running
+    every request on one loop thread keeps the connection single-threaded
+    while callers still block as usual; response bodies are streamed back
+    chunk by chunk.
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport):
+        self._transport = transport
+        self._loop = asyncio.new_event_loop()
+        self._thread = Thread(
+            target=self._loop.run_forever, name="cost-katana-http2", daemon=True
+        )
+        self._thread.start()
+
+    def run(self, coro: "Coroutine[Any, Any, T]") -> T:
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        request.read()
+        trace = request.extensions.get("trace")
+        if trace is not None and not asyncio.iscoroutinefunction(trace):
+            # The async transport awaits its trace callback
+            request.extensions["trace"] = _async_trace(trace)
+        response = self.run(self._transport.handle_async_request(request))
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=response.headers,
+            stream=_LoopStream(self, response.stream),
+            extensions=response.extensions,
+        )
+
+    def close(self) -> None:
+        if self._loop.is_closed():
+            return
+        self.run(self._transport.aclose())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+
+def _async_trace(trace: Any) -> Any:
+    async def atrace(event: str, info: Dict[str, Any]) -> None:
+        trace(event, info)
+
+    return atrace
+
+
+class _LoopStream(httpx.SyncByteStream):
+    """Response body of a :class:`_LoopTransport` request, read on its loop"""
+
+    def __init__(self, transport: _LoopTransport, stream: Any):
+        self._transport = transport
+        self._stream = stream
+
+    def __iter__(self) -> Iterator[bytes]:
+        chunks = self._stream.__aiter__()
+        while True:
+            try:
+                yield self._transport.run(chunks.__anext__())
+            except StopAsyncIteration:
+                return
+
+    def close(self) -> None:
+        self._transport.run(self._stream.aclose())
+
+
+class ConnectionPool:
+    """
+    Connection limits and the transport built from them.
+
+    ``client()`` returns an ``httpx.Client`` bound to the shared transport, so
+    requests from every component reuse the same keep-alive connections (and
+    TLS sessions) to the gateway.
+
+    With ``http2=True`` the transport offers HTTP/2 via ALPN, so concurrent
+    requests are multiplexed over a few connections instead of one connection
+    per in-flight request. Servers that do not negotiate h2 are spoken to over
+    HTTP/1.1; if the optional ``h2`` package is missing the pool logs a warning
+    and stays on HTTP/1.1 (``pool.http2`` reports the mode in use). Sync
+    HTTP/2 requests run on a background event loop, see ``_LoopTransport``.
+
+    Example:
+        pool = ConnectionPool(max_connections=64, max_keepalive_connections=64)
+        client = CostKatanaClient(connection_pool=pool)
+    """
+
+    def __init__(
+        self,
+        max_connections: Optional[int] = 100,
+        max_keepalive_connections: Optional[int] = 20,
+        keepalive_expiry: Optional[float] = 30.0,
+        http2: bool = False,
+        verify: Union[bool, str, ssl.SSLContext] = True,
+    ):
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.verify = verify
+        self.http2 = http2
+        self._transport: httpx.BaseTransport
+        if http2:
+            try:
+                self._transport = _LoopTransport(
+                    httpx.AsyncHTTPTransport(
+                        limits=self.limits, http2=True, verify=verify
+                    )
+                )
+            except ImportError:
+                logger.warn(
+                    "HTTP/2 requested but the 'h2' package is not installed "
+                    "(pip install 'cost-katana[http2]'); using HTTP/1.1"
+                )
+                self.http2 = False
+        if not self.http2:
+            self._transport = httpx.HTTPTransport(limits=self.limits, verify=verify)
+        self._shared = _SharedTransport(self._transport)
+
+    def client(
+        self,
+        base_url: str,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Any = None,
+        event_hooks: Optional[Dict[str, List[Callable[..., Any]]]] = None,
+    ) -> httpx.Client:
+        """An httpx.Client with its own base URL and headers on the shared pool"""
+        return httpx.Client(
+            base_url=base_url,
+            headers=headers,
+            timeout=timeout,
+            event_hooks=event_hooks,
+            transport=self._shared,
+        )
+
+    def async_client(
+        self,
+        base_url: str,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Any = None,
+        event_hooks: Optional[Dict[str, List[Callable[..., Any]]]] = None,
+    ) -> httpx.AsyncClient:
+        """
+        An httpx.AsyncClient with the same limits.
+
+        Async connections belong to the event loop that opened them, so each
+        async client keeps its own transport.
+        """
+        return httpx.AsyncClient(
+            base_url=base_url,
+            headers=headers,
+            timeout=timeout,
+            event_hooks=event_hooks,
+            limits=self.limits,
+            http2=self.http2,
+            verify=self.verify,
+        )
+
+    def stats(self) -> Dict[str, int]:
+        """Open, idle and HTTP/2 connection counts of the shared transport"""
+        transport: Union[httpx.BaseTransport, httpx.AsyncBaseTransport] = (
+            self._transport
+        )
+        if isinstance(transport, _LoopTransport):
+            transport = transport._transport
+        pool = getattr(transport, "_pool", None)
+        connections = list(getattr(pool, "connections", []))
+        return {
+            "connections": len(connections),
+            "idle": sum(1 for c in connections if c.is_idle()),
+            "http2": sum(1 for c in connections if "HTTP/2" in c.info()),
+        }
+
+    def close(self) -> None:
+        """Close every connection; clients bound to this pool stop working"""
+        self._transport.close()
+
+
+_pools: Dict[Tuple[Any, ...], ConnectionPool] = {}
+_pools_lock = Lock()
+
+
+def shared_connection_pool(config: Any = None) -> ConnectionPool:
+    """
+    Process-wide pool for the config's ``http_*`` limits and ``http2`` mode
+    (defaults if None).
+
+    Components configured with the same limits share one pool, including the
+    module-level ``ai_logger`` and ``template_manager``.
+    """
+    if config is None:
+        key: Tuple[Any, ...] = (100, 20, 30.0, False)
+    else:
+        key = (
+            config.http_max_connections,
+            config.http_max_keepalive_connections,
+            config.http_keepalive_expiry,
+            config.http2,
+        )
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = ConnectionPool(*key)
+        return pool
@@ -0,0 +1,251 @@
+"""
+Client-side rate limiting for Cost Katana
+Token buckets for requests/second and estimated tokens/minute, per model and
+per project
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass
+from threading import Lock
+from typing import Any, Dict, List, Optional, Tuple
+
+from .exceptions import ClientRateLimitError
+
+BLOCK = "block"
+FAIL_FAST = "fail_fast"
+
+
+class TokenBucket:
+    """
+    Reservation-style token bucket.
+
+    ``reserve`` always debits the bucket and returns how long the caller must
+    wait for its reservation to mature, so waiting callers queue in FIFO order
+    without holding a lock while they sleep.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until ``amount`` tokens would be available"""
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def reserve(self, amount: float, now: float) -> None:
+        self._refill(now)
+        self.tokens -= min(amount, self.capacity)
+
+
+@dataclass
+class RateLimitRule:
+    """
+    Limits for one scope (a model id, a project, or the client default).
+
+    ``burst`` is the request bucket size; it defaults to one second's worth of
+    requests (at least 1). The token bucket holds one minute's worth of tokens.
+    """
+
+    requests_per_second: Optional[float] = None
+    tokens_per_minute: Optional[float] = None
+    burst: Optional[float] = None
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "RateLimitRule":
+        return cls(
+            requests_per_second=data.get("requests_per_second"),
+            tokens_per_minute=data.get("tokens_per_minute"),
+            burst=data.get("burst"),
+        )
+
+    def buckets(self) -> List[Tuple[str, TokenBucket]]:
+        result = []
+        if self.requests_per_second:
+            capacity = self.burst or max(1.0, self.requests_per_second)
+            result.append(("requests", TokenBucket(self.requests_per_second, capacity)))
+        if self.tokens_per_minute:
+            result.append(
+                (
+                    "tokens",
+                    TokenBucket(self.tokens_per_minute / 60.0, self.tokens_per_minute),
+                )
+            )
+        return result
+
+
+class RateLimiter:
+    """
+    Paces chat requests before they leave the process.
+
+    A request is checked against the default rule, the rule for its model id
+    and the rule for its project; it proceeds once every applicable bucket has
+    room. With ``policy="block"`` the caller sleeps (up to ``max_wait``); with
+    ``policy="fail_fast"`` a :class:`ClientRateLimitError` is raised instead,
+    without a network round trip.
+    """
+
+    def __init__(
+        self,
+        default: Optional[RateLimitRule] = None,
+        models: Optional[Dict[str, RateLimitRule]] = None,
+        projects: Optional[Dict[str, RateLimitRule]] = None,
+        policy: str = BLOCK,
+        max_wait: Optional[float] = None,
+    ):
+        if policy not in (BLOCK, FAIL_FAST):
+            raise ValueError(f"Unknown rate limit policy: {policy}")
+        self.policy = policy
+        self.max_wait = max_wait
+        self._rules: Dict[str, RateLimitRule] = {}
+        if default:
+            self._rules["default"] = default
+        for model_id, rule in (models or {}).items():
+            self._rules[f"model:{model_id}"] = rule
+        for project_id, rule in (projects or {}).items():
+            self._rules[f"project:{project_id}"] = rule
+
+        self._buckets: Dict[str, List[Tuple[str, TokenBucket]]] = {
+            key: rule.buckets() for key, rule in self._rules.items()
+        }
+        self._lock = Lock()
+        self._queue_depth: Dict[str, int] = {}
+        self._stats: Dict[str, Dict[str, float]] = {}
+
+    def _scopes(self, model_id: str, project_id: Optional[str]) -> List[str]:
+        keys = ["default", f"model:{model_id}"]
+        if project_id:
+            keys.append(f"project:{project_id}")
+        return [key for key in keys if key in self._buckets]
+
+    def _scope_stats(self, key: str) -> Dict[str, float]:
+        stats = self._stats.get(key)
+        if stats is None:
+            stats = self._stats[key] = {
+                "requests": 0,
+                "delayed": 0,
+                "rejected": 0,
+                "wait_seconds": 0.0,
+                "max_wait_seconds": 0.0,
+            }
+        return stats
+
+    def reserve(
+        self, model_id: str, project_id: Optional[str], estimated_tokens: int
+    ) -> Tuple[float, List[str]]:
+        """
+        Reserve capacity for one request; returns (seconds to wait, scopes).
+
+        Raises ClientRateLimitError when the policy forbids waiting that long.
+        """
+        scopes = self._scopes(model_id, project_id)
+        if not scopes:
+            return 0.0, []
+
+        with self._lock:
+            now = time.monotonic()
+            wait = 0.0
+            for key in scopes:
+                for kind, bucket in self._buckets[key]:
+                    amount = 1 if kind == "requests" else estimated_tokens
+                    wait = max(wait, bucket.wait_time(amount, now))
+
+            too_long = self.max_wait is not None and wait > self.max_wait
+            if wait > 0 and (self.policy == FAIL_FAST or too_long):
+                for key in scopes:
+                    self._scope_stats(key)["rejected"] += 1
+                raise ClientRateLimitError(
+                    f"Client rate limit reached for model '{model_id}' "
+                    f"(would wait {wait:.2f}s)",
+                    retry_after=wait,
+                )
+
+            for key in scopes:
+                for kind, bucket in self._buckets[key]:
+                    bucket.reserve(1 if kind == "requests" else estimated_tokens, now)
+                stats = self._scope_stats(key)
+                stats["requests"] += 1
+                if wait > 0:
+                    stats["delayed"] += 1
+                    stats["wait_seconds"] += wait
+                    stats["max_wait_seconds"] = max(stats["max_wait_seconds"], wait)
+                    self._queue_depth[key] = self._queue_depth.get(key, 0) + 1
+        return wait, scopes
+
+    def _release(self, scopes: List[str]) -> None:
+        with self._lock:
+            for key in scopes:
+                self._queue_depth[key] = max(0, self._queue_depth.get(key, 0) - 1)
+
+    def acquire(
+        self, model_id: str, project_id: Optional[str], estimated_tokens: int
+    ) -> float:
+        """Block until the request may proceed; returns seconds waited"""
+        wait, scopes = self.reserve(model_id, project_id, estimated_tokens)
+        if wait > 0:
+            try:
+                time.sleep(wait)
+            finally:
+                self._release(scopes)
+        return wait
+
+    async def aacquire(
+        self, model_id: str, project_id: Optional[str], estimated_tokens: int
+    ) -> float:
+        """Async counterpart of :meth:`acquire`"""
+        wait, scopes = self.reserve(model_id, project_id, estimated_tokens)
+        if wait > 0:
+            try:
+                await asyncio.sleep(wait)
+            finally:
+                self._release(scopes)
+        return wait
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Per-scope counters plus current queue depth (callers waiting now)"""
+        with self._lock:
+            result = {}
+            for key in self._rules:
+                stats = dict(self._scope_stats(key))
+                stats["queue_depth"] = self._queue_depth.get(key, 0)
+                result[key] = stats
+            return result
+
+
+def estimate_request_tokens(message: str, max_tokens: int) -> int:
+    """Rough token estimate for pacing: ~4 characters per prompt token plus max_tokens"""
+    return len(message) // 4 + max_tokens
+
+
+def rate_limiter_from_config(config: Any) -> Optional[RateLimiter]:
+    """Build a RateLimiter from Config fields and its ``rate_limits`` block, if any"""
+    default = None
+    if config.rate_limit_requests_per_second or config.rate_limit_tokens_per_minute:
+        default = RateLimitRule(
+            requests_per_second=config.rate_limit_requests_per_second,
+            tokens_per_minute=config.rate_limit_tokens_per_minute,
+        )
+    block = config.get_rate_limit_config()
+    models = {k: RateLimitRule.from_dict(v) for k, v in block.get("models", {}).items()}
+    projects = {
+        k: RateLimitRule.from_dict(v) for k, v in block.get("projects", {}).items()
+    }
+    if not (default or models or projects):
+        return None
+    return RateLimiter(
+        default=default,
+        models=models,
+        projects=projects,
+        policy=config.rate_limit_policy,
+        max_wait=config.rate_limit_max_wait,
+    )
@@ -0,0 +1,297 @@
+"""
+Retry policy for Cost Katana HTTP requests
+Decorrelated-jitter backoff, Retry-After support and an overall deadline
+"""
+
+import asyncio
+import contextvars
+import random
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from threading import Lock
+from typing import Awaitable, Callable, Dict, FrozenSet, List, Optional
+
+import httpx
+
+from .logging.logger import logger
+from .metrics import RETRIES
+
+# Failures where the request never reached the server — safe for any method
+_CONNECT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+# Failures where the server may have processed the request — idempotent methods only
+_IDEMPOTENT_ONLY_ERRORS = (
+    httpx.ReadTimeout,
+    httpx.WriteTimeout,
+    httpx.RemoteProtocolError,
+    httpx.ReadError,
+)
+
+_IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+_last_attempts: contextvars.ContextVar[List["AttemptRecord"]] = contextvars.ContextVar(
+    "cost_katana_last_attempts", default=[]
+)
+
+
+@dataclass
+class AttemptRecord:
+    """Timing and outcome of one HTTP attempt"""
+
+    attempt: int
+    method: str
+    path: str
+    duration: float
+    status_code: Optional[int] = None
+    error: Optional[str] = None
+    delay_before_next: float = 0.0
+
+
+@dataclass
+class RetryPolicy:
+    """
+    When and how long to wait before retrying a request.
+
+    Only failures that are safe to repeat are retried:
+
+    - connection errors (the request never reached the gateway), any method;
+    - 429 and 503 responses (rejected before processing), any method;
+    - 500/502/504 responses and read/protocol errors, idempotent methods only —
+      a non-idempotent POST such as ``/api/chat/message`` may already have been
+      billed.
+
+    Delays use decorrelated jitter, ``min(max_delay, uniform(base, prev * 3))``,
+    and a server ``Retry-After`` header takes precedence. ``deadline`` caps the
+    total time across all attempts, including per-attempt timeouts.
+    """
+
+    max_retries: int = 3
+    base_delay: float = 1.0
+    max_delay: float = 20.0
+    deadline: Optional[float] = 60.0
+    retry_statuses: FrozenSet[int] = frozenset({429, 503})
+    idempotent_retry_statuses: FrozenSet[int] = frozenset({500, 502, 504})
+    _stats: Dict[str, float] = field(
+        default_factory=lambda: {
+            "requests": 0,
+            "attempts": 0,
+            "retries": 0,
+            "retry_wait_seconds": 0.0,
+            "deadline_exceeded": 0,
+        },
+        repr=False,
+    )
+    _stats_lock: Lock = field(default_factory=Lock, repr=False)
+
+    def is_retryable(
+        self,
+        method: str,
+        status_code: Optional[int] = None,
+        error: Optional[BaseException] = None,
+    ) -> bool:
+        """Whether a failed attempt may be repeated"""
+        idempotent = method.upper() in _IDEMPOTENT_METHODS
+        if error is not None:
+            if isinstance(error, _CONNECT_ERRORS):
+                return True
+            return idempotent and isinstance(error, _IDEMPOTENT_ONLY_ERRORS)
+        if status_code is None:
+            return False
+        if status_code in self.retry_statuses:
+            return True
+        return idempotent and status_code in self.idempotent_retry_statuses
+
+    def next_delay(self, previous_delay: float) -> float:
+        """Decorrelated jitter: grows roughly 3x per attempt, capped at max_delay"""
+        upper = max(self.base_delay, previous_delay * 3)
+        return min(self.max_delay, random.uniform(self.base_delay, upper))
+
+    @staticmethod
+    def retry_after(response: Optional[httpx.Response]) -> Optional[float]:
+        """Seconds requested by a Retry-After header (delta-seconds or HTTP-date)"""
+        if response is None:
+            return None
+        value = response.headers.get("Retry-After")
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            when = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if when.tzinfo is None:
+            when = when.replace(tzinfo=timezone.utc)
+        return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+    def _record(self, attempts: List[AttemptRecord], deadline_hit: bool) -> None:
+        _last_attempts.set(attempts)
+        if len(attempts) > 1:
+            RETRIES.inc(len(attempts) - 1, attempts[0].path)
+        with self._stats_lock:
+            self._stats["requests"] += 1
+            self._stats["attempts"] += len(attempts)
+            self._stats["retries"] += len(attempts) - 1
+            self._stats["retry_wait_seconds"] += sum(
+                a.delay_before_next for a in attempts
+            )
+            if deadline_hit:
+                self._stats["deadline_exceeded"] += 1
+
+    def stats(self) -> Dict[str, float]:
+        """Aggregate counters: requests, attempts, retries, retry wait time"""
+        with self._stats_lock:
+            return dict(self._stats)
+
+    def _plan_retry(
+        self,
+        state: "_RetryState",
+        method: str,
+        response: Optional[httpx.Response],
+        error: Optional[BaseException],
+    ) -> Optional[float]:
+        """Delay before the next attempt, or None to stop"""
+        if state.attempt > self.max_retries:
+            return None
+        status_code = response.status_code if response is not None else None
+        if not self.is_retryable(method, status_code, error):
+            return None
+        delay = self.retry_after(response)
+        if delay is None:
+            delay = self.next_delay(state.delay)
+        if self.deadline is not None:
+            remaining = self.deadline - (time.monotonic() - state.started)
+            if delay >= remaining:
+                state.deadline_exceeded = True
+                return None
+        return delay
+
+    def _attempt_timeout(
+        self, timeout: Optional[float], started: float
+    ) -> Optional[float]:
+        if self.deadline is None:
+            return timeout
+        remaining = max(0.001, self.deadline - (time.monotonic() - started))
+        return remaining if timeout is None else min(timeout, remaining)
+
+    def _after_attempt(
+        self,
+        state: "_RetryState",
+        method: str,
+        path: str,
+        attempt_started: float,
+        response: Optional[httpx.Response],
+        error: Optional[BaseException],
+    ) -> Optional[float]:
+        """Record an attempt; return the delay before the next one, or None to stop"""
+        record = AttemptRecord(
+            attempt=state.attempt,
+            method=method,
+            path=path,
+            duration=time.monotonic() - attempt_started,
+            status_code=response.status_code if response is not None else None,
+            error=type(error).__name__ if error is not None else None,
+        )
+        state.attempts.append(record)
+
+        if response is not None and response.status_code < 400:
+            self._record(state.attempts, False)
+            return None
+
+        delay = self._plan_retry(state, method, response, error)
+        if delay is None:
+            self._record(state.attempts, state.deadline_exceeded)
+            return None
+
+        record.delay_before_next = delay
+        state.delay = delay
+        logger.debug(
+            f"Retrying {method} {path} in {delay:.2f}s "
+            f"(attempt {state.attempt}/{self.max_retries + 1}: "
+            f"{record.status_code or record.error})"
+        )
+        return delay
+
+    def run(
+        self,
+        method: str,
+        path: str,
+        send: Callable[[Optional[float]], httpx.Response],
+        timeout: Optional[float] = None,
+    ) -> httpx.Response:
+        """
+        Call ``send(attempt_timeout)`` until it succeeds, fails permanently or
+        the retry budget is spent. Returns the last response; re-raises the
+        last transport error.
+        """
+        state = _RetryState()
+        while True:
+            state.attempt += 1
+            attempt_started = time.monotonic()
+            response: Optional[httpx.Response] = None
+            error: Optional[BaseException] = None
+            try:
+                response = send(self._attempt_timeout(timeout, state.started))
+            except httpx.TransportError as e:
+                error = e
+            delay = self._after_attempt(
+                state, method, path, attempt_started, response, error
+            )
+            if delay is None:
+                if error is not None:
+                    raise error
+                assert response is not None
+                return response
+            if response is not None:
+                response.close()
+            time.sleep(delay)
+
+    async def arun(
+        self,
+        method: str,
+        path: str,
+        send: Callable[[Optional[float]], Awaitable[httpx.Response]],
+        timeout: Optional[float] = None,
+    ) -> httpx.Response:
+        """Async counterpart of :meth:`run`"""
+        state = _RetryState()
+        while True:
+            state.attempt += 1
+            attempt_started = time.monotonic()
+            response: Optional[httpx.Response] = None
+            error: Optional[BaseException] = None
+            try:
+                response = await send(self._attempt_timeout(timeout, state.started))
+            except httpx.TransportError as e:
+                error = e
+            delay = self._after_attempt(
+                state, method, path, attempt_started, response, error
+            )
+            if delay is None:
+                if error is not None:
+                    raise error
+                assert response is not None
+                return response
+            if response is not None:
+                await response.aclose()
+            await asyncio.sleep(delay)
+
+
+class _RetryState:
+    """Per-request bookkeeping for RetryPolicy.run / arun"""
+
+    def __init__(self) -> None:
+        self.started = time.monotonic()
+        self.attempts: List[AttemptRecord] = []
+        self.delay = 0.0
+        self.attempt = 0
+        self.deadline_exceeded = False
+
+
+def get_last_attempts() -> List[AttemptRecord]:
+    """Attempts made by the most recent request in the current thread or task"""
+    return list(_last_attempts.get())
@@ -0,0 +1,268 @@
+"""
+Client-side model routing for Cost Katana
+Picks a model per call from a candidate set using EWMA latency, error rate
+and cost measured by the SDK itself
+"""
+
+import json
+import random
+import time
+from dataclasses import asdict, dataclass, fields
+from pathlib import Path
+from threading import Lock
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from .failover import failover_reason
+
+SNAPSHOT_VERSION = 1
+
+
+@dataclass
+class ModelStats:
+    """
+    Exponentially weighted statistics for one candidate model.
+
+    ``latency`` is in seconds and ``cost_per_1k`` in USD per 1,000 tokens;
+    both are None until the first successful call. ``error_rate`` is the
+    weighted share of failed calls.
+    """
+
+    latency: Optional[float] = None
+    error_rate: float = 0.0
+    cost_per_1k: Optional[float] = None
+    calls: int = 0
+    errors: int = 0
+    updated_at: Optional[float] = None
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ModelStats":
+        return cls(**{f.name: data[f.name] for f in fields(cls) if f.name in data})
+
+
+# Lower is better; None means the model is not eligible right now
+Objective = Callable[[ModelStats], Optional[float]]
+
+
+def min_latency(max_cost_per_1k: Optional[float] = None) -> Objective:
+    """Fastest model, optionally among those under a cost cap (USD per 1k tokens)"""
+
+    def objective(stats: ModelStats) -> Optional[float]:
+        if (
+            max_cost_per_1k is not None
+            and stats.cost_per_1k is not None
+            and stats.cost_per_1k > max_cost_per_1k
+        ):
+            return None
+        return stats.latency
+
+    return objective
+
+
+def min_cost(max_latency: Optional[float] = None) -> Objective:
+    """Cheapest model, optionally among those under a latency cap (seconds)"""
+
+    def objective(stats: ModelStats) -> Optional[float]:
+        if (
+            max_latency is not None
+            and stats.latency is not None
+            and stats.latency > max_latency
+        ):
+            return None
+        return stats.cost_per_1k
+
+    return objective
+
+
+def _ewma(current: Optional[float], sample: float, alpha: float) -> float:
+    return sample if current is None else alpha * sample + (1 - alpha) * current
+
+
+class Router:
+    """
+    Chooses one of ``candidates`` for each call.
+
+    Pass a Router wherever ``ai()``, ``aai()``, ``ai_batch()``, ``chat()`` or
+    ``achat()`` take a model. Every candidate is tried ``min_samples`` times
+    first; after that the ``objective`` picks the model with the lowest
+    score among those whose error rate is at most ``max_error_rate`` (and,
+    if none qualify, among all of them). A share ``explore`` of calls goes to
+    a random candidate so the statistics of models that aren't picked stay
+    current. Statistics are EWMAs with weight ``alpha`` on the newest call;
+    ``snapshot()`` / ``restore()`` (or ``save()`` / ``load()``) carry them
+    across restarts.
+
+    Example:
+        >>> router = ck.Router(
+        ...     [openai.gpt_4o_mini, anthropic.claude_haiku_4_5],
+        ...     objective=min_latency(max_cost_per_1k=0.002),
+        ... )
+        >>> response = ck.ai(router, 'Hello')
+        >>> response.model, router.stats()
+    """
+
+    def __init__(
+        self,
+        candidates: Sequence[str],
+        objective: Optional[Objective] = None,
+        alpha: float = 0.2,
+        min_samples: int = 3,
+        explore: float = 0.05,
+        max_error_rate: float = 0.5,
+        seed: Optional[int] = None,
+    ):
+        if not candidates:
+            raise ValueError("Router needs at least one candidate model")
+        if not 0 < alpha <= 1:
+            raise ValueError("alpha must be in (0, 1]")
+        self.candidates: List[str] = list(dict.fromkeys(candidates))
+        self.objective = objective or min_latency()
+        self.alpha = alpha
+        self.min_samples = min_samples
+        self.explore = explore
+        self.max_error_rate = max_error_rate
+        self._stats: Dict[str, ModelStats] = {m: ModelStats() for m in self.candidates}
+        self._random = random.Random(seed)
+        self._lock = Lock()
+
+    def __repr__(self) -> str:
+        return f"Router(candidates={self.candidates})"
+
+    def select(self) -> str:
+        """Pick the model for the next call"""
+        with self._lock:
+            warming = [
+                m for m in self.candidates if self._stats[m].calls < self.min_samples
+            ]
+            if warming:
+                return min(warming, key=lambda m: self._stats[m].calls)
+            if self.explore and self._random.random() < self.explore:
+                return self._random.choice(self.candidates)
+
+            scores = {m: self.objective(self._stats[m]) for m in self.candidates}
+            healthy = [
+                m
+                for m in self.candidates
+                if scores[m] is not None
+                and self._stats[m].error_rate <= self.max_error_rate
+            ]
+            pool = healthy or self.candidates
+            return min(pool, key=lambda m: _rank(scores[m], self._stats[m]))
+
+    def record(
+        self,
+        model: str,
+        latency: Optional[float] = None,
+        cost: float = 0.0,
+        tokens: int = 0,
+        error: bool = False,
+    ) -> None:
+        """Fold one call's outcome into ``model``'s statistics (ignored for non-candidates)"""
+        with self._lock:
+            stats = self._stats.get(model)
+            if stats is None:
+                return
+            stats.calls += 1
+            stats.errors += error
+            stats.error_rate = _ewma(stats.error_rate, float(error), self.alpha)
+            if not error:
+                if latency is not None:
+                    stats.latency = _ewma(stats.latency, latency, self.alpha)
+                if tokens > 0:
+                    stats.cost_per_1k = _ewma(
+                        stats.cost_per_1k, cost / tokens * 1000, self.alpha
+                    )
+            stats.updated_at = time.time()
+
+    def record_error(self, model: str, error: BaseException) -> None:
+        """
+        Record a failed call to ``model``. Only failures the model may be to
+        blame for (those that would fail over) count; an auth error or a bad
+        request would have failed on any candidate.
+        """
+        if failover_reason(error) is not None:
+            self.record(model, error=True)
+
+    def record_response(self, model: str, response: Any, latency: float) -> None:
+        """
+        Record an ``ai()`` SimpleResponse for the ``model`` the router picked.
+
+        Cache hits and coalesced calls say nothing about the model and are
+        skipped; a failed-over call counts as an error for ``model`` and a
+        success for the fallback if it is a candidate too.
+        """
+        if response.cached or response.coalesced:
+            return
+        if response.failover:
+            self.record(model, error=True)
+            model = response.model
+        self.record(model, latency, response.cost, response.tokens)
+
+    def record_exchange(self, model: str, response: Any, latency: float) -> None:
+        """Record a chat session's GenerateContentResponse"""
+        usage = response.usage_metadata
+        if usage.cache_hit:
+            return
+        self.record(
+            model,
+            latency,
+            usage.cost,
+            usage.total_tokens,
+            error=bool(response.failover),
+        )
+
+    def record_stream(self, model: str, stream: Any) -> None:
+        """Record a fully consumed MessageStream (latency is the whole stream)"""
+        if not getattr(stream, "complete", True):
+            # Stopped early by the caller: its duration says nothing about the model
+            return
+        usage = stream.usage
+        self.record(
+            model,
+            stream.duration,
+            usage.get("cost") or 0.0,
+            usage.get("tokenCount") or 0,
+        )
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Current statistics per candidate"""
+        with self._lock:
+            return {m: asdict(self._stats[m]) for m in self.candidates}
+
+    def snapshot(self) -> Dict[str, Any]:
+        """JSON-serializable state, for :meth:`restore` after a restart"""
+        return {"version": SNAPSHOT_VERSION, "models": self.stats()}
+
+    def restore(self, snapshot: Dict[str, Any]) -> None:
+        """Load statistics from :meth:`snapshot`; models no longer in candidates are ignored"""
+        if snapshot.get("version") != SNAPSHOT_VERSION:
+            raise ValueError(
+                f"Unsupported router snapshot version: {snapshot.get('version')}"
+            )
+        with self._lock:
+            for model, data in snapshot.get("models", {}).items():
+                if model in self._stats:
+                    self._stats[model] = ModelStats.from_dict(data)
+
+    def save(self, path: str) -> None:
+        """Write :meth:`snapshot` to a JSON file"""
+        target = Path(path).expanduser()
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_suffix(target.suffix + ".tmp")
+        tmp.write_text(json.dumps(self.snapshot()), encoding="utf-8")
+        tmp.replace(target)
+
+    def load(self, path: str) -> bool:
+        """Restore from a :meth:`save` file; returns False if there is none"""
+        source = Path(path).expanduser()
+        if not source.exists():
+            return False
+        self.restore(json.loads(source.read_text(encoding="utf-8")))
+        return True
+
+
+def _rank(score: Optional[float], stats: ModelStats) -> tuple:
+    # Eligible before ineligible, known scores before unknown, then by score
+    # and error rate
+    if score is None:
+        return (1, 0.0, stats.error_rate)
+    return (0, score, stats.error_rate)
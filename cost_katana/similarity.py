@@ -0,0 +1,228 @@
+"""
+Near-duplicate response cache for Cost Katana
+MinHash fingerprints of prompts with an LSH band index, so prompts that
+differ only in whitespace, casing or a few characters can reuse a completion
+without an embedding model
+"""
+
+import json
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+_MASK64 = (1 << 64) - 1
+_EMPTY = _MASK64
+# Odd 64-bit constant used to derive values for empty bins
+_DENSIFY_STEP = 0x9E3779B97F4A7C15
+
+
+def normalize_prompt(text: str) -> str:
+    """Lowercase and collapse runs of whitespace"""
+    return " ".join(text.lower().split())
+
+
+def minhash_signature(
+    text: str, num_perm: int = 128, shingle_size: int = 4
+) -> List[int]:
+    """
+    One-permutation MinHash of a prompt's character shingles.
+
+    Each shingle is hashed once; the hash picks one of ``num_perm`` bins and
+    the bin keeps its minimum. Empty bins (short prompts) are filled from the
+    next non-empty bin, so two signatures agree in a fraction of positions
+    that estimates the Jaccard similarity of the shingle sets. Cost is linear
+    in the prompt length, independent of ``num_perm``.
+
+    Uses the process's string hash, so signatures are only comparable within
+    one process.
+    """
+    text = normalize_prompt(text)
+    if len(text) <= shingle_size:
+        shingles = {text}
+    else:
+        shingles = {
+            text[i : i + shingle_size] for i in range(len(text) - shingle_size + 1)
+        }
+
+    bins = [_EMPTY] * num_perm
+    for shingle in shingles:
+        h = hash(shingle) & _MASK64
+        index, value = h % num_perm, h // num_perm
+        if value < bins[index]:
+            bins[index] = value
+
+    if _EMPTY in bins and any(b != _EMPTY for b in bins):
+        for i in range(num_perm):
+            if bins[i] != _EMPTY:
+                continue
+            offset = 1
+            while bins[(i + offset) % num_perm] == _EMPTY:
+                offset += 1
+            bins[i] = (bins[(i + offset) % num_perm] + offset * _DENSIFY_STEP) & _MASK64
+    return bins
+
+
+def estimate_similarity(a: List[int], b: List[int]) -> float:
+    """Estimated Jaccard similarity of two signatures"""
+    return sum(1 for x, y in zip(a, b) if x == y) / len(a)
+
+
+_EntryId = Tuple[str, Tuple[int, ...]]
+
+
+class _Entry:
+    __slots__ = ("partition", "signature", "band_keys", "raw", "expires_at")
+
+    def __init__(
+        self,
+        partition: str,
+        signature: List[int],
+        band_keys: List[Tuple[str, int, int]],
+        raw: bytes,
+        expires_at: Optional[float],
+    ):
+        self.partition = partition
+        self.signature = signature
+        self.band_keys = band_keys
+        self.raw = raw
+        self.expires_at = expires_at
+
+
+class SimilarityCache:
+    """
+    Bounded near-duplicate cache of ``/api/chat/message`` responses.
+
+    Entries live in partitions (model + generation parameters); a lookup only
+    matches prompts in the same partition whose estimated similarity is at
+    least ``threshold``. Candidates come from an LSH index of ``bands`` bands
+    of the signature, so a lookup touches a handful of entries regardless of
+    index size. At most ``max_entries`` entries are kept (LRU).
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.9,
+        max_entries: int = 1024,
+        ttl: Optional[float] = 3600.0,
+        num_perm: int = 128,
+        bands: int = 32,
+    ):
+        if not 0 < threshold <= 1:
+            raise ValueError("threshold must be in (0, 1]")
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.num_perm = num_perm
+        self.bands = bands
+        self._rows = num_perm // bands
+
+        # Entries are keyed by (partition, signature): re-storing the same
+        # prompt replaces its entry instead of adding a duplicate
+        self._entries: "OrderedDict[_EntryId, _Entry]" = OrderedDict()
+        self._buckets: Dict[Tuple[str, int, int], Set[_EntryId]] = {}
+        self._lock = Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "candidates": 0}
+
+    def _band_keys(
+        self, partition: str, signature: List[int]
+    ) -> List[Tuple[str, int, int]]:
+        rows = self._rows
+        return [
+            (partition, band, hash(tuple(signature[band * rows : (band + 1) * rows])))
+            for band in range(self.bands)
+        ]
+
+    def get(
+        self, partition: str, prompt: str
+    ) -> Optional[Tuple[Dict[str, Any], float]]:
+        """(cached response, estimated similarity) for the closest match, or None"""
+        signature = minhash_signature(prompt, self.num_perm)
+        band_keys = self._band_keys(partition, signature)
+        now = time.monotonic()
+
+        with self._lock:
+            candidates: Set[_EntryId] = set()
+            for key in band_keys:
+                candidates.update(self._buckets.get(key, ()))
+            self._stats["candidates"] += len(candidates)
+
+            best: Optional[_EntryId] = None
+            best_score = 0.0
+            for entry_id in candidates:
+                entry = self._entries[entry_id]
+                if entry.expires_at is not None and entry.expires_at <= now:
+                    self._remove(entry_id)
+                    continue
+                score = estimate_similarity(signature, entry.signature)
+                if score >= self.threshold and score > best_score:
+                    best, best_score = entry_id, score
+
+            if best is None:
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(best)
+            self._stats["hits"] += 1
+            raw = self._entries[best].raw
+        return json.loads(raw), best_score
+
+    def set(self, partition: str, prompt: str, response_data: Dict[str, Any]) -> None:
+        signature = minhash_signature(prompt, self.num_perm)
+        band_keys = self._band_keys(partition, signature)
+        raw = json.dumps(response_data, separators=(",", ":")).encode("utf-8")
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+
+        entry_id = (partition, tuple(signature))
+        with self._lock:
+            if entry_id in self._entries:
+                self._remove(entry_id)
+            self._entries[entry_id] = _Entry(
+                partition, signature, band_keys, raw, expires_at
+            )
+            for key in band_keys:
+                self._buckets.setdefault(key, set()).add(entry_id)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self._stats["evictions"] += 1
+
+    def _remove(self, entry_id: _EntryId) -> None:
+        entry = self._entries.pop(entry_id)
+        for key in entry.band_keys:
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket.discard(entry_id)
+                if not bucket:
+                    del self._buckets[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._buckets.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss/eviction counters, candidates examined and index size"""
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return {
+                **self._stats,
+                "hit_rate": self._stats["hits"] / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "buckets": len(self._buckets),
+            }
+
+
+def similarity_cache_from_config(config: Any) -> Optional[SimilarityCache]:
+    """Build a SimilarityCache from Config fields, or None when disabled"""
+    if not config.similarity_cache_enabled:
+        return None
+    return SimilarityCache(
+        threshold=config.similarity_cache_threshold,
+        max_entries=config.similarity_cache_max_entries,
+        ttl=config.response_cache_ttl,
+    )
@@ -0,0 +1,133 @@
+"""
+Request coalescing for Cost Katana
+Identical concurrent requests share one in-flight call (single-flight)
+"""
+
+import asyncio
+import copy
+from threading import Event, Lock
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class _Call:
+    """One in-flight call and the callers waiting on it"""
+
+    def __init__(self) -> None:
+        self.done = Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.followers = 0
+
+
+class SingleFlight:
+    """
+    Collapse concurrent calls with the same key into one.
+
+    The first caller for a key (the leader) runs the function; callers that
+    arrive while it is in flight (followers) block until it finishes and get
+    a deep copy of its result, or the same exception. Nothing is cached: once
+    the call completes the next caller starts a new one.
+    """
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self._calls: Dict[str, _Call] = {}
+        self._stats = {"calls": 0, "coalesced": 0}
+
+    def do(self, key: str, fn: Callable[[], T]) -> Tuple[T, bool]:
+        """Run ``fn`` once per in-flight ``key``; returns (result, coalesced)"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if call is None:
+                call = self._calls[key] = _Call()
+                self._stats["calls"] += 1
+            else:
+                call.followers += 1
+                self._stats["coalesced"] += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return copy.deepcopy(call.result), True
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+                shared = call.followers > 0
+            call.done.set()
+        # Followers copy the stored result; hand the leader its own copy
+        return (copy.deepcopy(call.result) if shared else call.result), False
+
+    def stats(self) -> Dict[str, int]:
+        """Calls executed, callers coalesced onto them, and calls in flight now"""
+        with self._lock:
+            return {**self._stats, "in_flight": len(self._calls)}
+
+
+class AsyncSingleFlight:
+    """Async counterpart of :class:`SingleFlight` for one event loop"""
+
+    def __init__(self) -> None:
+        self._calls: Dict[str, "asyncio.Future[Any]"] = {}
+        self._followers: Dict[str, int] = {}
+        self._stats = {"calls": 0, "coalesced": 0}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> Tuple[T, bool]:
+        """
+        Await ``fn`` once per in-flight ``key``; returns (result, coalesced).
+
+        If the leader is cancelled, its followers don't inherit the
+        cancellation: the first of them to wake up runs ``fn`` instead.
+        """
+        future = self._calls.get(key)
+        while future is not None:
+            self._followers[key] += 1
+            self._stats["coalesced"] += 1
+            try:
+                result = await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise  # this caller was cancelled, not the leader
+                self._stats["coalesced"] -= 1
+                future = self._calls.get(key)
+                continue
+            return copy.deepcopy(result), True
+
+        future = asyncio.get_running_loop().create_future()
+        self._calls[key] = future
+        self._followers[key] = 0
+        self._stats["calls"] += 1
+        try:
+            result = await fn()
+        except BaseException as e:
+            if isinstance(e, asyncio.CancelledError):
+                future.cancel()
+            else:
+                future.set_exception(e)
+                # Mark retrieved so an unawaited future doesn't warn
+                future.exception()
+            raise
+        else:
+            future.set_result(result)
+        finally:
+            del self._calls[key]
+            shared = self._followers.pop(key) > 0
+        return (copy.deepcopy(result) if shared else result), False
+
+    def stats(self) -> Dict[str, int]:
+        return {**self._stats, "in_flight": len(self._calls)}
+
+
+def mark_coalesced(response_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Flag a follower's copy of a send_message response"""
+    response_data["coalesced"] = True
+    return response_data
@@ -0,0 +1,306 @@
+"""
+Streaming responses for Cost Katana
+Server-sent event parsing and incremental message streams
+"""
+
+import json
+import time
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+)
+
+# Keys that carry incremental completion text in a stream event
+_TEXT_KEYS = ("delta", "content", "text", "chunk", "token")
+
+# Event types / flags that mark the final (usage) event
+_FINAL_TYPES = ("done", "complete", "completed", "end", "final")
+
+
+class SSEParser:
+    """
+    Incremental ``text/event-stream`` parser.
+
+    Feed it lines; it returns a decoded event (a dict) whenever a blank line
+    completes one. ``data: [DONE]`` ends the stream.
+    """
+
+    def __init__(self) -> None:
+        self._data: List[str] = []
+        self._event: Optional[str] = None
+        self.finished = False
+
+    def feed(self, line: str) -> Optional[Dict[str, Any]]:
+        line = line.rstrip("\r")
+        if not line:
+            return self._dispatch()
+        if line.startswith(":"):
+            return None
+        field, _, value = line.partition(":")
+        if value.startswith(" "):
+            value = value[1:]
+        if field == "data":
+            self._data.append(value)
+        elif field == "event":
+            self._event = value
+        return None
+
+    def flush(self) -> Optional[Dict[str, Any]]:
+        """Dispatch a trailing event not followed by a blank line"""
+        return self._dispatch()
+
+    def _dispatch(self) -> Optional[Dict[str, Any]]:
+        if not self._data:
+            self._event = None
+            return None
+        raw = "\n".join(self._data)
+        event_type = self._event
+        self._data = []
+        self._event = None
+
+        if raw.strip() == "[DONE]":
+            self.finished = True
+            return None
+        try:
+            event = json.loads(raw)
+        except json.JSONDecodeError:
+            event = {"delta": raw}
+        if not isinstance(event, dict):
+            event = {"delta": str(event)}
+        if event_type and "type" not in event:
+            event["type"] = event_type
+        return event
+
+
+def iter_sse_events(lines: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    """Decode SSE lines into event dicts"""
+    parser = SSEParser()
+    for line in lines:
+        event = parser.feed(line)
+        if event is not None:
+            yield event
+        if parser.finished:
+            return
+    event = parser.flush()
+    if event is not None:
+        yield event
+
+
+async def aiter_sse_events(lines: AsyncIterator[str]) -> AsyncIterator[Dict[str, Any]]:
+    """Async counterpart of :func:`iter_sse_events`"""
+    parser = SSEParser()
+    async for line in lines:
+        event = parser.feed(line)
+        if event is not None:
+            yield event
+        if parser.finished:
+            return
+    event = parser.flush()
+    if event is not None:
+        yield event
+
+
+class _StreamState:
+    """Text accumulation, usage metadata and timing shared by sync/async streams"""
+
+    def __init__(self, started: Optional[float] = None):
+        self.started = started if started is not None else time.perf_counter()
+        self.first_token_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.chunks: List[str] = []
+        self.metadata: Dict[str, Any] = {}
+        self.done = False
+        # False when the stream was closed, abandoned or failed before its end
+        self.complete = False
+        self._callbacks: List[Callable[[Any], object]] = []
+
+    def add_done_callback(self, callback: Callable[[Any], object]) -> None:
+        """
+        Call ``callback(stream)`` once the stream ends: fully read, closed,
+        abandoned by the caller or failed (see ``complete``)
+        """
+        if self.done:
+            callback(self)
+        else:
+            self._callbacks.append(callback)
+
+    def _on_event(self, event: Dict[str, Any]) -> Optional[str]:
+        data = event.get("data")
+        body: Dict[str, Any] = data if isinstance(data, dict) else event
+        text = None
+        for key in _TEXT_KEYS:
+            value = body.get(key)
+            if isinstance(value, str):
+                text = value
+                break
+
+        is_final = bool(body.get("done") or event.get("done")) or (
+            str(event.get("type", "")).lower() in _FINAL_TYPES
+        )
+        for key, value in body.items():
+            if key in _TEXT_KEYS or key in ("type", "done"):
+                continue
+            self.metadata[key] = value
+
+        if is_final:
+            # Final events may repeat the whole completion; chunks already have it
+            if text and not self.chunks:
+                self.chunks.append(text)
+            return None
+
+        if text:
+            if self.first_token_at is None:
+                self.first_token_at = time.perf_counter()
+            self.chunks.append(text)
+        return text or None
+
+    def _finish(self) -> None:
+        if self.done:
+            return
+        self.done = True
+        self.finished_at = time.perf_counter()
+        callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            callback(self)
+
+    @property
+    def text(self) -> str:
+        """Completion text received so far"""
+        return "".join(self.chunks)
+
+    @property
+    def thinking(self) -> Any:
+        return self.metadata.get("thinking")
+
+    @property
+    def usage(self) -> Dict[str, Any]:
+        """Final usage metadata (cost, tokenCount, model, ...) from the server"""
+        return dict(self.metadata)
+
+    @property
+    def time_to_first_token(self) -> Optional[float]:
+        """Seconds from request start to the first text chunk"""
+        if self.first_token_at is None:
+            return None
+        return self.first_token_at - self.started
+
+    @property
+    def duration(self) -> Optional[float]:
+        if self.finished_at is None:
+            return None
+        return self.finished_at - self.started
+
+    @property
+    def output_tokens(self) -> int:
+        """Server-reported completion tokens, or an estimate (~4 chars/token)"""
+        for key in ("outputTokens", "completionTokens", "tokenCount"):
+            if self.metadata.get(key):
+                return int(self.metadata[key])
+        return len(self.text) // 4
+
+    @property
+    def tokens_per_second(self) -> Optional[float]:
+        """Generation rate from the first token to the end of the stream"""
+        if self.first_token_at is None or self.finished_at is None:
+            return None
+        elapsed = self.finished_at - self.first_token_at
+        if elapsed <= 0:
+            return None
+        return self.output_tokens / elapsed
+
+    @property
+    def response_data(self) -> Dict[str, Any]:
+        """The stream folded into the shape of a non-streaming /api/chat/message response"""
+        return {"success": True, "data": {**self.metadata, "response": self.text}}
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "time_to_first_token": self.time_to_first_token,
+            "tokens_per_second": self.tokens_per_second,
+            "duration": self.duration,
+            "output_tokens": self.output_tokens,
+            "chunks": len(self.chunks),
+        }
+
+
+class MessageStream(_StreamState):
+    """
+    Iterable of completion text chunks.
+
+    After the loop finishes, ``text``, ``usage``, ``thinking``,
+    ``time_to_first_token`` and ``tokens_per_second`` describe the whole
+    completion. Breaking out of the loop or calling :meth:`close` ends the
+    stream early; done callbacks still run, on what was received so far.
+
+    Example:
+        stream = client.stream_message("Tell me a story", model_id)
+        for chunk in stream:
+            print(chunk, end="", flush=True)
+        print(stream.usage.get("cost"), stream.time_to_first_token)
+    """
+
+    def __init__(
+        self, events: Iterator[Dict[str, Any]], started: Optional[float] = None
+    ):
+        super().__init__(started)
+        self._events = events
+
+    def __iter__(self) -> Iterator[str]:
+        try:
+            for event in self._events:
+                text = self._on_event(event)
+                if text:
+                    yield text
+            self.complete = True
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        """Stop reading, release the connection and run the done callbacks"""
+        try:
+            close = getattr(self._events, "close", None)
+            if close:
+                close()
+        finally:
+            self._finish()
+
+    def __repr__(self) -> str:
+        return f"<MessageStream chunks={len(self.chunks)} done={self.done}>"
+
+
+class AsyncMessageStream(_StreamState):
+    """Async iterable of completion text chunks (see MessageStream)"""
+
+    def __init__(
+        self, events: AsyncIterator[Dict[str, Any]], started: Optional[float] = None
+    ):
+        super().__init__(started)
+        self._events = events
+
+    async def __aiter__(self) -> AsyncIterator[str]:
+        try:
+            async for event in self._events:
+                text = self._on_event(event)
+                if text:
+                    yield text
+            self.complete = True
+        finally:
+            await self.aclose()
+
+    async def aclose(self) -> None:
+        """Stop reading, release the connection and run the done callbacks"""
+        try:
+            aclose = getattr(self._events, "aclose", None)
+            if aclose:
+                await aclose()
+        finally:
+            self._finish()
+
+    def __repr__(self) -> str:
+        return f"<AsyncMessageStream chunks={len(self.chunks)} done={self.done}>"
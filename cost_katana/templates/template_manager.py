@@ -11,6 +11,8 @@ from typing import Any, Dict, List, Optional, cast
 import httpx
 
 from ..logging.logger import logger
+from ..metrics import TEMPLATE_LOOKUPS
+from ..pool import ConnectionPool, shared_connection_pool
 
 
 class TemplateManager:
@@ -22,6 +24,7 @@ class TemplateManager:
         base_url: str = "https://api.costkatana.com",
         enable_caching: bool = True,
         cache_ttl: int = 300,  # 5 minutes in seconds
+        connection_pool: Optional[ConnectionPool] = None,
     ):
         self.config = {
             "api_key": api_key or "",
@@ -33,14 +36,16 @@ class TemplateManager:
         self.local_templates: Dict[str, Dict[str, Any]] = {}
         self.template_cache: Dict[str, Dict[str, Any]] = {}
         self.client: Optional[httpx.Client] = None
+        self.connection_pool = connection_pool
 
         if self.config["api_key"]:
             self._initialize_client()
 
     def _initialize_client(self):
         """Initialize HTTP client"""
-        self.client = httpx.Client(
-            base_url=self.config["base_url"],
+        pool = self.connection_pool or shared_connection_pool()
+        self.client = pool.client(
+            base_url=cast(str, self.config["base_url"]),
             headers={
                 "Authorization": f"Bearer {self.config['api_key']}",
                 "Content-Type": "application/json",
@@ -62,6 +67,7 @@ class TemplateManager:
         # Check local templates first
         if template_id in self.local_templates:
             logger.debug(f"Template found locally: {template_id}")
+            TEMPLATE_LOOKUPS.inc(1, "local")
             return self.local_templates[template_id]
 
         # Check cache
@@ -69,9 +75,11 @@ class TemplateManager:
             cached = self.template_cache[template_id]
             if cached["expiry"] > time.time():
                 logger.debug(f"Template found in cache: {template_id}")
+                TEMPLATE_LOOKUPS.inc(1, "cache")
                 return cached["template"]
 
         # Fetch from backend
+        TEMPLATE_LOOKUPS.inc(1, "backend")
         return self.fetch_template(template_id)
 
     def fetch_template(self, template_id: str) -> Optional[Dict[str, Any]]:
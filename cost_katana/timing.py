@@ -0,0 +1,198 @@
+"""
+Request timing for Cost Katana
+Connect / TLS / TTFB / download phases of gateway requests, captured with an
+httpx request hook and the httpcore ``trace`` extension
+"""
+
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+import httpx
+
+from .retry import AttemptRecord
+
+_TRACER = "cost_katana.timing"
+
+
+@dataclass
+class RequestTiming:
+    """
+    Where the time of one gateway call went, in milliseconds.
+
+    ``queue`` (waiting for a pooled connection or HTTP/2 stream), ``connect``
+    (DNS + TCP), ``tls``, ``send`` (writing the request), ``ttfb`` (request
+    sent to response headers: the gateway and the model) and ``download``
+    (response body) describe the final HTTP attempt; ``connect`` and ``tls``
+    are zero on a reused connection. ``retry_wait`` covers earlier failed
+    attempts and their backoff. ``sdk_overhead`` is whatever is left of
+    ``total``: template resolution, payload building, caching, parsing and
+    log redaction.
+    """
+
+    queue: float = 0.0
+    connect: float = 0.0
+    tls: float = 0.0
+    send: float = 0.0
+    ttfb: float = 0.0
+    download: float = 0.0
+    retry_wait: float = 0.0
+    sdk_overhead: float = 0.0
+    total: float = 0.0
+    attempts: int = 1
+    http_version: Optional[str] = None
+    connection_reused: bool = True
+
+    @property
+    def network(self) -> float:
+        """Time spent in HTTP, including earlier attempts and backoff"""
+        return (
+            self.queue
+            + self.connect
+            + self.tls
+            + self.send
+            + self.ttfb
+            + self.download
+            + self.retry_wait
+        )
+
+    def finish(self, total: float) -> "RequestTiming":
+        """Set the call's wall-clock ``total`` (ms) and derive ``sdk_overhead``"""
+        self.total = total
+        self.sdk_overhead = max(0.0, total - self.network)
+        return self
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "RequestTiming":
+        return cls(**{k: v for k, v in data.items() if k in cls.__dataclass_fields__})
+
+    def to_log(self) -> Dict[str, Any]:
+        """camelCase breakdown for an AILogger entry (milliseconds)"""
+        return {
+            "queue": round(self.queue, 3),
+            "connect": round(self.connect, 3),
+            "tls": round(self.tls, 3),
+            "send": round(self.send, 3),
+            "ttfb": round(self.ttfb, 3),
+            "download": round(self.download, 3),
+            "retryWait": round(self.retry_wait, 3),
+            "sdkOverhead": round(self.sdk_overhead, 3),
+            "total": round(self.total, 3),
+            "attempts": self.attempts,
+            "httpVersion": self.http_version,
+            "connectionReused": self.connection_reused,
+        }
+
+
+class _Tracer:
+    """Timestamps of httpcore trace events for one request"""
+
+    __slots__ = ("started", "marks")
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.marks: Dict[str, float] = {}
+
+    def __call__(self, event: str, info: Dict[str, Any]) -> None:
+        # "http11.send_request_headers.started" -> "send_request_headers.started"
+        self.marks.setdefault(event.split(".", 1)[-1], time.perf_counter())
+
+    async def atrace(self, event: str, info: Dict[str, Any]) -> None:
+        self(event, info)
+
+    def _span(self, start: str, end: str) -> float:
+        if start in self.marks and end in self.marks:
+            return (self.marks[end] - self.marks[start]) * 1000
+        return 0.0
+
+    def timing(self) -> RequestTiming:
+        marks = self.marks
+        first = min(
+            (
+                marks[name]
+                for name in ("connect_tcp.started", "send_request_headers.started")
+                if name in marks
+            ),
+            default=self.started,
+        )
+        sent = (
+            "send_request_body.complete"
+            if "send_request_body.complete" in marks
+            else "send_request_headers.complete"
+        )
+        downloaded = marks.get("receive_response_body.complete") or marks.get(
+            "response_closed.started", time.perf_counter()
+        )
+        headers = marks.get("receive_response_headers.complete")
+        return RequestTiming(
+            queue=(first - self.started) * 1000,
+            connect=self._span("connect_tcp.started", "connect_tcp.complete"),
+            tls=self._span("start_tls.started", "start_tls.complete"),
+            send=self._span("send_request_headers.started", sent),
+            ttfb=self._span(sent, "receive_response_headers.complete"),
+            download=(downloaded - headers) * 1000 if headers is not None else 0.0,
+            connection_reused="connect_tcp.started" not in marks,
+        )
+
+
+def _on_request(request: httpx.Request) -> None:
+    tracer = _Tracer()
+    request.extensions[_TRACER] = tracer
+    request.extensions.setdefault("trace", tracer)
+
+
+async def _aon_request(request: httpx.Request) -> None:
+    tracer = _Tracer()
+    request.extensions[_TRACER] = tracer
+    request.extensions.setdefault("trace", tracer.atrace)
+
+
+def timing_hooks() -> Dict[str, List[Callable[..., Any]]]:
+    """``event_hooks`` for an ``httpx.Client`` that records request phases"""
+    return {"request": [_on_request]}
+
+
+def async_timing_hooks() -> Dict[str, List[Callable[..., Any]]]:
+    """``event_hooks`` for an ``httpx.AsyncClient`` that records request phases"""
+    return {"request": [_aon_request]}
+
+
+def response_timing(
+    response: httpx.Response, attempts: Optional[List[AttemptRecord]] = None
+) -> Optional[RequestTiming]:
+    """
+    Phases of the request behind ``response`` (None if it was sent by a
+    client without the timing hooks). ``attempts`` are the retry policy's
+    records for the call; all but the last count as ``retry_wait``.
+    """
+    tracer = response.request.extensions.get(_TRACER)
+    if not isinstance(tracer, _Tracer):
+        return None
+    timing = tracer.timing()
+    timing.http_version = response.http_version
+    if attempts:
+        timing.attempts = len(attempts)
+        timing.retry_wait = (
+            sum(a.duration + a.delay_before_next for a in attempts[:-1]) * 1000
+        )
+    return timing
+
+
+def attach_timing(
+    result: Dict[str, Any],
+    response: httpx.Response,
+    started: float,
+    attempts: Optional[List[AttemptRecord]] = None,
+) -> Dict[str, Any]:
+    """
+    Add ``"timing"`` to a send_message result; ``started`` is the call's
+    ``time.perf_counter()`` start.
+    """
+    timing = response_timing(response, attempts)
+    if timing is not None and isinstance(result, dict):
+        timing.finish((time.perf_counter() - started) * 1000)
+        result["timing"] = timing.to_dict()
+    return result
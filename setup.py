@@ -38,6 +38,10 @@ setup(
     ],
     python_requires=">=3.8",
     install_requires=requirements,
+    extras_require={
+        "http2": ["h2>=3,<5"],
+        "zstd": ["zstandard>=0.18"],
+    },
     keywords="ai, machine learning, cost optimization, openai, anthropic, aws bedrock, gemini, claude",
     project_urls={
         "Bug Reports": "https://github.com/Hypothesize-Tech/cost-katana-python/issues",
@@ -0,0 +1,445 @@
+"""
+Tests for the AILogger upload queue
+"""
+
+import gzip
+import json
+import threading
+import time
+
+import warnings
+
+import httpx
+import pytest
+
+import cost_katana as ck
+from cost_katana.logging.ai_logger import AILogger
+from cost_katana.logging.spool import LogSpool
+from cost_katana.logging.wal import WriteAheadLog
+
+
+def body(request):
+    """The upload body, decompressed"""
+    raw = request.read()
+    if request.headers.get("Content-Encoding") == "gzip":
+        return gzip.decompress(raw)
+    return raw
+
+
+def recording_transport(posts, status=200):
+    def handler(request):
+        posts.append((threading.current_thread().name, body(request)))
+        return httpx.Response(status, json={})
+
+    return httpx.MockTransport(handler)
+
+
+def make_logger(posts, status=200, **kwargs):
+    settings = dict(flush_interval=60.0)
+    settings.update(kwargs)
+    ai_logger = AILogger(api_key="test_key", **settings)
+    ai_logger.client = httpx.Client(
+        base_url="https://api.test", transport=recording_transport(posts, status)
+    )
+    return ai_logger
+
+
+def offline_logger(**kwargs):
+    """A logger without a client or worker, so nothing leaves the queue"""
+    return AILogger(api_key="", **kwargs)
+
+
+def prompts(ai_logger):
+    return [entry["prompt"] for entry in ai_logger.log_buffer]
+
+
+def wait_until(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        time.sleep(0.005)
+    return predicate()
+
+
+class TestWorker:
+    """Test the single background uploader"""
+
+    def test_one_worker_uploads_full_batches(self):
+        """Full batches wake the one worker; no thread is started per batch"""
+        posts = []
+        ai_logger = make_logger(posts, batch_size=10)
+        threads_before = threading.active_count()
+
+        for i in range(100):
+            ai_logger.log_ai_call({"service": "openai", "prompt": f"p{i}"})
+
+        assert wait_until(lambda: ai_logger.stats()["flushed"] == 100)
+        assert threading.active_count() <= threads_before
+        assert {name for name, _ in posts} == {"cost-katana-ai-logger"}
+        ai_logger.shutdown()
+
+    def test_interval(self):
+        """A partial batch goes out once flush_interval has passed"""
+        posts = []
+        ai_logger = make_logger(posts, batch_size=50, flush_interval=0.05)
+
+        ai_logger.log_ai_call({"service": "openai", "prompt": "hi"})
+
+        assert wait_until(lambda: len(posts) == 1)
+        ai_logger.shutdown()
+
+    def test_failed_upload_requeued(self):
+        """A failed batch goes back to the front of the queue in order"""
+        posts = []
+        ai_logger = make_logger(posts, status=503, batch_size=50)
+        ai_logger.log_ai_call({"service": "openai", "prompt": "a"})
+        ai_logger.log_ai_call({"service": "openai", "prompt": "b"})
+
+        ai_logger.flush()
+
+        assert prompts(ai_logger) == ["a", "b"]
+        assert ai_logger.stats()["flush_failures"] == 1
+        ai_logger.clear_buffer()
+        ai_logger.shutdown()
+
+    def test_shutdown_stops_worker(self):
+        """shutdown() joins the worker and uploads what is left"""
+        posts = []
+        ai_logger = make_logger(posts, batch_size=50)
+        ai_logger.log_ai_call({"service": "openai", "prompt": "last"})
+
+        ai_logger.shutdown()
+
+        assert not ai_logger.flush_thread.is_alive()
+        assert len(posts) == 1 and ai_logger.get_buffer_size() == 0
+
+
+class TestOverflow:
+    """Test the policies for a full queue"""
+
+    def test_drop_oldest(self):
+        ai_logger = offline_logger(max_queue_size=3)
+        for i in range(5):
+            ai_logger.log_ai_call({"service": "openai", "prompt": f"p{i}"})
+
+        assert prompts(ai_logger) == ["p2", "p3", "p4"]
+        stats = ai_logger.stats()
+        assert (stats["enqueued"], stats["dropped_oldest"]) == (5, 2)
+
+    def test_drop_newest(self):
+        ai_logger = offline_logger(max_queue_size=3, overflow_policy="drop_newest")
+        for i in range(5):
+            ai_logger.log_ai_call({"service": "openai", "prompt": f"p{i}"})
+
+        assert prompts(ai_logger) == ["p0", "p1", "p2"]
+        assert ai_logger.stats()["dropped_newest"] == 2
+
+    def test_block_times_out(self):
+        """A blocked caller gives up after block_timeout"""
+        ai_logger = offline_logger(
+            max_queue_size=1, overflow_policy="block", block_timeout=0.05
+        )
+        ai_logger.log_ai_call({"service": "openai", "prompt": "kept"})
+
+        started = time.perf_counter()
+        ai_logger.log_ai_call({"service": "openai", "prompt": "dropped"})
+
+        assert time.perf_counter() - started >= 0.05
+        assert prompts(ai_logger) == ["kept"]
+        assert ai_logger.stats()["dropped_timeout"] == 1
+
+    def test_block_until_room(self):
+        """A blocked caller proceeds as soon as an upload makes room"""
+        posts = []
+        ai_logger = make_logger(
+            posts, batch_size=50, max_queue_size=1, overflow_policy="block", block_timeout=2
+        )
+        ai_logger.log_ai_call({"service": "openai", "prompt": "first"})
+        caller = threading.Thread(
+            target=ai_logger.log_ai_call, args=({"service": "openai", "prompt": "second"},)
+        )
+        caller.start()
+        time.sleep(0.05)
+        assert caller.is_alive()
+
+        ai_logger.flush()
+        caller.join(1)
+
+        assert not caller.is_alive()
+        stats = ai_logger.stats()
+        assert (stats["enqueued"], stats["dropped_timeout"]) == (2, 0)
+        ai_logger.shutdown()
+
+    def test_unknown_policy(self):
+        with pytest.raises(ValueError):
+            AILogger(api_key="", overflow_policy="spill")
+
+
+class TestSpool:
+    """Test the memory cap and the on-disk spool"""
+
+    def test_byte_cap(self):
+        """Without a spool the byte cap evicts like the count cap"""
+        ai_logger = offline_logger(max_queue_bytes=1000)
+        for i in range(50):
+            ai_logger.log_ai_call({"service": "openai", "prompt": f"p{i}"})
+
+        stats = ai_logger.stats()
+        assert stats["queued_bytes"] <= 1000 and stats["dropped_oldest"] > 0
+        assert prompts(ai_logger)[-1] == "p49"
+
+    def test_outage_spills_and_replays_in_order(self, tmp_path):
+        """Past the cap entries go to disk, then everything is sent in order"""
+        posts = []
+        ai_logger = make_logger(
+            posts, status=503, batch_size=2, max_queue_size=5, spool_dir=str(tmp_path)
+        )
+        for i in range(20):
+            ai_logger.log_ai_call({"service": "openai", "prompt": f"p{i}"})
+        ai_logger.flush()
+
+        stats = ai_logger.stats()
+        assert stats["queued"] <= 5 and stats["spool_pending"] >= 15
+        assert stats["queued"] + stats["spool_pending"] == 20
+        assert list(tmp_path.glob("*.jsonl"))
+
+        sent = []
+
+        def handler(request):
+            sent.extend(e["prompt"] for e in json.loads(body(request))["logs"])
+            return httpx.Response(200, json={})
+
+        ai_logger.client = httpx.Client(
+            base_url="https://api.test", transport=httpx.MockTransport(handler)
+        )
+        ai_logger.flush()
+
+        assert sent == [f"p{i}" for i in range(20)]
+        assert not list(tmp_path.glob("*.jsonl"))
+        ai_logger.shutdown()
+
+    def test_segments(self, tmp_path):
+        """Segments rotate by size, are capped on disk, and survive a restart"""
+        spool = LogSpool(str(tmp_path), segment_bytes=100, max_bytes=450)
+        for i in range(12):
+            spool.append([{"prompt": f"entry-{i:02d}", "pad": "x" * 20}])
+
+        assert len(list(tmp_path.glob("*.jsonl"))) == 4
+        assert spool.dropped == 4 and len(spool) == 8
+        assert spool.size_bytes == sum(
+            p.stat().st_size for p in tmp_path.glob("*.jsonl")
+        )
+
+        restarted = LogSpool(str(tmp_path))
+        assert [e["prompt"] for e in restarted.peek(2)] == ["entry-04", "entry-05"]
+        restarted.ack(2)
+        assert restarted.peek(1)[0]["prompt"] == "entry-06"
+
+    def test_shutdown_spools_unsent(self, tmp_path):
+        """Entries that couldn't be uploaded at shutdown are sent by the next logger"""
+        ai_logger = make_logger([], status=503, spool_dir=str(tmp_path))
+        ai_logger.log_ai_call({"service": "openai", "prompt": "survivor"})
+        ai_logger.shutdown()
+
+        posts = []
+        successor = make_logger(posts, spool_dir=str(tmp_path))
+        successor.flush()
+
+        assert b"survivor" in posts[0][1]
+        successor.shutdown()
+
+
+class TestDurable:
+    """Test the write-ahead log of durable mode"""
+
+    def test_crash_recovery(self, tmp_path):
+        """Entries logged before a crash are uploaded by the next logger, with their requestIds"""
+        crashed = make_logger([], status=503, wal_dir=str(tmp_path))
+        crashed.log_ai_call({"service": "openai", "prompt": "a", "requestId": "req-a"})
+        crashed.log_ai_call({"service": "openai", "prompt": "b"})
+        assert crashed.get_buffer_size() == 0
+        assert crashed.stats()["spool_pending"] == 2
+
+        sent = []
+
+        def handler(request):
+            sent.extend(json.loads(body(request))["logs"])
+            return httpx.Response(200, json={})
+
+        successor = AILogger(api_key="test_key", flush_interval=60.0, wal_dir=str(tmp_path))
+        successor.client = httpx.Client(
+            base_url="https://api.test", transport=httpx.MockTransport(handler)
+        )
+        successor.flush()
+
+        assert [e["prompt"] for e in sent] == ["a", "b"]
+        assert sent[0]["requestId"] == "req-a" and sent[1]["requestId"]
+        assert successor.stats()["spool_pending"] == 0
+        assert not list(tmp_path.glob("*.jsonl"))
+        successor.shutdown()
+        crashed.clear_buffer()
+
+    def test_checkpoint(self, tmp_path):
+        """Acknowledged entries are not resent after a restart"""
+        wal = WriteAheadLog(str(tmp_path), sync_every=2)
+        wal.append([{"prompt": f"p{i}"} for i in range(5)])
+        assert [e["prompt"] for e in wal.peek(2)] == ["p0", "p1"]
+        wal.ack(2)
+
+        restarted = WriteAheadLog(str(tmp_path))
+        assert len(restarted) == 3
+        assert [e["prompt"] for e in restarted.peek(10)] == ["p2", "p3", "p4"]
+        restarted.ack(3)
+        assert not list(tmp_path.iterdir())
+
+    def test_worker_uploads_from_log(self, tmp_path):
+        """A full batch in the log wakes the worker"""
+        posts = []
+        ai_logger = make_logger(posts, batch_size=5, wal_dir=str(tmp_path))
+        for i in range(10):
+            ai_logger.log_ai_call({"service": "openai", "prompt": f"p{i}"})
+
+        assert wait_until(lambda: ai_logger.stats()["flushed"] == 10)
+        assert {name for name, _ in posts} == {"cost-katana-ai-logger"}
+        ai_logger.shutdown()
+
+    def test_configured_through_ai(self, tmp_path):
+        """ck.ai() logs through the configured client's logger, so its WAL applies"""
+        client = ck.configure(api_key="test_key", ai_logging_wal_dir=str(tmp_path))
+        client.client = httpx.Client(
+            base_url="https://api.test",
+            transport=httpx.MockTransport(
+                lambda request: httpx.Response(
+                    200, json={"data": {"response": "ok", "cost": 0.01}}
+                )
+            ),
+        )
+        client.ai_logger.client = httpx.Client(
+            base_url="https://api.test", transport=recording_transport([], status=503)
+        )
+
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", DeprecationWarning)
+            ck.ai("nova-lite", "hello")
+
+        assert client.ai_logger.durable
+        assert ck.get_global_async_client().ai_logger is client.ai_logger
+        assert client.ai_logger.stats()["spool_pending"] == 1
+        assert list(tmp_path.glob("*.jsonl"))
+        client.ai_logger.shutdown()
+
+
+class TestUploads:
+    """Test upload compression and byte-budgeted batches"""
+
+    def test_gzip(self):
+        """compression="gzip" gzips bodies and the saving is reported"""
+        requests = []
+
+        def handler(request):
+            requests.append(request)
+            return httpx.Response(200, json={})
+
+        ai_logger = AILogger(api_key="test_key", flush_interval=60.0, compression="gzip")
+        ai_logger.client = httpx.Client(
+            base_url="https://api.test", transport=httpx.MockTransport(handler)
+        )
+        for i in range(20):
+            ai_logger.log_ai_call({"service": "openai", "prompt": "same prompt " * 20})
+        ai_logger.flush()
+
+        assert requests[0].headers["Content-Encoding"] == "gzip"
+        assert len(json.loads(body(requests[0]))["logs"]) == 20
+        stats = ai_logger.stats()
+        assert stats["bytes_sent"] == len(requests[0].read())
+        assert stats["bytes_uncompressed"] > stats["bytes_sent"]
+        assert stats["compression_ratio"] > 3
+        ai_logger.shutdown()
+
+    def test_uncompressed(self):
+        """Bodies are sent uncompressed by default"""
+        requests = []
+
+        def handler(request):
+            requests.append(request)
+            return httpx.Response(200, json={})
+
+        ai_logger = AILogger(api_key="test_key", flush_interval=60.0)
+        ai_logger.client = httpx.Client(
+            base_url="https://api.test", transport=httpx.MockTransport(handler)
+        )
+        ai_logger.log_ai_call({"service": "openai", "prompt": "plain"})
+        ai_logger.flush()
+
+        assert "Content-Encoding" not in requests[0].headers
+        assert json.loads(requests[0].read())["logs"][0]["prompt"] == "plain"
+        assert ai_logger.stats()["compression_ratio"] == 1.0
+        ai_logger.shutdown()
+
+    def test_zstd_falls_back_to_gzip(self):
+        """Without the zstandard package zstd means gzip"""
+        ai_logger = offline_logger(compression="zstd")
+        try:
+            import zstandard  # noqa: F401
+
+            assert ai_logger.config["compression"] == "zstd"
+        except ImportError:
+            assert ai_logger.config["compression"] == "gzip"
+        with pytest.raises(ValueError):
+            offline_logger(compression="brotli")
+
+    def test_byte_budget(self):
+        """Batches are cut by max_batch_bytes before batch_size"""
+        posts = []
+        ai_logger = make_logger(posts, batch_size=50, max_batch_bytes=1000)
+        for i in range(10):
+            ai_logger.log_ai_call({"service": "openai", "prompt": f"{i}" + "x" * 200})
+        ai_logger.flush()
+
+        batches = [json.loads(raw)["logs"] for _, raw in posts]
+        assert len(batches) > 1
+        assert sum(len(b) for b in batches) == 10
+        assert all(len(json.dumps(b)) <= 1200 for b in batches)
+        ai_logger.shutdown()
+
+    def test_byte_budget_wakes_worker(self):
+        """A queue holding max_batch_bytes is uploaded without waiting for batch_size"""
+        posts = []
+        ai_logger = make_logger(posts, batch_size=1000, max_batch_bytes=500)
+        for i in range(5):
+            ai_logger.log_ai_call({"service": "openai", "prompt": "x" * 200})
+
+        assert wait_until(lambda: ai_logger.stats()["flushed"] >= 2)
+        ai_logger.shutdown()
+
+
+class TestPreparation:
+    """Test that entries are enriched by the worker, not the caller"""
+
+    def test_raw_until_flush(self):
+        """The queue holds the raw entry; the upload is redacted and truncated"""
+        posts = []
+        ai_logger = make_logger(posts, max_prompt_length=40)
+        secret = "api_key: sk1234567890abcdef " + "x" * 100
+        ai_logger.log_ai_call({"service": "openai", "prompt": secret})
+
+        queued = ai_logger.log_buffer[0]
+        assert queued["prompt"] == secret and "requestId" not in queued
+
+        ai_logger.flush()
+        sent = json.loads(posts[0][1])["logs"][0]
+        assert len(sent["prompt"]) == 40 and "sk1234567890abcdef" not in sent["prompt"]
+        assert sent["requestId"] and sent["logLevel"] == "INFO"
+        ai_logger.shutdown()
+
+    def test_retry_keeps_request_id(self):
+        """A failed batch is retried with the requestIds it was first sent with"""
+        posts = []
+        ai_logger = make_logger(posts, status=503)
+        ai_logger.log_ai_call({"service": "openai", "prompt": "retry me"})
+        ai_logger.flush()
+        ai_logger.flush()
+
+        ids = [json.loads(raw)["logs"][0]["requestId"] for _, raw in posts]
+        assert len(ids) == 2 and ids[0] == ids[1]
+        ai_logger.clear_buffer()
+        ai_logger.shutdown()
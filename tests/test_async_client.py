@@ -0,0 +1,126 @@
+"""
+Tests for the asyncio client
+"""
+
+import asyncio
+import json
+import warnings
+
+import httpx
+import pytest
+
+import cost_katana as ck
+from cost_katana.async_client import AsyncCostKatanaClient
+from cost_katana.exceptions import RateLimitError
+
+
+def make_handler(seen):
+    def handler(request):
+        seen.append(f"{request.method} {request.url.path}")
+        if request.url.path == "/api/chat/models":
+            return httpx.Response(200, json={"data": [{"id": "amazon.nova-lite-v1:0"}]})
+        if request.url.path == "/api/chat/conversations":
+            return httpx.Response(200, json={"data": {"id": "conv-1"}})
+        if request.url.path == "/api/chat/message":
+            return httpx.Response(
+                200,
+                json={"data": {"response": "hi", "cost": 0.002, "tokenCount": 4}},
+            )
+        return httpx.Response(429, json={"message": "slow down"})
+    return handler
+
+
+def use_transport(client, seen):
+    client.client = httpx.AsyncClient(
+        base_url="https://api.test", transport=httpx.MockTransport(make_handler(seen))
+    )
+
+
+class TestAsyncClient:
+    """Test AsyncCostKatanaClient request methods"""
+
+    def test_send_message(self):
+        """Messages are posted and decoded like the sync client"""
+        seen = []
+        client = AsyncCostKatanaClient(api_key="test_key")
+        use_transport(client, seen)
+
+        data = asyncio.run(client.send_message("Hello", model_id="amazon.nova-lite-v1:0"))
+
+        assert data["data"]["response"] == "hi"
+        assert seen == ["POST /api/chat/message"]
+
+    def test_error_mapping(self):
+        """HTTP errors map to the same exception classes"""
+        client = AsyncCostKatanaClient(api_key="test_key", max_retries=0)
+        use_transport(client, [])
+
+        with pytest.raises(RateLimitError):
+            asyncio.run(client.get_gateway_security_summary())
+
+    def test_concurrent_requests(self):
+        """One event loop drives many requests"""
+        seen = []
+        client = AsyncCostKatanaClient(api_key="test_key")
+        use_transport(client, seen)
+
+        async def run():
+            return await asyncio.gather(
+                *(client.send_message(f"q{i}", model_id="m") for i in range(50))
+            )
+
+        results = asyncio.run(run())
+        assert len(results) == 50
+        assert len(seen) == 50
+
+
+class TestAsyncSimpleAPI:
+    """Test ck.aai() and ck.achat()"""
+
+    def test_aai_and_achat(self):
+        """aai returns a SimpleResponse and achat keeps totals"""
+        seen = []
+        ck.configure(api_key="test_key")
+        use_transport(ck.get_global_async_client(), seen)
+
+        async def run():
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", DeprecationWarning)
+                response = await ck.aai("nova-lite", "Hello", enable_ai_logging=False)
+                session = ck.achat("nova-lite")
+            reply = await session.send("Hi")
+            return response, session, reply
+
+        response, session, reply = asyncio.run(run())
+
+        assert response.text == "hi"
+        assert response.cost == 0.002
+        assert reply == "hi"
+        assert session.total_cost == 0.002
+        assert seen.count("GET /api/chat/models") == 1
+        assert "POST /api/chat/conversations" in seen
+
+    def test_achat_system_message(self):
+        """achat sends its system message with every turn"""
+        bodies = []
+        handler = make_handler([])
+
+        def recording(request):
+            if request.url.path == "/api/chat/message":
+                bodies.append(json.loads(request.read()))
+            return handler(request)
+
+        ck.configure(api_key="test_key")
+        ck.get_global_async_client().client = httpx.AsyncClient(
+            base_url="https://api.test", transport=httpx.MockTransport(recording)
+        )
+
+        async def run():
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", DeprecationWarning)
+                session = ck.achat("nova-lite", system_message="Be brief")
+            await session.send("Hi")
+
+        asyncio.run(run())
+
+        assert bodies[0]["systemMessage"] == "Be brief"
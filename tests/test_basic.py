@@ -49,12 +49,12 @@ class TestClient:
 class TestModels:
     """Test model interface"""
     
-    @patch('cost_katana.client.CostKatanaClient.get_available_models')
+    @patch('cost_katana.client.CostKatanaClient._fetch_model_catalog')
     @patch('cost_katana.client.CostKatanaClient.send_message')
     def test_generate_content(self, mock_send, mock_models):
         """Test content generation"""
         # Setup mocks
-        mock_models.return_value = [{"id": "nova-lite", "name": "Nova Lite"}]
+        mock_models.return_value = ([{"id": "nova-lite", "name": "Nova Lite"}], None)
         mock_send.return_value = {
             "success": True,
             "data": {
@@ -84,6 +84,64 @@ class TestModels:
         assert call_args['model_id'] == "amazon.nova-lite-v1:0"
 
 
+class TestModelCache:
+    """Test GenerativeModel memoization"""
+
+    @patch('cost_katana.client.CostKatanaClient._fetch_model_catalog')
+    def test_model_validated_once(self, mock_models):
+        """Repeated lookups reuse the validated model"""
+        mock_models.return_value = ([{"id": "amazon.nova-lite-v1:0"}], None)
+        ck.configure(api_key="test_key")
+
+        first = ck.create_generative_model('nova-lite')
+        second = ck.create_generative_model('nova-lite')
+
+        assert first is second
+        assert mock_models.call_count == 1
+
+    @patch('cost_katana.client.CostKatanaClient._fetch_model_catalog')
+    def test_cache_keyed_on_config(self, mock_models):
+        """Different generation settings get separate models"""
+        mock_models.return_value = ([{"id": "amazon.nova-lite-v1:0"}], None)
+        ck.configure(api_key="test_key")
+
+        default = ck.create_generative_model('nova-lite')
+        tuned = ck.create_generative_model('nova-lite', temperature=0.0)
+
+        assert default is not tuned
+
+    @patch('cost_katana.client.CostKatanaClient._fetch_model_catalog')
+    def test_cache_is_bounded(self, mock_models):
+        """Least recently used models are evicted"""
+        from cost_katana.models import _ModelCache
+
+        mock_models.return_value = ([{"id": "a"}, {"id": "b"}, {"id": "c"}], None)
+        client = CostKatanaClient(api_key="test_key")
+        cache = _ModelCache(max_size=2)
+
+        for name in ("a", "b", "c"):
+            cache.get_or_create(client, name)
+
+        assert len(cache) == 2
+
+    @patch('cost_katana.client.CostKatanaClient._fetch_model_catalog')
+    def test_cache_scoped_per_client(self, mock_models):
+        """Handles are never shared across clients and go with a replaced client"""
+        import gc
+        import weakref
+
+        mock_models.return_value = ([{"id": "amazon.nova-lite-v1:0"}], None)
+        first = ck.configure(api_key="test_key")
+        model = ck.create_generative_model('nova-lite')
+        second = ck.configure(api_key="test_key")
+
+        assert ck.create_generative_model('nova-lite').client is second
+        ref = weakref.ref(first)
+        del first, model
+        gc.collect()
+        assert ref() is None
+
+
 class TestExceptions:
     """Test error handling"""
     
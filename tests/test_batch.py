@@ -0,0 +1,85 @@
+"""
+Tests for batch execution
+"""
+
+import json
+import threading
+import warnings
+
+import httpx
+
+import cost_katana as ck
+from cost_katana.client import CostKatanaClient
+
+
+def make_handler(fail_on=None):
+    in_flight = {"now": 0, "max": 0}
+    lock = threading.Lock()
+
+    def handler(request):
+        if request.url.path == "/api/chat/models":
+            return httpx.Response(200, json={"data": [{"id": "amazon.nova-lite-v1:0"}]})
+        message = json.loads(request.read())["message"]
+        with lock:
+            in_flight["now"] += 1
+            in_flight["max"] = max(in_flight["max"], in_flight["now"])
+        try:
+            if fail_on and fail_on in message:
+                return httpx.Response(400, json={"message": "bad prompt"})
+            return httpx.Response(
+                200, json={"data": {"response": message.upper(), "cost": 0.01, "tokenCount": 5}}
+            )
+        finally:
+            with lock:
+                in_flight["now"] -= 1
+
+    return handler, in_flight
+
+
+class TestSendMessages:
+    """Test CostKatanaClient.send_messages"""
+
+    def test_ordered_results_and_errors(self):
+        """Results keep input order; failures are captured per item"""
+        handler, in_flight = make_handler(fail_on="bad")
+        client = CostKatanaClient(api_key="test_key")
+        client.client = httpx.Client(
+            base_url="https://api.test", transport=httpx.MockTransport(handler)
+        )
+        progress = []
+
+        batch = client.send_messages(
+            ["a", "bad", "c", "d"],
+            model_id="m",
+            concurrency=2,
+            progress=lambda done, total: progress.append((done, total)),
+        )
+
+        assert batch.succeeded == 3
+        assert batch.results[1] is None
+        assert isinstance(batch.errors[1], ck.CostKatanaError)
+        assert abs(batch.total_cost - 0.03) < 1e-9
+        assert batch.total_tokens == 15
+        assert progress[-1] == (4, 4)
+        assert in_flight["max"] <= 2
+
+
+class TestAiBatch:
+    """Test ck.ai_batch"""
+
+    def test_simple_responses(self):
+        """Each item is a SimpleResponse"""
+        handler, _ = make_handler()
+        client = ck.configure(api_key="test_key")
+        client.client = httpx.Client(
+            base_url="https://api.test", transport=httpx.MockTransport(handler)
+        )
+
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", DeprecationWarning)
+            batch = ck.ai_batch("nova-lite", ["x", "y", "z"], concurrency=3, enable_ai_logging=False)
+
+        assert [r.text for r in batch] == ["X", "Y", "Z"]
+        assert isinstance(batch[0], ck.SimpleResponse)
+        assert batch.summary()["succeeded"] == 3
+        assert batch.throughput > 0
@@ -0,0 +1,150 @@
+"""
+Tests for the local cost budget
+"""
+
+import time
+
+import httpx
+import pytest
+
+from cost_katana.budget import (
+    CostBudget,
+    FileSpendStore,
+    MemorySpendStore,
+    estimate_cost,
+)
+from cost_katana.client import CostKatanaClient
+from cost_katana.exceptions import CostLimitExceededError, ServerError
+
+
+def gateway(calls, cost=0.02, status=200):
+    def handler(request):
+        calls.append(request)
+        if status != 200:
+            return httpx.Response(status, json={"message": "down"})
+        data = {"response": "ok", "cost": cost, "tokenCount": 10}
+        return httpx.Response(200, json={"data": data})
+
+    return handler
+
+
+def make_client(handler, **kwargs):
+    client = CostKatanaClient(
+        api_key="test_key", max_retries=0, enable_failover=False, **kwargs
+    )
+    client.client = httpx.Client(
+        base_url="https://api.test", transport=httpx.MockTransport(handler)
+    )
+    return client
+
+
+class TestEstimates:
+    """Test pre-send cost estimates"""
+
+    def test_pricing_lookup(self):
+        """The longest matching fragment of the model id picks the price"""
+        mini = estimate_cost("openai/gpt-4o-mini", "x" * 400, 1000)
+        full = estimate_cost("gpt-4o", "x" * 400, 1000)
+        assert mini == pytest.approx((101 * 0.15 + 1000 * 0.60) / 1e6)
+        assert full == pytest.approx((101 * 2.50 + 1000 * 10.0) / 1e6)
+        assert estimate_cost("unknown-model", "hi", 100) is None
+        assert estimate_cost("my-model", "", 1000, {"my-model": [0, 5.0]}) == 0.005
+
+
+class TestCostBudget:
+    """Test the ledger and reservations"""
+
+    def test_reservations(self):
+        """In-flight estimates count against the daily budget until settled"""
+        budget = CostBudget(per_day=0.05)
+        first = budget.reserve("m", 0.03)
+        with pytest.raises(CostLimitExceededError) as exc:
+            budget.reserve("m", 0.03)
+        assert exc.value.limit == 0.05 and exc.value.spent == pytest.approx(0.03)
+
+        first.settle(0.01)
+        budget.reserve("m", 0.03).release()
+        stats = budget.stats()
+        assert stats["spent"] == pytest.approx(0.01) and stats["reserved"] == 0
+        assert stats["rejected"] == 1
+
+    def test_rolling_window(self):
+        """Spend older than the window no longer counts"""
+        store = MemorySpendStore()
+        budget = CostBudget(per_day=1.0, window=60, store=store)
+        store.add(0.9, time.time() - 120)
+        store.add(0.2, time.time())
+        assert budget.spent() == pytest.approx(0.2)
+        assert budget.remaining() == pytest.approx(0.8)
+
+    def test_file_store_shared(self, tmp_path):
+        """Processes sharing a ledger file see each other's spend"""
+        path = str(tmp_path / "ledger")
+        a = CostBudget(per_day=0.05, store=FileSpendStore(path))
+        b = CostBudget(per_day=0.05, store=FileSpendStore(path))
+
+        a.record(0.04)
+        assert b.spent() == pytest.approx(0.04)
+        with pytest.raises(CostLimitExceededError):
+            b.reserve("m", 0.02)
+
+    def test_file_store_compaction(self, tmp_path):
+        """Compaction drops entries outside the window and keeps the rest"""
+        path = tmp_path / "ledger"
+        store = FileSpendStore(str(path), compact_every=3)
+        now = time.time()
+        store.total(now - 60)
+        store.add(1.0, now - 120)
+        store.add(0.1, now)
+        store.add(0.2, now)
+
+        assert len(path.read_text().splitlines()) == 2
+        assert FileSpendStore(str(path)).total(now - 60) == pytest.approx(0.3)
+        assert store.total(now - 60) == pytest.approx(0.3)
+
+
+class TestClientBudget:
+    """Test enforcement in send_message"""
+
+    def test_per_request_limit(self):
+        """A request whose estimate exceeds the limit is never sent"""
+        calls = []
+        client = make_client(gateway(calls), cost_limit_per_request=0.001)
+
+        with pytest.raises(CostLimitExceededError) as exc:
+            client.send_message("hello", model_id="gpt-4o", max_tokens=2000)
+        assert exc.value.estimated_cost > 0.001
+        assert calls == []
+
+        client.send_message("hello", model_id="gpt-4o", max_tokens=50)
+        assert len(calls) == 1
+
+    def test_per_day_limit(self):
+        """Reported costs add up until the daily budget is used"""
+        calls = []
+        client = make_client(gateway(calls, cost=0.02), cost_limit_per_day=0.05)
+
+        for _ in range(3):
+            client.send_message("hi", model_id="unpriced-model")
+        with pytest.raises(CostLimitExceededError):
+            client.send_message("hi", model_id="unpriced-model")
+
+        assert len(calls) == 3
+        assert client.budget_stats()["spent"] == pytest.approx(0.06)
+
+    def test_failed_request_released(self):
+        """A failed request gives its reservation back"""
+        calls = []
+        client = make_client(
+            gateway(calls, status=503), cost_limit_per_day=0.05, circuit_breaker_enabled=False
+        )
+
+        with pytest.raises(ServerError):
+            client.send_message("hi", model_id="gpt-4o-mini")
+        stats = client.budget_stats()
+        assert stats["reserved"] == 0 and stats["spent"] == 0
+
+    def test_disabled_without_limits(self):
+        """No limits configured, no budget"""
+        client = make_client(gateway([]))
+        assert client.cost_budget is None and client.budget_stats() == {}
@@ -0,0 +1,217 @@
+"""
+Tests for the response cache
+"""
+
+import json
+import threading
+import time
+import warnings
+
+import httpx
+
+import cost_katana as ck
+from cost_katana.cache import (
+    DiskResponseCache,
+    ResponseCache,
+    is_cacheable,
+    response_cache_key,
+)
+from cost_katana.config import Config
+
+
+def make_handler(seen):
+    def handler(request):
+        if request.url.path == "/api/chat/models":
+            return httpx.Response(200, json={"data": [{"id": "amazon.nova-lite-v1:0"}]})
+        body = json.loads(request.read())
+        seen.append(body)
+        return httpx.Response(
+            200,
+            json={"data": {"response": body["message"].upper(), "cost": 0.01, "tokenCount": 5}},
+        )
+
+    return handler
+
+
+class TestResponseCache:
+    """Test ResponseCache bookkeeping"""
+
+    def test_lru_eviction(self):
+        """The least recently used entry is evicted first"""
+        cache = ResponseCache(max_entries=2)
+        cache.set("a", {"data": 1})
+        cache.set("b", {"data": 2})
+        assert cache.get("a") == {"data": 1}
+        cache.set("c", {"data": 3})
+
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        stats = cache.stats()
+        assert stats["evictions"] == 1
+        assert stats["hits"] == 2
+        assert stats["misses"] == 1
+
+    def test_byte_budget(self):
+        """Entries are evicted to stay under max_bytes; oversized values are refused"""
+        cache = ResponseCache(max_entries=100, max_bytes=60)
+        cache.set("a", {"data": "x" * 20})
+        cache.set("b", {"data": "y" * 20})
+        assert len(cache) == 1
+        assert cache.stats()["bytes"] <= 60
+        assert cache.set("big", {"data": "z" * 100}) is False
+
+    def test_ttl(self):
+        """Expired entries are misses"""
+        cache = ResponseCache(ttl=0.01)
+        cache.set("a", {"data": 1})
+        cache.set("b", {"data": 2}, ttl=60)
+        time.sleep(0.02)
+        assert cache.get("a") is None
+        assert cache.get("b") == {"data": 2}
+        assert cache.stats()["expirations"] == 1
+
+    def test_hits_are_copies(self):
+        """Mutating a returned response does not change the cached one"""
+        cache = ResponseCache()
+        cache.set("a", {"data": {"response": "hi"}})
+        cache.get("a")["data"]["response"] = "changed"
+        assert cache.get("a") == {"data": {"response": "hi"}}
+
+    def test_key_and_cacheability(self):
+        """Keys ignore parameter order; only deterministic requests are cacheable"""
+        key1 = response_cache_key("s", "m", "p", {"temperature": 0, "max_tokens": 10})
+        key2 = response_cache_key("s", "m", "p", {"max_tokens": 10, "temperature": 0})
+        assert key1 == key2
+        assert key1 != response_cache_key("s", "m", "p2", {"temperature": 0})
+
+        assert is_cacheable({"temperature": 0})
+        assert not is_cacheable({"temperature": 0.7})
+        assert is_cacheable({"temperature": 0.7, "cache": True})
+        assert not is_cacheable({"temperature": 0, "cache": False})
+        assert not is_cacheable({"temperature": 0, "conversation_id": "c"})
+
+
+class TestDiskResponseCache:
+    """Test the shared SQLite tier"""
+
+    def test_shared_between_instances(self, tmp_path):
+        """A second process (connection) sees entries written by the first"""
+        path = str(tmp_path / "responses.db")
+        writer = ResponseCache(disk=DiskResponseCache(path))
+        writer.set("k", {"data": {"response": "hi"}})
+
+        reader = ResponseCache(disk=DiskResponseCache(path))
+        assert reader.get("k") == {"data": {"response": "hi"}}
+        assert reader.get("k") is not None
+        stats = reader.stats()
+        assert stats["disk_hits"] == 1  # second lookup was served from memory
+        assert stats["disk"]["entries"] == 1
+
+    def test_size_eviction_and_ttl(self, tmp_path):
+        """The byte budget evicts least recently read rows; expired rows are misses"""
+        disk = DiskResponseCache(str(tmp_path / "responses.db"), max_bytes=1000)
+        for i in range(20):
+            disk.set(f"k{i}", b"x" * 100)
+        stats = disk.stats()
+        assert stats["bytes"] <= 1000
+        assert stats["evictions"] >= 10
+        assert disk.get("k0") is None
+        assert disk.get("k19") is not None
+
+        disk.set("short", b"y", ttl=0.01)
+        time.sleep(0.02)
+        assert disk.get("short") is None
+
+        disk.set("gone", b"z", ttl=0.01)
+        time.sleep(0.02)
+        disk.compact()
+        assert disk.stats()["expirations"] == 2
+
+    def test_touch_throttled(self, tmp_path):
+        """Hits only rewrite accessed_at once it is touch_interval old"""
+        disk = DiskResponseCache(str(tmp_path / "responses.db"), touch_interval=60)
+        disk.set("k", b"v")
+        with disk._conn:
+            disk._conn.execute("UPDATE responses SET accessed_at = 0")
+        before = disk._conn.total_changes
+        assert disk.get("k") is not None
+        assert disk._conn.total_changes == before + 1
+        assert disk.get("k") is not None
+        assert disk._conn.total_changes == before + 1
+
+    def test_disk_errors_on_invalidate(self, tmp_path):
+        """invalidate()/clear() survive a failing disk tier"""
+        cache = ResponseCache(disk=DiskResponseCache(str(tmp_path / "responses.db")))
+        cache.set("k", {"data": {"response": "hi"}})
+        cache.disk._conn.close()
+        cache.invalidate("k")
+        cache.clear()
+        assert cache.get("k") is None
+
+    def test_concurrent_writers(self, tmp_path):
+        """Connections on separate threads can write the same file concurrently"""
+        path = str(tmp_path / "responses.db")
+
+        def work(n):
+            disk = DiskResponseCache(path)
+            for i in range(25):
+                disk.set(f"{n}-{i}", b"v" * 10)
+
+        threads = [threading.Thread(target=work, args=(n,)) for n in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert DiskResponseCache(path).stats()["entries"] == 100
+
+    def test_from_config(self, tmp_path):
+        """response_cache_path enables the disk tier"""
+        path = str(tmp_path / "responses.db")
+        client = ck.CostKatanaClient(
+            config=Config(api_key="test_key", response_cache_path=path)
+        )
+        assert isinstance(client.response_cache.disk, DiskResponseCache)
+
+
+class TestAiCaching:
+    """Test ai() / generate_content cache integration"""
+
+    def setup_client(self, seen):
+        client = ck.configure(api_key="test_key")
+        client.client = httpx.Client(
+            base_url="https://api.test", transport=httpx.MockTransport(make_handler(seen))
+        )
+        return client
+
+    def call(self, prompt, **options):
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", DeprecationWarning)
+            return ck.ai("nova-lite", prompt, enable_ai_logging=False, **options)
+
+    def test_deterministic_hit(self):
+        """A repeated temperature-0 prompt is served locally"""
+        seen = []
+        client = self.setup_client(seen)
+
+        first = self.call("hello", temperature=0)
+        second = self.call("hello", temperature=0)
+
+        assert len(seen) == 1
+        assert not first.cached
+        assert second.cached
+        assert second.text == "HELLO"
+        assert second.cost == 0.0
+        assert second.saved_amount == 0.01
+        assert client.cache_stats()["hits"] == 1
+
+    def test_non_deterministic_not_cached(self):
+        """Default temperature requests always reach the gateway"""
+        seen = []
+        self.setup_client(seen)
+
+        self.call("hello")
+        self.call("hello")
+        self.call("hello", temperature=0, cache=False)
+        self.call("hello", temperature=0, cache=False)
+
+        assert len(seen) == 4
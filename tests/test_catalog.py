@@ -0,0 +1,133 @@
+"""
+Tests for the model catalog cache
+"""
+
+import asyncio
+
+import httpx
+import pytest
+
+from cost_katana.catalog import AsyncModelCatalog, ModelCatalog
+from cost_katana.client import CostKatanaClient
+
+
+MODELS = [
+    {"id": "amazon.nova-lite-v1:0", "aliases": ["nova-lite"]},
+    {"modelId": "anthropic.claude-3-haiku-20240307-v1:0"},
+]
+
+
+class FakeFetcher:
+    """Records conditional fetches and answers 304 when the ETag matches"""
+
+    def __init__(self, models=None, etag='"v1"'):
+        self.models = models if models is not None else MODELS
+        self.etag = etag
+        self.calls = []
+
+    def __call__(self, etag):
+        self.calls.append(etag)
+        if etag == self.etag:
+            return None, self.etag
+        return self.models, self.etag
+
+
+class TestModelCatalog:
+    """Test TTL, revalidation and lookups"""
+
+    def test_index_lookup(self):
+        """Ids, modelIds and aliases resolve to the same entries"""
+        catalog = ModelCatalog(FakeFetcher())
+
+        assert catalog.find("nova-lite") is catalog.find("amazon.nova-lite-v1:0")
+        assert catalog.find("anthropic.claude-3-haiku-20240307-v1:0") is not None
+        assert catalog.find("missing") is None
+
+    def test_fresh_catalog_is_not_refetched(self):
+        """Lookups within the TTL are served from memory"""
+        fetcher = FakeFetcher()
+        catalog = ModelCatalog(fetcher, ttl=60)
+
+        catalog.get_models()
+        catalog.find("nova-lite")
+
+        assert fetcher.calls == [None]
+
+    def test_revalidation_uses_etag(self):
+        """Expired catalogs are revalidated with If-None-Match"""
+        fetcher = FakeFetcher()
+        catalog = ModelCatalog(fetcher, ttl=0, stale_ttl=0)
+
+        catalog.get_models()
+        models = catalog.get_models()
+
+        assert fetcher.calls == [None, '"v1"']
+        assert len(models) == 2
+
+    def test_stale_while_revalidate(self):
+        """Stale catalogs are served immediately and refreshed in the background"""
+        fetcher = FakeFetcher()
+        catalog = ModelCatalog(fetcher, ttl=0, stale_ttl=60)
+
+        catalog.get_models()
+        assert len(catalog.get_models()) == 2
+        catalog._refresh_thread.join(timeout=5)
+
+        assert fetcher.calls == [None, '"v1"']
+
+    def test_persistence(self, tmp_path):
+        """A new catalog starts from the persisted copy without blocking"""
+        path = tmp_path / "catalog.json"
+        ModelCatalog(FakeFetcher(), persist_path=str(path), scope="a").get_models()
+
+        fetcher = FakeFetcher()
+        warm = ModelCatalog(fetcher, ttl=60, persist_path=str(path), scope="a")
+        assert warm.find("nova-lite") is not None
+        assert fetcher.calls == []
+
+        other = ModelCatalog(fetcher, persist_path=str(path), scope="b")
+        other.get_models()
+        assert fetcher.calls == [None]
+
+    def test_async_persistence(self, tmp_path):
+        """The async catalog reads and writes the same file, off the event loop"""
+        path = tmp_path / "catalog.json"
+        fetcher = FakeFetcher()
+
+        async def afetch(etag):
+            return fetcher(etag)
+
+        async def run():
+            cold = AsyncModelCatalog(afetch, persist_path=str(path))
+            await cold.get_models()
+            warm = AsyncModelCatalog(afetch, ttl=60, persist_path=str(path))
+            return await warm.find("nova-lite")
+
+        assert asyncio.run(run()) is not None
+        assert fetcher.calls == [None]
+        assert ModelCatalog(fetcher, ttl=60, persist_path=str(path)).find("nova-lite")
+        assert fetcher.calls == [None]
+
+
+class TestClientCatalog:
+    """Test the client's conditional catalog fetch"""
+
+    def test_not_modified(self):
+        """A 304 keeps the cached catalog"""
+        seen = []
+
+        def handler(request):
+            seen.append(request.headers.get("If-None-Match"))
+            if request.headers.get("If-None-Match") == '"v1"':
+                return httpx.Response(304)
+            return httpx.Response(200, json={"data": MODELS}, headers={"ETag": '"v1"'})
+
+        client = CostKatanaClient(api_key="test_key", model_catalog_ttl=0, model_catalog_stale_ttl=0)
+        client.client = httpx.Client(
+            base_url="https://api.test", transport=httpx.MockTransport(handler)
+        )
+
+        assert len(client.get_available_models()) == 2
+        assert len(client.get_available_models()) == 2
+        assert seen == [None, '"v1"']
+        assert client.find_model("nova-lite")["id"] == "amazon.nova-lite-v1:0"
@@ -0,0 +1,207 @@
+"""
+Tests for the per model / endpoint circuit breaker
+"""
+
+import asyncio
+import json
+import time
+
+import httpx
+import pytest
+
+from cost_katana.async_client import AsyncCostKatanaClient
+from cost_katana.circuit_breaker import CircuitBreaker
+from cost_katana.client import CostKatanaClient
+from cost_katana.exceptions import (
+    AuthenticationError,
+    CircuitOpenError,
+    CostKatanaError,
+)
+
+ENDPOINT = "/api/chat/message"
+
+
+def call(breaker, model="m1", status=200, error=None, duration=0.0):
+    with breaker.call(model, ENDPOINT) as outcome:
+        if duration:
+            time.sleep(duration)
+        outcome.status = status
+        if error is not None:
+            raise error
+
+
+def failing(breaker, **kwargs):
+    with pytest.raises(Exception):
+        call(breaker, **kwargs)
+
+
+def gateway(failing_models):
+    """Mock gateway that returns 503 for ``failing_models``; records model ids"""
+    seen = []
+
+    def handler(request):
+        model = json.loads(request.read())["modelId"]
+        seen.append(model)
+        if model in failing_models:
+            return httpx.Response(503, json={"message": "upstream unavailable"})
+        data = {"response": model, "cost": 0.01, "tokenCount": 2}
+        return httpx.Response(200, json={"data": data})
+
+    return handler, seen
+
+
+def client_settings(**overrides):
+    settings = dict(
+        api_key="test_key",
+        max_retries=0,
+        coalesce_requests=False,
+        circuit_breaker_minimum_calls=2,
+        circuit_breaker_window_size=2,
+        circuit_breaker_open_duration=60.0,
+        enable_failover=False,
+    )
+    settings.update(overrides)
+    return settings
+
+
+class TestCircuitBreaker:
+    """Test state transitions of a single circuit"""
+
+    def test_opens_on_error_rate(self):
+        """Transport errors and 5xx trip the circuit; while open it fails fast"""
+        breaker = CircuitBreaker(minimum_calls=4, window_size=4, open_duration=30.0)
+        call(breaker)
+        call(breaker)
+        failing(breaker, error=httpx.ConnectError("refused"))
+        assert breaker.state("m1", ENDPOINT) == "closed"
+        call(breaker, status=503)
+
+        assert breaker.state("m1", ENDPOINT) == "open"
+        assert breaker.state("m2", ENDPOINT) == "closed"
+        with pytest.raises(CircuitOpenError) as info:
+            call(breaker)
+        assert info.value.model_id == "m1" and info.value.endpoint == ENDPOINT
+        assert 29 < info.value.retry_after <= 30
+        stats = breaker.stats()[f"m1 {ENDPOINT}"]
+        assert (stats["calls"], stats["failures"], stats["rejected"]) == (4, 2, 1)
+
+    def test_client_errors_do_not_count(self):
+        """4xx answers (bad key, unknown model) mean the provider is up"""
+        breaker = CircuitBreaker(minimum_calls=2, window_size=2)
+        call(breaker, status=404)
+        failing(breaker, status=401, error=AuthenticationError("bad key"))
+        assert breaker.state("m1", ENDPOINT) == "closed"
+
+    def test_slow_calls_count(self):
+        """Calls over slow_call_duration trip the circuit even when they succeed"""
+        breaker = CircuitBreaker(
+            slow_call_duration=0.02,
+            slow_call_rate_threshold=1.0,
+            minimum_calls=2,
+            window_size=2,
+        )
+        call(breaker, duration=0.03)
+        call(breaker)
+        assert breaker.state("m1", ENDPOINT) == "closed"
+        call(breaker, duration=0.03)
+        call(breaker, duration=0.03)
+        assert breaker.state("m1", ENDPOINT) == "open"
+
+    def test_half_open_probes(self):
+        """After open_duration a probe goes through: failure reopens, success closes"""
+        breaker = CircuitBreaker(minimum_calls=1, window_size=1, open_duration=0.05)
+        failing(breaker, status=500, error=CostKatanaError("boom"))
+        time.sleep(0.06)
+        assert breaker.state("m1", ENDPOINT) == "half_open"
+
+        failing(breaker, status=502, error=CostKatanaError("boom"))
+        assert breaker.state("m1", ENDPOINT) == "open"
+        time.sleep(0.06)
+
+        with breaker.call("m1", ENDPOINT) as probe:
+            # Only one probe at a time
+            with pytest.raises(CircuitOpenError):
+                call(breaker)
+            probe.status = 200
+        assert breaker.state("m1", ENDPOINT) == "closed"
+
+
+class TestClientIntegration:
+    """Test fast-fail and failover in send_message"""
+
+    def test_fail_fast_without_network(self):
+        """Once open, send_message raises CircuitOpenError without sending"""
+        handler, seen = gateway({"m1"})
+        client = CostKatanaClient(**client_settings())
+        client.client = httpx.Client(
+            base_url="https://api.test", transport=httpx.MockTransport(handler)
+        )
+
+        for _ in range(2):
+            with pytest.raises(CostKatanaError):
+                client.send_message("hi", model_id="m1")
+        with pytest.raises(CircuitOpenError):
+            client.send_message("hi", model_id="m1")
+
+        assert seen == ["m1", "m1"]
+        assert client.circuit_stats()[f"m1 {ENDPOINT}"]["state"] == "open"
+
+    def test_failover_on_open_circuit(self):
+        """With enable_failover an open circuit reroutes along the failover chain"""
+        handler, seen = gateway({"m1"})
+        client = CostKatanaClient(
+            **client_settings(enable_failover=True, failover_chains={"m1": ["backup"]})
+        )
+        client.client = httpx.Client(
+            base_url="https://api.test", transport=httpx.MockTransport(handler)
+        )
+
+        for _ in range(2):
+            client.send_message("hi", model_id="m1")
+        result = client.send_message("hi", model_id="m1")
+
+        # The third call skips m1 without a request
+        assert seen == ["m1", "backup", "m1", "backup", "backup"]
+        assert result["data"]["response"] == "backup"
+        assert result["failover"] == {
+            "from": "m1",
+            "to": "backup",
+            "reason": "circuit_open",
+            "failed": [{"model": "m1", "reason": "circuit_open"}],
+        }
+
+    def test_disabled(self):
+        """circuit_breaker_enabled=False never fails fast"""
+        handler, seen = gateway({"m1"})
+        client = CostKatanaClient(**client_settings(circuit_breaker_enabled=False))
+        client.client = httpx.Client(
+            base_url="https://api.test", transport=httpx.MockTransport(handler)
+        )
+
+        for _ in range(4):
+            with pytest.raises(CostKatanaError) as info:
+                client.send_message("hi", model_id="m1")
+            assert not isinstance(info.value, CircuitOpenError)
+        assert len(seen) == 4 and client.circuit_stats() == {}
+
+    def test_async_client(self):
+        """AsyncCostKatanaClient shares the same fast-fail and failover behavior"""
+        handler, seen = gateway({"m1"})
+        client = AsyncCostKatanaClient(
+            **client_settings(enable_failover=True, failover_chains={"m1": ["backup"]})
+        )
+
+        async def run():
+            client.client = httpx.AsyncClient(
+                base_url="https://api.test", transport=httpx.MockTransport(handler)
+            )
+            try:
+                for _ in range(2):
+                    await client.send_message("hi", model_id="m1")
+                return await client.send_message("hi", model_id="m1")
+            finally:
+                await client.client.aclose()
+
+        result = asyncio.run(run())
+        assert seen == ["m1", "backup", "m1", "backup", "backup"]
+        assert result["failover"]["reason"] == "circuit_open"
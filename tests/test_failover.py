@@ -0,0 +1,215 @@
+"""
+Tests for model failover chains
+"""
+
+import json
+import warnings
+
+import httpx
+import pytest
+
+import cost_katana as ck
+from cost_katana.client import CostKatanaClient
+from cost_katana.config import Config
+from cost_katana.exceptions import (
+    AuthenticationError,
+    ModelNotAvailableError,
+    ModelTimeoutError,
+)
+from cost_katana.failover import FailoverPolicy
+from cost_katana.metrics import COST, metrics_registry
+from cost_katana.models_constants import anthropic, openai
+
+
+def gateway(behaviors):
+    """Mock gateway; ``behaviors`` maps a model id to a status or an exception"""
+    seen = []
+
+    def handler(request):
+        if request.method == "GET":
+            return httpx.Response(200, json={"data": [{"id": "amazon.nova-lite-v1:0"}]})
+        model = json.loads(request.read())["modelId"]
+        seen.append(model)
+        behavior = behaviors.get(model, 200)
+        if isinstance(behavior, Exception):
+            raise behavior
+        if behavior != 200:
+            return httpx.Response(behavior, json={"message": f"{model} failed"})
+        data = {"response": f"from {model}", "cost": 0.02, "tokenCount": 5}
+        return httpx.Response(200, json={"data": data})
+
+    return handler, seen
+
+
+def make_client(handler, **kwargs):
+    kwargs.setdefault("enable_failover", True)
+    client = CostKatanaClient(api_key="test_key", max_retries=0, **kwargs)
+    client.client = httpx.Client(
+        base_url="https://api.test", transport=httpx.MockTransport(handler)
+    )
+    return client
+
+
+class TestFailoverPolicy:
+    """Test how chains are built"""
+
+    def test_explicit_chains(self):
+        """Chains resolve aliases, skip repeats and stop at max_attempts"""
+        config = Config(api_key="k")
+        policy = FailoverPolicy(
+            chains={"nova-pro": ["nova-lite", "nova-pro", "claude-3-haiku", "nova-micro"]},
+            max_attempts=3,
+            resolve=config.get_model_mapping,
+        )
+        assert policy.chain("amazon.nova-pro-v1:0") == [
+            "amazon.nova-pro-v1:0",
+            "amazon.nova-lite-v1:0",
+            "anthropic.claude-3-haiku-20240307-v1:0",
+        ]
+        assert FailoverPolicy(chains={"m": []}, default_model="d").chain("m") == ["m"]
+        assert FailoverPolicy(default_model="d").chain("m") == ["m", "d"]
+        with pytest.raises(ValueError):
+            FailoverPolicy(reasons=["timeout", "bad_request"])
+
+    def test_off_by_default(self):
+        """A default Config builds no policy"""
+        assert CostKatanaClient(api_key="test_key").failover_policy is None
+
+    def test_provider_priorities(self, tmp_path):
+        """The config file's providers block orders fallbacks by priority"""
+        path = tmp_path / "config.json"
+        path.write_text(
+            json.dumps(
+                {
+                    "api_key": "dak_test",
+                    "enable_failover": True,
+                    "failover_max_attempts": 4,
+                    "providers": {
+                        "openai": {"priority": 2, "models": [openai.gpt_4o, openai.gpt_4o_mini]},
+                        "anthropic": {"priority": 1, "models": [anthropic.claude_haiku_4_5]},
+                    },
+                }
+            )
+        )
+        client = CostKatanaClient(config_file=str(path))
+
+        assert client.failover_policy.chain(openai.gpt_4o) == [
+            openai.gpt_4o,
+            anthropic.claude_haiku_4_5,
+            openai.gpt_4o_mini,
+        ]
+        # Unlisted models don't fall back to the default model
+        assert client.failover_policy.chain("other") == ["other"]
+
+
+class TestSendMessageFailover:
+    """Test failover in send_message"""
+
+    @pytest.fixture(autouse=True)
+    def reset_metrics(self):
+        metrics_registry.reset()
+        yield
+        metrics_registry.reset()
+
+    def test_timeout_then_server_error(self):
+        """Each hop is tried in order; the serving model is reported and billed"""
+        handler, seen = gateway({"a": httpx.ReadTimeout("slow"), "b": 502})
+        client = make_client(
+            handler,
+            failover_chains={"a": ["b", "c"]},
+            failover_reasons=["timeout", "server_error"],
+        )
+
+        result = client.send_message("hi", model_id="a")
+
+        assert seen == ["a", "b", "c"]
+        assert result["data"]["response"] == "from c"
+        assert result["failover"] == {
+            "from": "a",
+            "to": "c",
+            "reason": "timeout",
+            "failed": [
+                {"model": "a", "reason": "timeout"},
+                {"model": "b", "reason": "server_error"},
+            ],
+        }
+        assert COST.values() == {("c",): 0.02}
+
+    def test_opt_in_reasons(self):
+        """Timeouts and 404s are raised unless listed in failover_reasons"""
+        handler, seen = gateway({"a": httpx.ReadTimeout("slow"), "b": 404})
+        client = make_client(handler, failover_chains={"a": ["c"], "b": ["c"]})
+
+        with pytest.raises(ModelTimeoutError):
+            client.send_message("hi", model_id="a")
+        with pytest.raises(ModelNotAvailableError):
+            client.send_message("hi", model_id="b")
+        assert seen == ["a", "b"]
+
+    def test_not_in_conversation(self):
+        """A conversation stays on its model"""
+        handler, seen = gateway({"a": 503})
+        client = make_client(handler, failover_chains={"a": ["b"]})
+
+        with pytest.raises(ck.CostKatanaError):
+            client.send_message("hi", model_id="a", conversation_id="conv-1")
+        assert seen == ["a"]
+
+    def test_last_error_raised(self):
+        """When every model fails, the last model's error is raised"""
+        handler, seen = gateway({"a": 503, "b": httpx.ConnectTimeout("down")})
+        client = make_client(handler, failover_chains={"a": ["b"]})
+
+        with pytest.raises(ModelTimeoutError):
+            client.send_message("hi", model_id="a")
+        assert seen == ["a", "b"]
+
+    def test_no_failover_for_client_errors(self):
+        """Errors another model would share (auth, bad request) are raised at once"""
+        handler, seen = gateway({"a": 401})
+        client = make_client(handler, failover_chains={"a": ["b"]})
+
+        with pytest.raises(AuthenticationError):
+            client.send_message("hi", model_id="a")
+        assert seen == ["a"]
+
+    def test_disabled(self):
+        """enable_failover=False sends to the requested model only"""
+        handler, seen = gateway({"a": 503})
+        client = make_client(handler, enable_failover=False, failover_chains={"a": ["b"]})
+
+        with pytest.raises(ck.CostKatanaError):
+            client.send_message("hi", model_id="a")
+        assert seen == ["a"] and client.failover_policy is None
+
+
+class TestAILogging:
+    """Test attribution of failed-over ai() calls"""
+
+    def test_ai_logs_serving_model(self):
+        """ai() reports and logs the fallback model and its provider"""
+        entries = []
+        handler, seen = gateway({"amazon.nova-lite-v1:0": 503})
+        client = ck.configure(
+            api_key="test_key",
+            max_retries=0,
+            enable_failover=True,
+            failover_chains={"nova-lite": ["claude-3-haiku"]},
+        )
+        client.client = httpx.Client(
+            base_url="https://api.test", transport=httpx.MockTransport(handler)
+        )
+        client.ai_logger = type("L", (), {"log_ai_call": entries.append})()
+
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", DeprecationWarning)
+            response = ck.ai("nova-lite", "hello")
+
+        served = "anthropic.claude-3-haiku-20240307-v1:0"
+        assert seen == ["amazon.nova-lite-v1:0", served]
+        assert (response.model, response.requested_model) == (served, "nova-lite")
+        assert response.provider == "anthropic" and response.cost == 0.02
+        assert response.failover["reason"] == "server_error"
+        assert entries[0]["aiModel"] == served and entries[0]["service"] == "anthropic"
+        assert entries[0]["requestedModel"] == "nova-lite"
+        assert entries[0]["cost"] == 0.02
@@ -0,0 +1,173 @@
+"""
+Tests for hedged send_message requests
+"""
+
+import asyncio
+import json
+import threading
+import time
+
+import httpx
+import pytest
+
+from cost_katana.async_client import AsyncCostKatanaClient
+from cost_katana.client import CostKatanaClient
+from cost_katana.hedging import HedgePolicy
+
+
+class _Logger:
+    def __init__(self):
+        self.entries = []
+
+    def log_ai_call(self, entry):
+        self.entries.append(entry)
+
+
+def slow_first(delay, calls):
+    """Handler whose first request takes ``delay`` seconds, the rest are instant"""
+    lock = threading.Lock()
+
+    def handler(request):
+        body = json.loads(request.read())
+        with lock:
+            calls.append(body)
+            first = len(calls) == 1
+        if first:
+            time.sleep(delay)
+        data = {"response": "slow" if first else "fast", "cost": 0.01, "tokenCount": 3}
+        return httpx.Response(200, json={"data": data})
+
+    return handler
+
+
+def make_client(handler, **kwargs):
+    settings = dict(hedge_enabled=True, hedge_delay=0.02, hedge_max_rate=1.0)
+    settings.update(kwargs)
+    client = CostKatanaClient(api_key="test_key", **settings)
+    client.client = httpx.Client(
+        base_url="https://api.test", transport=httpx.MockTransport(handler)
+    )
+    client.ai_logger = _Logger()
+    return client
+
+
+class TestHedgePolicy:
+    """Test hedge delays and the hedge budget"""
+
+    def test_observed_percentile(self):
+        """Without a fixed delay, hedge at the observed percentile once warmed up"""
+        policy = HedgePolicy(percentile=0.9, min_samples=10)
+        for i in range(9):
+            policy.observe("m", (i + 1) / 100)
+        assert policy.hedge_delay("m") is None
+
+        policy.observe("m", 0.10)
+        assert policy.hedge_delay("m") == pytest.approx(0.09)
+        assert policy.hedge_delay("other") is None
+
+    def test_budget(self):
+        """Each call earns max_rate credits; a hedge spends one"""
+        policy = HedgePolicy(delay=0.01, max_rate=0.25)
+        granted = 0
+        for _ in range(20):
+            policy.hedge_delay("m")
+            granted += policy.try_hedge()
+        assert granted == 5
+        assert policy.stats()["over_budget"] == 15
+
+
+class TestSyncHedging:
+    """Test hedging in CostKatanaClient"""
+
+    def test_hedge_wins(self):
+        """A slow primary is raced by a hedge; the loser is logged when it finishes"""
+        calls = []
+        client = make_client(slow_first(0.3, calls))
+
+        started = time.perf_counter()
+        result = client.send_message("hi", model_id="m")
+
+        assert time.perf_counter() - started < 0.2
+        assert result["data"]["response"] == "fast"
+        assert result["hedge"]["winner"] == "hedge" and result["hedge"]["delay"] == 20.0
+        assert len(calls) == 2
+        assert client.hedge_stats()["hedge_wins"] == 1
+
+        deadline = time.monotonic() + 2
+        while not client.ai_logger.entries and time.monotonic() < deadline:
+            time.sleep(0.01)
+        entry = client.ai_logger.entries[0]
+        assert entry["operation"] == "hedge_duplicate" and entry["cost"] == 0.01
+        client.close()
+
+    def test_fast_call_not_hedged(self):
+        """Calls that answer within the delay send nothing extra"""
+        calls = []
+        client = make_client(slow_first(0, calls))
+
+        result = client.send_message("hi", model_id="m")
+
+        assert "hedge" not in result and len(calls) == 1
+        client.close()
+
+    def test_not_in_conversation(self):
+        """A duplicate would append the message to the conversation twice"""
+        calls = []
+        client = make_client(slow_first(0.1, calls))
+
+        result = client.send_message("hi", model_id="m", conversation_id="c1")
+
+        assert "hedge" not in result and len(calls) == 1
+        client.close()
+
+    def test_over_budget(self):
+        """Once the hedge budget is spent, slow calls just wait"""
+        calls = []
+        client = make_client(slow_first(0.1, calls), hedge_max_rate=0.0)
+
+        result = client.send_message("hi", model_id="m")
+
+        assert result["data"]["response"] == "slow" and len(calls) == 1
+        assert client.hedge_stats()["over_budget"] == 1
+        client.close()
+
+
+class TestAsyncHedging:
+    """Test hedging in AsyncCostKatanaClient"""
+
+    def test_loser_cancelled(self):
+        """The slower copy is cancelled as soon as the hedge answers"""
+        calls = []
+        cancelled = []
+
+        async def handler(request):
+            calls.append(request)
+            if len(calls) == 1:
+                try:
+                    await asyncio.sleep(1)
+                except asyncio.CancelledError:
+                    cancelled.append(request)
+                    raise
+            data = {"response": str(len(calls)), "cost": 0.01, "tokenCount": 3}
+            return httpx.Response(200, json={"data": data})
+
+        client = AsyncCostKatanaClient(
+            api_key="test_key", hedge_enabled=True, hedge_delay=0.02, hedge_max_rate=1.0
+        )
+
+        async def run():
+            client.client = httpx.AsyncClient(
+                base_url="https://api.test", transport=httpx.MockTransport(handler)
+            )
+            try:
+                started = time.perf_counter()
+                result = await client.send_message("hi", model_id="m")
+                await asyncio.sleep(0)
+                return result, time.perf_counter() - started
+            finally:
+                await client.client.aclose()
+
+        result, elapsed = asyncio.run(run())
+        assert elapsed < 0.5
+        assert result["hedge"]["winner"] == "hedge"
+        assert len(cancelled) == 1
@@ -0,0 +1,185 @@
+"""
+Tests for the metrics registry and SDK instrumentation
+"""
+
+import json
+import threading
+
+import httpx
+import pytest
+
+from cost_katana.client import CostKatanaClient
+from cost_katana.exceptions import AuthenticationError
+from cost_katana.logging.ai_logger import AILogger
+from cost_katana.metrics import (
+    COST,
+    ERRORS,
+    LOG_FLUSH_DURATION,
+    LOG_QUEUE_DEPTH,
+    REQUEST_DURATION,
+    RETRIES,
+    TEMPLATE_LOOKUPS,
+    TOKENS,
+    MetricsRegistry,
+    metrics_registry,
+    start_metrics_server,
+)
+from cost_katana.templates import TemplateManager
+
+
+@pytest.fixture(autouse=True)
+def reset_metrics():
+    metrics_registry.reset()
+    yield
+    metrics_registry.reset()
+
+
+def make_client(handler):
+    client = CostKatanaClient(api_key="test_key", retry_delay=0.0, max_retries=2)
+    client.client = httpx.Client(
+        base_url="https://api.test", transport=httpx.MockTransport(handler)
+    )
+    return client
+
+
+class TestRegistry:
+    """Test metric types and the Prometheus exposition"""
+
+    def test_prometheus_text(self):
+        """Counters, gauges and histograms render in text format 0.0.4"""
+        registry = MetricsRegistry()
+        requests = registry.counter("app_requests_total", "Requests", ["path"])
+        depth = registry.gauge("app_depth", "Depth")
+        latency = registry.histogram("app_latency_seconds", "Latency", buckets=[0.1, 1])
+
+        requests.inc(2, 'say "hi"\n')
+        depth.set(3)
+        for value in (0.05, 0.1, 0.5, 7):
+            latency.observe(value)
+
+        assert registry.to_prometheus() == (
+            "# HELP app_requests_total Requests\n"
+            "# TYPE app_requests_total counter\n"
+            'app_requests_total{path="say \\"hi\\"\\n"} 2.0\n'
+            "# HELP app_depth Depth\n"
+            "# TYPE app_depth gauge\n"
+            "app_depth 3.0\n"
+            "# HELP app_latency_seconds Latency\n"
+            "# TYPE app_latency_seconds histogram\n"
+            'app_latency_seconds_bucket{le="0.1"} 2.0\n'
+            'app_latency_seconds_bucket{le="1.0"} 3.0\n'
+            'app_latency_seconds_bucket{le="+Inf"} 4.0\n'
+            "app_latency_seconds_sum 7.65\n"
+            "app_latency_seconds_count 4.0\n"
+        )
+
+    def test_threads_do_not_lose_updates(self):
+        """Per-thread shards add up, including shards of finished threads"""
+        registry = MetricsRegistry()
+        counter = registry.counter("app_total", "Total", ["kind"])
+        histogram = registry.histogram("app_seconds", "Seconds")
+
+        def work():
+            for _ in range(5000):
+                counter.inc(1, "a")
+                histogram.observe(0.01)
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        counter.inc(1, "a")
+
+        assert counter.values() == {("a",): 40001}
+        assert registry.snapshot()["app_seconds"]["samples"][0]["count"] == 40000
+
+    def test_label_mismatch(self):
+        """Wrong label counts and re-registration with other labels are errors"""
+        registry = MetricsRegistry()
+        counter = registry.counter("app_total", "Total", ["kind"])
+        with pytest.raises(ValueError):
+            counter.inc(1)
+        assert registry.counter("app_total", "Total", ["kind"]) is counter
+        with pytest.raises(ValueError):
+            registry.counter("app_total", "Total", ["other"])
+
+
+class TestInstrumentation:
+    """Test metrics recorded by the client, AI logger and template manager"""
+
+    def test_send_message(self):
+        """Latency, tokens and cost per model; errors by exception class"""
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            if json.loads(request.read())["message"] == "denied":
+                return httpx.Response(401, json={"message": "bad key"})
+            if len(calls) == 1:
+                return httpx.Response(503, json={})
+            return httpx.Response(200, json={"data": {"response": "ok", "cost": 0.25, "tokenCount": 7}})
+
+        client = make_client(handler)
+        client.send_message("hello", model_id="m1")
+        with pytest.raises(AuthenticationError):
+            client.send_message("denied", model_id="m1")
+
+        latency = REQUEST_DURATION.snapshot()
+        assert [(s["labels"], s["count"]) for s in latency] == [({"model": "m1"}, 1)]
+        assert TOKENS.values() == {("m1",): 7}
+        assert COST.values() == {("m1",): 0.25}
+        assert ERRORS.values() == {("AuthenticationError",): 1}
+        assert RETRIES.values() == {("/api/chat/message",): 1}
+
+    def test_ai_logger(self):
+        """Queue depth is read at collection time; flushes are timed by outcome"""
+        ai_logger = AILogger(api_key="test_key")
+        ai_logger.is_shutting_down = True
+        ai_logger.client = httpx.Client(
+            base_url="https://api.test",
+            transport=httpx.MockTransport(lambda request: httpx.Response(500)),
+        )
+
+        ai_logger.log_ai_call({"service": "openai", "prompt": "hi"})
+        ai_logger.log_ai_call({"service": "openai", "prompt": "there"})
+        assert LOG_QUEUE_DEPTH.values()[()] >= 2
+
+        ai_logger.flush()
+        outcomes = {s["labels"]["outcome"]: s["count"] for s in LOG_FLUSH_DURATION.snapshot()}
+        assert outcomes == {"failure": 1}
+
+    def test_template_lookups(self):
+        """Local, cached and backend lookups are counted separately"""
+        manager = TemplateManager(api_key="test_key")
+        manager.client = httpx.Client(
+            base_url="https://api.test",
+            transport=httpx.MockTransport(
+                lambda request: httpx.Response(200, json={"data": {"id": "remote"}})
+            ),
+        )
+        manager.define_template({"id": "local", "content": "hi"})
+
+        manager.get_template("local")
+        manager.get_template("remote")
+        manager.get_template("remote")
+
+        assert TEMPLATE_LOOKUPS.values() == {("local",): 1, ("backend",): 1, ("cache",): 1}
+
+
+class TestExporter:
+    """Test the scrape endpoint"""
+
+    def test_metrics_endpoint(self):
+        """/metrics serves the registry as Prometheus text"""
+        TOKENS.inc(3, "m1")
+        server = start_metrics_server(port=0)
+        try:
+            url = f"http://127.0.0.1:{server.server_address[1]}"
+            response = httpx.get(f"{url}/metrics")
+            assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+            assert 'costkatana_tokens_total{model="m1"} 3.0' in response.text
+            assert httpx.get(f"{url}/other").status_code == 404
+        finally:
+            server.shutdown()
+            server.server_close()
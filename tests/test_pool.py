@@ -0,0 +1,143 @@
+"""
+Tests for the shared connection pool
+"""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+
+from cost_katana.client import CostKatanaClient
+from cost_katana.config import Config
+from cost_katana.pool import ConnectionPool, shared_connection_pool
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = json.dumps({"data": []}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_POST = do_GET
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+class TestConnectionPool:
+    """Test pool sharing between SDK components"""
+
+    def test_components_share_one_connection(self, server_url):
+        """Client, AI logger and template manager reuse the same keep-alive socket"""
+        pool = ConnectionPool()
+        client = CostKatanaClient(api_key="test_key", base_url=server_url, connection_pool=pool)
+
+        client.client.get("/api/chat/models")
+        client.template_manager.client.get("/api/prompt-templates")
+        client.ai_logger.client.post("/api/ai-logs", json={"logs": []})
+
+        assert pool.stats() == {"connections": 1, "idle": 1, "http2": 0}
+        client.ai_logger.shutdown()
+
+    def test_closing_a_client_keeps_the_pool(self, server_url):
+        """Closing one component's client does not close shared connections"""
+        pool = ConnectionPool()
+        first = CostKatanaClient(api_key="test_key", base_url=server_url, connection_pool=pool)
+        second = CostKatanaClient(api_key="test_key", base_url=server_url, connection_pool=pool)
+
+        first.client.get("/api/chat/models")
+        first.close()
+        second.client.get("/api/chat/models")
+
+        assert pool.stats()["connections"] == 1
+
+    def test_limits_from_config(self):
+        """Clients with the same http_* limits share the process-wide pool"""
+        config = Config(
+            api_key="test_key",
+            http_max_connections=8,
+            http_max_keepalive_connections=4,
+            http_keepalive_expiry=12.0,
+        )
+        client = CostKatanaClient(config=config)
+
+        assert client.connection_pool is shared_connection_pool(config)
+        assert client.connection_pool.limits.max_connections == 8
+        assert client.connection_pool.limits.keepalive_expiry == 12.0
+        assert client.template_manager.connection_pool is client.connection_pool
+
+
+class TestHTTP2:
+    """Test the opt-in HTTP/2 mode"""
+
+    def test_falls_back_to_http11_without_h2_server(self, server_url):
+        """A plain HTTP/1.1 server is still reachable with http2 enabled"""
+        pytest.importorskip("h2")
+        pool = ConnectionPool(http2=True)
+        client = pool.client(server_url)
+
+        response = client.get("/api/chat/models")
+
+        assert response.http_version == "HTTP/1.1"
+        assert pool.stats()["http2"] == 0
+        pool.close()
+
+    def test_sync_requests_from_many_threads(self, server_url):
+        """Sync callers share the event-loop transport, streaming included"""
+        pytest.importorskip("h2")
+        pool = ConnectionPool(http2=True)
+        client = pool.client(server_url)
+        results = []
+
+        def work():
+            with client.stream("GET", "/api/chat/models") as response:
+                results.append(json.loads(b"".join(response.iter_bytes())))
+
+        threads = [threading.Thread(target=work) for _ in range(16)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert results == [{"data": []}] * 16
+        pool.close()
+
+    def test_missing_h2_package_falls_back(self, monkeypatch):
+        """Without h2 installed the pool stays on HTTP/1.1"""
+        transport = httpx.AsyncHTTPTransport
+
+        def without_h2(*args, http2=False, **kwargs):
+            if http2:
+                raise ImportError("h2")
+            return transport(*args, **kwargs)
+
+        monkeypatch.setattr(httpx, "AsyncHTTPTransport", without_h2)
+        pool = ConnectionPool(http2=True)
+
+        assert pool.http2 is False
+        assert isinstance(pool.async_client("https://api.test"), httpx.AsyncClient)
+
+    def test_http2_from_config(self):
+        """Config.http2 selects a separate process-wide pool"""
+        pytest.importorskip("h2")
+        client = CostKatanaClient(config=Config(api_key="test_key", http2=True))
+
+        assert client.connection_pool.http2 is True
+        assert client.connection_pool is not shared_connection_pool()
@@ -0,0 +1,107 @@
+"""
+Tests for client-side rate limiting
+"""
+
+import asyncio
+import json
+import time
+
+import httpx
+import pytest
+
+from cost_katana.client import CostKatanaClient
+from cost_katana.config import Config
+from cost_katana.exceptions import ClientRateLimitError
+from cost_katana.rate_limit import RateLimiter, RateLimitRule
+
+
+class TestRateLimiter:
+    """Test token-bucket pacing"""
+
+    def test_burst_then_wait(self):
+        """Requests beyond the burst are delayed"""
+        limiter = RateLimiter(default=RateLimitRule(requests_per_second=10, burst=2))
+
+        assert limiter.reserve("m", None, 0)[0] == 0
+        assert limiter.reserve("m", None, 0)[0] == 0
+        wait, _ = limiter.reserve("m", None, 0)
+        assert 0.05 < wait <= 0.1
+
+    def test_fail_fast(self):
+        """fail_fast rejects instead of waiting"""
+        limiter = RateLimiter(
+            models={"m": RateLimitRule(requests_per_second=1)}, policy="fail_fast"
+        )
+        limiter.acquire("m", None, 0)
+
+        with pytest.raises(ClientRateLimitError) as exc_info:
+            limiter.acquire("m", None, 0)
+        assert exc_info.value.retry_after > 0
+        assert limiter.stats()["model:m"]["rejected"] == 1
+
+    def test_scopes_are_independent(self):
+        """Per-model and per-project rules only apply to matching requests"""
+        limiter = RateLimiter(
+            models={"a": RateLimitRule(requests_per_second=1)},
+            projects={"p": RateLimitRule(tokens_per_minute=600)},
+            policy="fail_fast",
+        )
+        limiter.acquire("a", None, 0)
+        limiter.acquire("b", None, 0)
+        limiter.acquire("b", "p", 600)
+
+        with pytest.raises(ClientRateLimitError):
+            limiter.acquire("b", "p", 10)
+
+    def test_async_acquire_waits(self):
+        """The async path sleeps without blocking the loop"""
+        limiter = RateLimiter(default=RateLimitRule(requests_per_second=50, burst=1))
+
+        async def run():
+            return await asyncio.gather(*(limiter.aacquire("m", None, 0) for _ in range(3)))
+
+        started = time.monotonic()
+        waits = asyncio.run(run())
+        assert waits[0] == 0
+        assert time.monotonic() - started >= 0.03
+        assert limiter.stats()["default"]["delayed"] == 2
+        assert limiter.stats()["default"]["queue_depth"] == 0
+
+
+class TestClientRateLimit:
+    """Test limiter wiring in CostKatanaClient"""
+
+    def test_rejected_before_network(self):
+        """A fail-fast rejection never reaches the transport"""
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(200, json={"data": {"response": "ok"}})
+
+        client = CostKatanaClient(
+            api_key="test_key",
+            rate_limiter=RateLimiter(
+                default=RateLimitRule(requests_per_second=1), policy="fail_fast"
+            ),
+        )
+        client.client = httpx.Client(
+            base_url="https://api.test", transport=httpx.MockTransport(handler)
+        )
+
+        client.send_message("hi", model_id="m")
+        with pytest.raises(ClientRateLimitError):
+            client.send_message("hi", model_id="m")
+        assert len(calls) == 1
+        assert client.rate_limit_stats()["default"]["requests"] == 1
+
+    def test_limiter_from_config_file(self, tmp_path):
+        """Per-model rules are read from the rate_limits block"""
+        path = tmp_path / "config.json"
+        path.write_text(json.dumps({
+            "api_key": "test_key",
+            "rate_limits": {"models": {"gpt-4": {"requests_per_second": 2}}},
+        }))
+
+        client = CostKatanaClient(config=Config.from_file(str(path)))
+        assert set(client.rate_limit_stats()) == {"model:gpt-4"}
@@ -0,0 +1,110 @@
+"""
+Tests for the retry policy
+"""
+
+import httpx
+import pytest
+
+from cost_katana.client import CostKatanaClient
+from cost_katana.exceptions import CostKatanaError, RateLimitError
+from cost_katana.retry import RetryPolicy
+
+
+def make_client(handler, **kwargs):
+    client = CostKatanaClient(api_key="test_key", retry_delay=0.001, **kwargs)
+    client.client = httpx.Client(
+        base_url="https://api.test", transport=httpx.MockTransport(handler)
+    )
+    return client
+
+
+class TestRetryPolicy:
+    """Test retry classification and delays"""
+
+    def test_retryable_classes(self):
+        """Only idempotent-safe failures are retried"""
+        policy = RetryPolicy()
+        connect_error = httpx.ConnectError("refused")
+        read_timeout = httpx.ReadTimeout("slow")
+
+        assert policy.is_retryable("POST", 429)
+        assert policy.is_retryable("POST", 503)
+        assert not policy.is_retryable("POST", 502)
+        assert policy.is_retryable("GET", 502)
+        assert not policy.is_retryable("GET", 400)
+        assert policy.is_retryable("POST", error=connect_error)
+        assert not policy.is_retryable("POST", error=read_timeout)
+        assert policy.is_retryable("GET", error=read_timeout)
+
+    def test_decorrelated_jitter_is_capped(self):
+        """Delays stay within [base, max]"""
+        policy = RetryPolicy(base_delay=0.5, max_delay=2.0)
+        delay = 0.0
+        for _ in range(50):
+            delay = policy.next_delay(delay)
+            assert 0.5 <= delay <= 2.0
+
+    def test_retry_after_header(self):
+        """Retry-After accepts delta-seconds"""
+        response = httpx.Response(429, headers={"Retry-After": "7"})
+        assert RetryPolicy.retry_after(response) == 7.0
+        assert RetryPolicy.retry_after(httpx.Response(429)) is None
+
+
+class TestClientRetries:
+    """Test retries through CostKatanaClient"""
+
+    def test_rate_limit_then_success(self):
+        """A 429 is retried and per-attempt timing is exposed"""
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            if len(calls) == 1:
+                return httpx.Response(429, json={"message": "busy"}, headers={"Retry-After": "0"})
+            return httpx.Response(200, json={"data": {"response": "ok"}})
+
+        client = make_client(handler)
+        data = client.send_message("hi", model_id="m")
+
+        assert data["data"]["response"] == "ok"
+        assert [a.status_code for a in client.last_attempts] == [429, 200]
+        assert client.retry_stats()["retries"] == 1
+
+    def test_gives_up_after_max_retries(self):
+        """Persistent 429s surface as RateLimitError"""
+        client = make_client(
+            lambda request: httpx.Response(429, json={"message": "busy"}), max_retries=2
+        )
+
+        with pytest.raises(RateLimitError):
+            client.send_message("hi", model_id="m")
+        assert len(client.last_attempts) == 3
+
+    def test_post_not_retried_on_server_error(self):
+        """A 502 on a chat message is not repeated"""
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(502, json={"message": "bad gateway"})
+
+        # Failover would send the message again, to another model
+        client = make_client(handler, enable_failover=False)
+        with pytest.raises(CostKatanaError):
+            client.send_message("hi", model_id="m")
+        assert len(calls) == 1
+
+    def test_deadline_budget(self):
+        """A Retry-After beyond the deadline stops retrying"""
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(429, json={"message": "busy"}, headers={"Retry-After": "120"})
+
+        client = make_client(handler, retry_deadline=5.0)
+        with pytest.raises(RateLimitError):
+            client.send_message("hi", model_id="m")
+        assert len(calls) == 1
+        assert client.retry_stats()["deadline_exceeded"] == 1
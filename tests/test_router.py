@@ -0,0 +1,156 @@
+"""
+Tests for the EWMA model router
+"""
+
+import asyncio
+import json
+import time
+
+import httpx
+import pytest
+
+import cost_katana as ck
+from cost_katana.exceptions import AuthenticationError, ServerError
+from cost_katana.router import Router, min_cost, min_latency
+
+
+def warm(router, samples):
+    """Feed ``samples`` ({model: (latency, cost, tokens)}) until warm-up is over"""
+    for _ in range(router.min_samples):
+        for model, (latency, cost, tokens) in samples.items():
+            router.record(model, latency, cost, tokens)
+
+
+class TestSelection:
+    """Test how the router picks a model"""
+
+    def test_warm_up_then_fastest(self):
+        """Every candidate is tried min_samples times before the objective decides"""
+        router = Router(["a", "b", "c"], min_samples=2, explore=0)
+        picks = []
+        for _ in range(6):
+            model = router.select()
+            picks.append(model)
+            router.record(model, {"a": 0.9, "b": 0.2, "c": 0.5}[model], 0.001, 100)
+
+        assert sorted(picks) == ["a", "a", "b", "b", "c", "c"]
+        assert router.select() == "b"
+        assert router.stats()["b"]["latency"] == pytest.approx(0.2)
+        assert router.stats()["b"]["cost_per_1k"] == pytest.approx(0.01)
+
+    def test_cost_cap(self):
+        """min_latency with a cost cap skips the fast model that is too expensive"""
+        router = Router(
+            ["fast", "cheap"], objective=min_latency(max_cost_per_1k=0.005), explore=0
+        )
+        warm(router, {"fast": (0.1, 0.01, 1000), "cheap": (0.4, 0.002, 1000)})
+        assert router.select() == "cheap"
+
+        router.objective = min_latency()
+        assert router.select() == "fast"
+
+        router.objective = min_cost(max_latency=0.2)
+        assert router.select() == "fast"
+
+    def test_error_rate(self):
+        """Models failing more than max_error_rate are avoided; client errors don't count"""
+        router = Router(["a", "b"], min_samples=1, explore=0, alpha=0.5)
+        warm(router, {"a": (0.1, 0, 0), "b": (0.3, 0, 0)})
+        router.record_error("a", AuthenticationError("bad key"))
+        assert router.stats()["a"]["errors"] == 0
+
+        router.record_error("a", ServerError("503"))
+        router.record_error("a", ServerError("503"))
+        assert router.stats()["a"]["error_rate"] == pytest.approx(0.75)
+        assert router.select() == "b"
+
+    def test_exploration(self):
+        """A share of calls still goes to the other candidates"""
+        router = Router(["a", "b"], min_samples=1, explore=0.5, seed=7)
+        warm(router, {"a": (0.1, 0, 0), "b": (0.3, 0, 0)})
+        picks = {router.select() for _ in range(50)}
+        assert picks == {"a", "b"}
+
+
+class TestSnapshots:
+    """Test carrying statistics across restarts"""
+
+    def test_save_and_load(self, tmp_path):
+        """Statistics survive a restart; dropped candidates are ignored"""
+        router = Router(["a", "b"], min_samples=1, explore=0)
+        warm(router, {"a": (0.4, 0, 0), "b": (0.1, 0.003, 1000)})
+        path = tmp_path / "router.json"
+        router.save(str(path))
+
+        restored = Router(["b", "c"], min_samples=1, explore=0)
+        assert restored.load(str(path))
+        assert restored.stats()["b"] == router.stats()["b"]
+        assert restored.stats()["c"]["calls"] == 0
+        assert not Router(["a"]).load(str(tmp_path / "missing.json"))
+
+    def test_version_mismatch(self):
+        """Snapshots from another format version are rejected"""
+        with pytest.raises(ValueError):
+            Router(["a"]).restore({"version": 99, "models": {}})
+
+
+class TestAIIntegration:
+    """Test Router as the model argument of ai() and achat()"""
+
+    @pytest.fixture
+    def handler(self):
+        seen = []
+
+        def handler(request):
+            if request.url.path == "/api/chat/models":
+                models = [{"id": "model-a"}, {"id": "model-b"}]
+                return httpx.Response(200, json={"data": models})
+            if request.url.path == "/api/chat/conversations":
+                return httpx.Response(200, json={"data": {"id": "conv-1"}})
+            model = json.loads(request.read())["modelId"]
+            seen.append(model)
+            if model == "model-b":
+                time.sleep(0.05)
+            data = {"response": model, "cost": 0.002, "tokenCount": 100}
+            return httpx.Response(200, json={"data": data})
+
+        handler.seen = seen
+        return handler
+
+    def test_ai_routes_and_records(self, handler):
+        """Each ai() call is routed and its outcome recorded"""
+        client = ck.configure(api_key="test_key", max_retries=0, enable_failover=False)
+        client.client = httpx.Client(
+            base_url="https://api.test", transport=httpx.MockTransport(handler)
+        )
+        router = Router(["model-b", "model-a"], min_samples=1, explore=0)
+
+        responses = [ck.ai(router, "hi", enable_ai_logging=False) for _ in range(3)]
+
+        assert handler.seen == ["model-b", "model-a", "model-a"]
+        assert [r.model for r in responses] == handler.seen
+        stats = router.stats()
+        assert stats["model-b"]["latency"] > stats["model-a"]["latency"]
+        assert stats["model-a"]["calls"] == 2
+        assert stats["model-a"]["cost_per_1k"] == pytest.approx(0.02)
+
+    def test_chat_pinned(self, handler):
+        """A chat session keeps the model the router picked when it started"""
+        ck.configure(api_key="test_key", max_retries=0, enable_failover=False)
+        ck.get_global_async_client().client = httpx.AsyncClient(
+            base_url="https://api.test", transport=httpx.MockTransport(handler)
+        )
+        router = Router(["model-a", "model-b"], min_samples=1, explore=0)
+
+        async def run():
+            session = ck.achat(router)
+            await session.send("one")
+            await session.send("two")
+            return session
+
+        session = asyncio.run(run())
+
+        assert session.model == "model-a" and session.router is router
+        assert handler.seen == ["model-a", "model-a"]
+        assert router.stats()["model-a"]["calls"] == 2
+        assert router.stats()["model-b"]["calls"] == 0
@@ -0,0 +1,102 @@
+"""
+Tests for the near-duplicate response cache
+"""
+
+import json
+import warnings
+
+import httpx
+
+import cost_katana as ck
+from cost_katana.similarity import (
+    SimilarityCache,
+    estimate_similarity,
+    minhash_signature,
+)
+
+TICKET = (
+    "Summarize the following customer ticket in two sentences.\n"
+    "Generated at 2026-10-16T12:00:01Z\n"
+    "The customer reports that the export button on the billing page does "
+    "nothing when clicked, both in Firefox and in Chrome, since the last release."
+)
+
+
+class TestSignatures:
+    """Test MinHash fingerprints"""
+
+    def test_whitespace_and_case_are_ignored(self):
+        """Normalized prompts have identical signatures"""
+        noisy = "  " + TICKET.upper().replace(" ", "   ")
+        assert minhash_signature(TICKET) == minhash_signature(noisy)
+
+    def test_similarity_ordering(self):
+        """A changed timestamp scores high; an unrelated prompt scores low"""
+        base = minhash_signature(TICKET)
+        near = minhash_signature(TICKET.replace("12:00:01", "12:05:44"))
+        far = minhash_signature("Translate 'good morning' into French and Spanish.")
+        assert estimate_similarity(base, near) >= 0.8
+        assert estimate_similarity(base, far) < 0.3
+
+
+class TestSimilarityCache:
+    """Test SimilarityCache lookups and bounds"""
+
+    def test_near_duplicate_hit(self):
+        """Near-duplicates in the same partition hit; other partitions miss"""
+        cache = SimilarityCache(threshold=0.8)
+        cache.set("model-a", TICKET, {"data": {"response": "summary"}})
+
+        match = cache.get("model-a", TICKET.replace("12:00:01", "12:05:44"))
+        assert match is not None
+        assert match[0] == {"data": {"response": "summary"}}
+        assert match[1] >= 0.8
+        assert cache.get("model-b", TICKET) is None
+        assert cache.get("model-a", "What is the capital of France?") is None
+
+    def test_bounded(self):
+        """The index keeps at most max_entries entries"""
+        topics = ["volcanoes", "tax law", "sourdough", "jazz", "orbital mechanics"]
+        prompts = [f"Write a detailed essay about {topic}." for topic in topics]
+        cache = SimilarityCache(max_entries=3)
+        for i, prompt in enumerate(prompts):
+            cache.set("p", prompt, {"data": {"response": str(i)}})
+        stats = cache.stats()
+        assert stats["entries"] == 3
+        assert stats["evictions"] == 2
+        assert cache.get("p", prompts[0]) is None
+        assert cache.get("p", prompts[-1]) is not None
+
+
+class TestAiSimilarityCache:
+    """Test ai() with the similarity cache enabled"""
+
+    def test_near_duplicate_served_locally(self):
+        """A prompt differing only in its timestamp line is not sent again"""
+        seen = []
+
+        def handler(request):
+            if request.url.path == "/api/chat/models":
+                return httpx.Response(200, json={"data": [{"id": "amazon.nova-lite-v1:0"}]})
+            seen.append(json.loads(request.read()))
+            return httpx.Response(200, json={"data": {"response": "summary", "cost": 0.01}})
+
+        client = ck.configure(api_key="test_key", similarity_cache_enabled=True)
+        client.client = httpx.Client(
+            base_url="https://api.test", transport=httpx.MockTransport(handler)
+        )
+
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", DeprecationWarning)
+            ck.ai("nova-lite", TICKET, temperature=0, enable_ai_logging=False)
+            second = ck.ai(
+                "nova-lite",
+                TICKET.replace("12:00:01", "12:00:02"),
+                temperature=0,
+                enable_ai_logging=False,
+            )
+
+        assert len(seen) == 1
+        assert second.cached
+        assert second.text == "summary"
+        assert client.cache_stats()["similarity"]["hits"] == 1
@@ -0,0 +1,187 @@
+"""
+Tests for request coalescing
+"""
+
+import asyncio
+import json
+import threading
+import time
+import warnings
+
+import httpx
+import pytest
+
+import cost_katana as ck
+from cost_katana.async_client import AsyncCostKatanaClient
+from cost_katana.client import CostKatanaClient
+from cost_katana.singleflight import AsyncSingleFlight, SingleFlight
+
+
+def wait_for(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        time.sleep(0.005)
+
+
+def make_handler(seen, ready):
+    def handler(request):
+        if request.url.path == "/api/chat/models":
+            return httpx.Response(200, json={"data": [{"id": "amazon.nova-lite-v1:0"}]})
+        body = json.loads(request.read())
+        seen.append(body)
+        wait_for(ready)
+        if body["message"] == "fail":
+            return httpx.Response(400, json={"message": "bad prompt"})
+        return httpx.Response(
+            200, json={"data": {"response": body["message"].upper(), "cost": 0.02, "tokenCount": 6}}
+        )
+
+    return handler
+
+
+def run_threads(target, count):
+    results = [None] * count
+
+    def work(i):
+        try:
+            results[i] = target()
+        except Exception as e:
+            results[i] = e
+
+    threads = [threading.Thread(target=work, args=(i,)) for i in range(count)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results
+
+
+class TestSingleFlight:
+    """Test SingleFlight directly"""
+
+    def test_sequential_calls_not_shared(self):
+        """Completed calls are not reused"""
+        flight = SingleFlight()
+        assert flight.do("k", lambda: 1) == (1, False)
+        assert flight.do("k", lambda: 2) == (2, False)
+        assert flight.stats() == {"calls": 2, "coalesced": 0, "in_flight": 0}
+
+    def test_async_leader_cancelled(self):
+        """Followers of a cancelled leader run the call instead of failing"""
+        flight = AsyncSingleFlight()
+        calls = []
+
+        async def fn():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return len(calls)
+
+        async def run():
+            leader = asyncio.ensure_future(flight.do("k", fn))
+            await asyncio.sleep(0)
+            followers = [asyncio.ensure_future(flight.do("k", fn)) for _ in range(3)]
+            await asyncio.sleep(0.01)
+            leader.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await leader
+            return await asyncio.gather(*followers)
+
+        results = asyncio.run(run())
+        assert len(calls) == 2
+        assert sorted(coalesced for _, coalesced in results) == [False, True, True]
+        assert all(result == 2 for result, _ in results)
+        assert flight.stats() == {"calls": 2, "coalesced": 2, "in_flight": 0}
+
+
+class TestThreadedCoalescing:
+    """Test CostKatanaClient.send_message coalescing"""
+
+    def make_client(self, seen, followers):
+        client = CostKatanaClient(api_key="test_key")
+        ready = lambda: client.coalesce_stats()["coalesced"] >= followers  # noqa: E731
+        client.client = httpx.Client(
+            base_url="https://api.test",
+            transport=httpx.MockTransport(make_handler(seen, ready)),
+        )
+        return client
+
+    def test_identical_requests_share_one_call(self):
+        """One request reaches the gateway; followers get flagged copies"""
+        seen = []
+        client = self.make_client(seen, followers=5)
+
+        results = run_threads(lambda: client.send_message("hi", model_id="m"), 6)
+
+        assert len(seen) == 1
+        assert all(r["data"]["response"] == "HI" for r in results)
+        assert sum(1 for r in results if r.get("coalesced")) == 5
+        results[0]["data"]["response"] = "mutated"
+        assert all(r["data"]["response"] == "HI" for r in results[1:])
+
+    def test_errors_propagate_to_followers(self):
+        """Followers see the leader's exception"""
+        seen = []
+        client = self.make_client(seen, followers=2)
+
+        results = run_threads(lambda: client.send_message("fail", model_id="m"), 3)
+
+        assert len(seen) == 1
+        assert all(isinstance(r, ck.CostKatanaError) for r in results)
+
+    def test_conversations_not_coalesced(self):
+        """Messages in a conversation are always sent"""
+        seen = []
+        client = self.make_client(seen, followers=0)
+
+        run_threads(
+            lambda: client.send_message("hi", model_id="m", conversation_id="c"), 3
+        )
+        assert len(seen) == 3
+
+    def test_ai_reports_cache_hit(self):
+        """Coalesced ai() calls are cached, unbilled SimpleResponses"""
+        seen = []
+        client = ck.configure(api_key="test_key")
+        ready = lambda: client.coalesce_stats()["coalesced"] >= 3  # noqa: E731
+        client.client = httpx.Client(
+            base_url="https://api.test",
+            transport=httpx.MockTransport(make_handler(seen, ready)),
+        )
+
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", DeprecationWarning)
+            batch = ck.ai_batch("nova-lite", ["same"] * 4, concurrency=4, enable_ai_logging=False)
+
+        assert len(seen) == 1
+        followers = [r for r in batch if r.coalesced]
+        assert len(followers) == 3
+        assert all(r.cached and r.cost == 0.0 and r.saved_amount == 0.02 for r in followers)
+        assert batch.total_cost == pytest.approx(0.02)
+
+
+class TestAsyncCoalescing:
+    """Test AsyncCostKatanaClient.send_message coalescing"""
+
+    def test_gather_shares_one_call(self):
+        """Concurrent identical coroutines share one request"""
+        seen = []
+        client = AsyncCostKatanaClient(api_key="test_key")
+
+        async def handler(request):
+            seen.append(json.loads(request.read()))
+            await asyncio.sleep(0.05)
+            return httpx.Response(200, json={"data": {"response": "ok", "cost": 0.01}})
+
+        client.client = httpx.AsyncClient(
+            base_url="https://api.test", transport=httpx.MockTransport(handler)
+        )
+
+        async def run():
+            return await asyncio.gather(
+                *(client.send_message("hi", model_id="m") for _ in range(5))
+            )
+
+        results = asyncio.run(run())
+        assert len(seen) == 1
+        assert sum(1 for r in results if r.get("coalesced")) == 4
+        assert client.coalesce_stats() == {"calls": 1, "coalesced": 4, "in_flight": 0}
@@ -0,0 +1,192 @@
+"""
+Tests for streaming responses
+"""
+
+import asyncio
+import json
+import warnings
+
+import httpx
+import pytest
+
+import cost_katana as ck
+from cost_katana.async_client import AsyncCostKatanaClient
+from cost_katana.client import CostKatanaClient
+from cost_katana.exceptions import AuthenticationError
+from cost_katana.models import ChatSession
+from cost_katana.streaming import SSEParser, iter_sse_events
+
+SSE_BODY = (
+    'data: {"delta": "Hel"}\n\n'
+    ": keep-alive\n\n"
+    'data: {"delta": "lo"}\n\n'
+    'event: done\ndata: {"cost": 0.004, "tokenCount": 7, "thinking": {"summary": "ok"}}\n\n'
+    "data: [DONE]\n\n"
+)
+
+
+def make_handler(seen):
+    def handler(request):
+        if request.url.path == "/api/chat/models":
+            return httpx.Response(200, json={"data": [{"id": "amazon.nova-lite-v1:0"}]})
+        if request.url.path == "/api/chat/conversations":
+            return httpx.Response(200, json={"data": {"id": "conv-1"}})
+        seen.append(json.loads(request.read()))
+        assert request.headers["Accept"] == "text/event-stream"
+        return httpx.Response(
+            200, content=SSE_BODY, headers={"Content-Type": "text/event-stream"}
+        )
+
+    return handler
+
+
+class TestSSEParser:
+    """Test SSE event decoding"""
+
+    def test_events_and_done(self):
+        """Comments are skipped, event names become types, [DONE] ends the stream"""
+        events = list(iter_sse_events(SSE_BODY.splitlines() + ['data: {"delta": "x"}']))
+        assert [e.get("delta") for e in events] == ["Hel", "lo", None]
+        assert events[2]["type"] == "done"
+
+    def test_non_json_data(self):
+        """Plain-text data lines are treated as text deltas"""
+        parser = SSEParser()
+        assert parser.feed("data: plain") is None
+        assert parser.feed("") == {"delta": "plain"}
+
+
+class TestStreamMessage:
+    """Test CostKatanaClient.stream_message"""
+
+    def test_chunks_usage_and_timing(self):
+        """Chunks arrive in order and the final event carries usage"""
+        seen = []
+        client = CostKatanaClient(api_key="test_key")
+        client.client = httpx.Client(
+            base_url="https://api.test", transport=httpx.MockTransport(make_handler(seen))
+        )
+
+        stream = client.stream_message("Hi", model_id="amazon.nova-lite-v1:0")
+        assert list(stream) == ["Hel", "lo"]
+
+        assert seen[0]["stream"] is True
+        assert stream.text == "Hello"
+        assert stream.usage["cost"] == 0.004
+        assert stream.thinking == {"summary": "ok"}
+        assert stream.output_tokens == 7
+        assert stream.time_to_first_token is not None
+        assert stream.done and stream.complete
+
+    def test_error_status_raises(self):
+        """A non-2xx response is mapped like a normal request"""
+        client = CostKatanaClient(api_key="test_key", max_retries=0)
+        client.client = httpx.Client(
+            base_url="https://api.test",
+            transport=httpx.MockTransport(
+                lambda r: httpx.Response(401, json={"message": "bad key"})
+            ),
+        )
+        with pytest.raises(AuthenticationError):
+            list(client.stream_message("Hi", model_id="m"))
+
+    def test_chat_session_history(self):
+        """Streamed replies are added to the session history once finished"""
+        seen = []
+        client = CostKatanaClient(api_key="test_key")
+        client.client = httpx.Client(
+            base_url="https://api.test", transport=httpx.MockTransport(make_handler(seen))
+        )
+        session = ChatSession(client, "amazon.nova-lite-v1:0")
+
+        stream = session.send_message("Hi", stream=True)
+        assert session.history == []
+        "".join(stream)
+
+        assert seen[0]["conversationId"] == "conv-1"
+        assert [m["content"] for m in session.history] == ["Hi", "Hello"]
+
+    def test_early_stop_runs_callbacks(self):
+        """Breaking out of the loop still ends the stream and bills what was received"""
+        client = CostKatanaClient(api_key="test_key", cost_limit_per_day=1.0)
+        client.client = httpx.Client(
+            base_url="https://api.test", transport=httpx.MockTransport(make_handler([]))
+        )
+        finished = []
+
+        stream = client.stream_message("Hi", model_id="gpt-4o-mini", max_tokens=50)
+        stream.add_done_callback(finished.append)
+        for chunk in stream:
+            break
+
+        assert finished == [stream] and stream.done and not stream.complete
+        assert stream.text == "Hel"
+        assert client.budget_stats()["spent"] > 0
+
+    def test_close_runs_callbacks(self):
+        """close() before reading ends the stream too"""
+        client = CostKatanaClient(api_key="test_key")
+        client.client = httpx.Client(
+            base_url="https://api.test", transport=httpx.MockTransport(make_handler([]))
+        )
+        finished = []
+
+        stream = client.stream_message("Hi", model_id="m")
+        stream.add_done_callback(finished.append)
+        stream.close()
+
+        assert finished == [stream] and not stream.complete
+
+
+class TestAiStream:
+    """Test ck.ai_stream and ck.aai_stream"""
+
+    def test_ai_stream(self):
+        """ai_stream yields text chunks through the global client"""
+        seen = []
+        client = ck.configure(api_key="test_key")
+        client.client = httpx.Client(
+            base_url="https://api.test", transport=httpx.MockTransport(make_handler(seen))
+        )
+
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", DeprecationWarning)
+            stream = ck.ai_stream("amazon.nova-lite-v1:0", "Hi", enable_ai_logging=False)
+        assert "".join(stream) == "Hello"
+        assert stream.usage["tokenCount"] == 7
+
+    def test_async_stream(self):
+        """AsyncCostKatanaClient.stream_message supports async iteration"""
+        seen = []
+        client = AsyncCostKatanaClient(api_key="test_key")
+        client.client = httpx.AsyncClient(
+            base_url="https://api.test", transport=httpx.MockTransport(make_handler(seen))
+        )
+
+        async def run():
+            stream = await client.stream_message("Hi", model_id="amazon.nova-lite-v1:0")
+            return stream, [chunk async for chunk in stream]
+
+        stream, chunks = asyncio.run(run())
+        assert chunks == ["Hel", "lo"]
+        assert stream.usage["cost"] == 0.004
+        assert stream.tokens_per_second is None or stream.tokens_per_second > 0
+
+    def test_async_early_stop_runs_callbacks(self):
+        """aclose() after a partial read runs the done callbacks"""
+        client = AsyncCostKatanaClient(api_key="test_key")
+        client.client = httpx.AsyncClient(
+            base_url="https://api.test", transport=httpx.MockTransport(make_handler([]))
+        )
+        finished = []
+
+        async def run():
+            stream = await client.stream_message("Hi", model_id="amazon.nova-lite-v1:0")
+            stream.add_done_callback(finished.append)
+            async for chunk in stream:
+                break
+            await stream.aclose()
+            return stream
+
+        stream = asyncio.run(run())
+        assert finished == [stream] and stream.text == "Hel" and not stream.complete
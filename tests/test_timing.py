@@ -0,0 +1,126 @@
+"""
+Tests for per-request timing breakdowns
+"""
+
+import asyncio
+import json
+import threading
+import time
+import warnings
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import cost_katana as ck
+from cost_katana.async_client import AsyncCostKatanaClient
+from cost_katana.client import CostKatanaClient
+from cost_katana.pool import ConnectionPool
+from cost_katana.timing import RequestTiming
+
+SERVER_DELAY = 0.03
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self._reply({"data": [{"id": "amazon.nova-lite-v1:0"}]})
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        time.sleep(SERVER_DELAY)
+        self._reply({"data": {"response": body["message"].upper(), "cost": 0.01, "tokenCount": 4}})
+
+    def _reply(self, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+class TestRequestTiming:
+    """Test the phase breakdown of gateway requests"""
+
+    def test_send_message_phases(self, server_url):
+        """New connections report connect time; reused ones don't"""
+        client = CostKatanaClient(
+            api_key="test_key", base_url=server_url, connection_pool=ConnectionPool()
+        )
+
+        first = RequestTiming.from_dict(client.send_message("one", model_id="m")["timing"])
+        second = RequestTiming.from_dict(client.send_message("two", model_id="m")["timing"])
+
+        assert not first.connection_reused and first.connect > 0
+        assert second.connection_reused and second.connect == 0
+        for timing in (first, second):
+            assert timing.ttfb >= SERVER_DELAY * 1000 * 0.9
+            assert timing.http_version == "HTTP/1.1"
+            assert timing.attempts == 1
+            assert timing.total >= timing.network
+            assert timing.total == pytest.approx(timing.network + timing.sdk_overhead)
+
+    def test_event_loop_transport(self, server_url):
+        """Sync HTTP/2 pools (background loop transport) still record phases"""
+        pytest.importorskip("h2")
+        pool = ConnectionPool(http2=True)
+        client = CostKatanaClient(api_key="test_key", base_url=server_url, connection_pool=pool)
+
+        timing = client.send_message("one", model_id="m")["timing"]
+
+        assert timing["ttfb"] >= SERVER_DELAY * 1000 * 0.9
+        pool.close()
+
+    def test_async_client(self, server_url):
+        """AsyncCostKatanaClient attaches the same breakdown"""
+        client = AsyncCostKatanaClient(
+            api_key="test_key", base_url=server_url, connection_pool=ConnectionPool()
+        )
+
+        async def run():
+            try:
+                return await client.send_message("one", model_id="m")
+            finally:
+                await client.client.aclose()
+
+        timing = asyncio.run(run())["timing"]
+        assert not timing["connection_reused"]
+        assert timing["ttfb"] >= SERVER_DELAY * 1000 * 0.9
+
+    def test_ai_logs_breakdown(self, server_url):
+        """ai() returns the timing and forwards it to the AILogger entry"""
+        entries = []
+        client = ck.configure(api_key="test_key", base_url=server_url)
+        client.ai_logger = type("L", (), {"log_ai_call": entries.append})()
+
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", DeprecationWarning)
+            response = ck.ai("nova-lite", "hello", temperature=0)
+            cached = ck.ai("nova-lite", "hello", temperature=0)
+
+        assert response.timing.ttfb >= SERVER_DELAY * 1000 * 0.9
+        assert response.timing.sdk_overhead > 0
+        breakdown = entries[0]["latencyBreakdown"]
+        assert set(breakdown) >= {"connect", "tls", "ttfb", "download", "sdkOverhead"}
+        assert breakdown["ttfb"] == pytest.approx(response.timing.ttfb, abs=0.001)
+
+        # Served from the response cache: no HTTP phases, only SDK overhead
+        assert cached.cached and cached.timing.attempts == 0
+        assert cached.timing.network == 0
+        assert entries[1]["latencyBreakdown"]["total"] == pytest.approx(
+            entries[1]["latencyBreakdown"]["sdkOverhead"], abs=0.001
+        )